@@ -0,0 +1,85 @@
+"""
+Benchmark of validated construction of frames and components against construction
+without validation.
+
+Run with `python benchmarks/bench_construction.py`. Frames of every class in a
+synthetic file are extracted with `from_node`, and every frame and component is
+built again from its fields, either validated or with `model_construct`, which
+skips validation. Nested components are passed as instances, which pydantic does
+not validate again, so validation only checks the types of plain values and is
+not slower than constructing the instances without it.
+
+This is why frames and components have no trusted mode that builds them without
+validation: `model_construct` takes about twice as long as validation here, so
+validation stays the only mode.
+"""
+
+import timeit
+from collections import defaultdict
+
+from pydantic import BaseModel
+
+from sea.entities import FRAMES, Document
+from sea.synthetic import generate_file
+
+
+def measure(function, number: int = 5) -> float:
+    """
+    Time a function in milliseconds.
+    """
+    return min(timeit.repeat(function, number=number, repeat=3)) / number * 1e3
+
+
+def collect_models(frames: list[BaseModel]) -> dict[type, list[dict]]:
+    """
+    Collect the fields of frames and their components by class.
+    """
+    models = defaultdict(list)
+    stack = list(frames)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, BaseModel):
+            cls = type(value)
+            fields = {
+                field.alias or name: getattr(value, name)
+                for name, field in cls.model_fields.items()
+            }
+            models[cls].append(fields)
+            stack.extend(fields.values())
+    return models
+
+
+def main():
+    file = generate_file(modules=2, items=8)
+    metadata = {key: value for key, value in file.items() if key != "document"}
+    document = Document(**file["document"], metadata=metadata)
+    nodes = [node for node in document.select_nodes("FRAME") if node.name in FRAMES]
+    frames = [FRAMES[node.name].from_node(node) for node in nodes]
+
+    extract = measure(lambda: [FRAMES[node.name].from_node(node) for node in nodes])
+    print(f"from_node: {extract:.3f}ms for {len(nodes)} frames")
+    totals = {"validated": 0.0, "model_construct": 0.0}
+    for cls, instances in collect_models(frames).items():
+        timings = {
+            "validated": measure(lambda: [cls(**fields) for fields in instances]),
+            "model_construct": measure(
+                lambda: [cls.model_construct(**fields) for fields in instances]
+            ),
+        }
+        for name, ms in timings.items():
+            totals[name] += ms
+        print(
+            f"{cls.__name__:20s} instances={len(instances):4d} "
+            + ", ".join(f"{name}: {ms:.3f}ms" for name, ms in timings.items())
+        )
+    print(
+        f"{'total':35s}"
+        + ", ".join(f"{name}: {ms:.3f}ms" for name, ms in totals.items())
+        + f" ({totals['validated'] / extract:.0%} of from_node)"
+    )
+
+
+if __name__ == "__main__":
+    main()
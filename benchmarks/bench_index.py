@@ -0,0 +1,48 @@
+"""
+Benchmark of reads of the index of nodes.
+
+Run with `python benchmarks/bench_index.py`. Private attributes of pydantic models
+are not in the instance dictionary, so reading `node._index` falls back to
+`BaseModel.__getattr__`. Selections, extraction plans and content hashes read the
+index on every call, which is why they read it from `__pydantic_private__`.
+"""
+
+import timeit
+
+from sea.entities import FRAMES, Document
+from sea.synthetic import generate_file
+
+
+def measure(function, number: int) -> float:
+    """
+    Time a function in nanoseconds.
+    """
+    return min(timeit.repeat(function, number=number, repeat=3)) / number * 1e9
+
+
+def main():
+    file = generate_file(modules=2, items=8)
+    metadata = {key: value for key, value in file.items() if key != "document"}
+    document = Document(**file["document"], metadata=metadata)
+    nodes = [node for node in document.select_nodes("FRAME") if node.name in FRAMES]
+
+    node = nodes[0]
+    timings = {
+        "attribute": lambda: node._index,
+        "dictionary": lambda: node.__pydantic_private__["_index"],
+    }
+    print(
+        "index reads: "
+        + ", ".join(
+            f"{name}: {measure(function, number=10**5):.0f}ns"
+            for name, function in timings.items()
+        )
+    )
+    extract = measure(
+        lambda: [FRAMES[node.name].from_node(node) for node in nodes], number=5
+    )
+    print(f"from_node: {extract / 1e6:.3f}ms for {len(nodes)} frames")
+
+
+if __name__ == "__main__":
+    main()
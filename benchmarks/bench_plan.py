@@ -0,0 +1,94 @@
+"""
+Benchmark of extraction plans against separate selections for each field.
+
+Run with `python benchmarks/bench_plan.py`. Frames are built as standalone nodes,
+i.e., without a document index, so that every selection walks the frame subtree.
+"""
+
+import timeit
+
+from sea.entities import FRAMES, Node
+from sea.entities.components import Card
+from sea.synthetic import SyntheticFile
+
+LEAVES = 20  # decorative vector leaves per frame and card
+
+
+def make_frame(cards: int) -> Node:
+    """
+    Create a learning objectives frame with a number of cards.
+    """
+    generator = SyntheticFile(items=cards, leaves=LEAVES)
+    return Node(**generator.frame("learning_objectives"))
+
+
+def count_visits(node: Node, selections) -> int:
+    """
+    Count nodes visited by separate selections, emulating `Node.select_nodes`.
+    """
+    visits = 0
+    for type, pattern, many in selections:
+        stack = list(reversed(node.children or []))
+        while stack:
+            child = stack.pop()
+            visits += 1
+            if not many and child.type == type and pattern in child.name:
+                break
+            stack.extend(reversed(child.children or []))
+    return visits
+
+
+def count_plan_visits(node: Node, plan) -> int:
+    """
+    Count nodes visited by a single traversal of an extraction plan.
+    """
+    pending = {
+        name for name, selection in plan.selections.items() if not selection.many
+    }
+    visits = 0
+    stack = list(reversed(node.children or []))
+    while stack and (pending or plan.many):
+        child = stack.pop()
+        visits += 1
+        for name, regex, many in plan.types.get(child.type, ()):
+            if not many and regex.search(child.name):
+                pending.discard(name)
+        stack.extend(reversed(child.children or []))
+    return visits
+
+
+def main():
+    for cards in (4, 16, 64):
+        frame = make_frame(cards)
+        frame_class = FRAMES[frame.name]
+        separate = count_visits(frame, frame_class.plan.selections.values())
+        planned = count_plan_visits(frame, frame_class.plan)
+        for card in frame.select_nodes("GROUP", "objectives"):
+            separate += count_visits(card, Card.plan.selections.values())
+            planned += count_plan_visits(card, Card.plan)
+        plan = frame_class.plan
+        timings = {
+            "separate": lambda: {
+                name: (
+                    list(frame.select_nodes(type, pattern))
+                    if many
+                    else frame.select_node(type, pattern)
+                )
+                for name, (type, pattern, many) in plan.selections.items()
+            },
+            "plan": lambda: plan.collect(frame),
+            "from_node": lambda: frame_class.from_node(frame),
+        }
+        timings = {
+            name: min(timeit.repeat(function, number=20, repeat=3)) / 20 * 1e3
+            for name, function in timings.items()
+        }
+        print(
+            f"cards={cards:3d} visits: separate={separate:6d} plan={planned:6d} "
+            f"({separate / planned:.1f}x), "
+            + ", ".join(f"{name}: {ms:.3f}ms" for name, ms in timings.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
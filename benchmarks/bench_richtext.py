@@ -0,0 +1,68 @@
+"""
+Benchmark of the conversion of styled texts to Markdown and HTML.
+
+Run with `python benchmarks/bench_richtext.py`. The time per character should stay
+constant as the texts grow, as runs of styles are converted in a single pass.
+"""
+
+import random
+import timeit
+
+from sea.entities.richtext import render_text
+from sea.synthetic import WORDS
+
+LENGTHS = (1_000, 10_000, 100_000, 1_000_000)
+TABLE = {
+    "1": {"fontWeight": 700},
+    "2": {"italic": True},
+    "3": {"hyperlink": {"type": "URL", "url": "https://example.org"}},
+}
+
+
+def make_text(length: int, seed: int = 0) -> tuple[str, list[int], list[str]]:
+    """
+    Create a text with runs of random styles and lines of lists.
+    """
+    rng = random.Random(seed)
+    lines = []
+    while sum(map(len, lines)) + len(lines) < length:
+        lines.append(" ".join(rng.choices(WORDS, k=rng.randint(5, 40))))
+    characters = "\n".join(lines)[:length]
+    overrides = []
+    while len(overrides) < length:
+        overrides += [rng.choice([0, 0, 1, 2, 3])] * rng.randint(1, 40)
+    line_types = rng.choices(["NONE", "UNORDERED", "ORDERED"], k=len(lines))
+    return characters, overrides[:length], line_types
+
+
+def main():
+    for length in LENGTHS:
+        characters, overrides, line_types = make_text(length)
+        timings = {
+            format: min(
+                timeit.repeat(
+                    lambda: render_text(
+                        characters,
+                        overrides,
+                        TABLE,
+                        format=format,
+                        line_types=line_types,
+                    ),
+                    number=3,
+                    repeat=3,
+                )
+            )
+            / 3
+            for format in ("markdown", "html")
+        }
+        print(
+            f"length={length:8d} "
+            + ", ".join(
+                f"{format}: {seconds * 1e3:8.2f}ms ({seconds / length * 1e9:.0f}ns/char)"
+                for format, seconds in timings.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark of single-pass frame serialisation against `FrameBase.to_content`.
+
+Run with `python benchmarks/bench_serialize.py`. Frames of several classes are
+serialised to a JSON array, either by dumping each frame to a dictionary with
+`to_content` and encoding the list, or directly to bytes with `dump_contents`.
+"""
+
+import json
+import timeit
+
+import orjson
+
+from sea.entities import (
+    Cover,
+    KeyConcepts,
+    LearningObjectives,
+    ModuleText,
+    Quote,
+    dump_contents,
+)
+from sea.entities.components import Card, Image, Intro
+from sea.entities.frames import TextElement
+
+
+def make_frames(count: int) -> list:
+    """
+    Create a list of frames of several classes.
+    """
+    image = Image(src="image.png", caption="caption")
+    factories = [
+        lambda i: Cover(
+            template_id="module_cover",
+            image=image,
+            intro=Intro(label="Module", number=str(i)),
+            title=f"Module {i}",
+        ),
+        lambda i: ModuleText(
+            template_id="text",
+            colorscheme="dark",
+            content=[
+                TextElement(template_id=f"p{j}", text="lorem ipsum " * 20)
+                for j in range(5)
+            ],
+        ),
+        lambda i: LearningObjectives(
+            template_id="learning_objectives",
+            title="Objectives",
+            intro="intro",
+            cards=[
+                Card(image=image, title=f"title {j}", description="description")
+                for j in range(4)
+            ],
+        ),
+        lambda i: KeyConcepts(
+            template_id="key_concepts", title="Concepts", intro="intro", concepts=[]
+        ),
+        lambda i: Quote(template_id="quote_large_with_name", quote="q", author="a"),
+    ]
+    return [factories[i % len(factories)](i) for i in range(count)]
+
+
+def main():
+    for count in (10, 100, 1000):
+        frames = make_frames(count)
+        expected = orjson.dumps([frame.to_content() for frame in frames])
+        assert dump_contents(frames) == expected
+        timings = {
+            "to_content+json": lambda: json.dumps(
+                [frame.to_content() for frame in frames], separators=(",", ":")
+            ).encode(),
+            "to_content+orjson": lambda: orjson.dumps(
+                [frame.to_content() for frame in frames]
+            ),
+            "to_content_json": lambda: [frame.to_content_json() for frame in frames],
+            "dump_contents": lambda: dump_contents(frames),
+        }
+        timings = {
+            name: min(timeit.repeat(function, number=10, repeat=3)) / 10 * 1e3
+            for name, function in timings.items()
+        }
+        baseline = timings["to_content+orjson"]
+        print(
+            f"frames={count:5d} "
+            + ", ".join(
+                f"{name}: {ms:.3f}ms ({baseline / ms:.1f}x)"
+                for name, ms in timings.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark suite of the pipeline on a synthetic Figma file.
+
+Run with `python benchmarks/bench_suite.py` or `make bench`. Results are saved to
+`benchmarks/results/<version>.json` and compared with the results of the previous
+version, if any, to spot regressions between versions.
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import platform
+import tempfile
+import timeit
+from pathlib import Path
+
+import sea
+from sea.entities import FRAMES, CompactDocument, Document, Node
+from sea.synthetic import generate_file
+
+RESULTS = Path(__file__).parent / "results"
+
+
+def get_benchmarks(file: dict) -> dict:
+    """
+    Create the benchmarks to run on a synthetic file.
+    """
+    data = file["document"]
+    metadata = {key: value for key, value in file.items() if key != "document"}
+    document = Document(**copy.deepcopy(data), metadata=metadata)
+    tree = Node(**copy.deepcopy(data))  # without an index
+    frames = list(document.select_nodes("FRAME"))
+    snapshot = Path(tempfile.mkdtemp(), "file.snap")
+    document.save_snapshot(snapshot)
+    benchmarks = {
+        "construct/node": lambda: Node(**data),
+        "construct/document": lambda: Document(**data, metadata=metadata),
+        "construct/snapshot": lambda: Document.load_snapshot(snapshot),
+        "construct/compact_snapshot": lambda: CompactDocument.from_snapshot(snapshot),
+        "select_nodes/node": lambda: list(tree.select_nodes("TEXT", "title")),
+        "select_nodes/document": lambda: list(document.select_nodes("TEXT", "title")),
+        "sort_nodes": lambda: Node.sort_nodes(frames[::-1]),
+    }
+    for cls in dict.fromkeys(FRAMES.values()):
+        nodes = [node for node in frames if FRAMES.get(node.name) is cls]
+        instances = [cls.from_node(node) for node in nodes]
+        benchmarks |= {
+            f"from_node/{cls.__name__}": lambda cls=cls, nodes=nodes: [
+                cls.from_node(node) for node in nodes
+            ],
+            f"to_content/{cls.__name__}": lambda instances=instances: [
+                frame.to_content() for frame in instances
+            ],
+            f"to_content_json/{cls.__name__}": lambda instances=instances: [
+                frame.to_content_json() for frame in instances
+            ],
+        }
+    return benchmarks
+
+
+def find_baseline(output: Path) -> Path | None:
+    """
+    Find the most recent results of another version.
+    """
+    paths = [path for path in RESULTS.glob("*.json") if path != output]
+    return max(paths, key=lambda path: path.stat().st_mtime, default=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=2)
+    parser.add_argument("--chapters", type=int, default=2)
+    parser.add_argument("--lessons", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=6)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--leaves", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", default="", help="run matching benchmarks")
+    parser.add_argument("-o", "--output", type=Path, help="path to save results to")
+    parser.add_argument("--baseline", type=Path, help="results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown relative to the baseline reported as a regression",
+    )
+    args = parser.parse_args()
+
+    params = {
+        name: getattr(args, name)
+        for name in ("modules", "chapters", "lessons", "frames", "items", "leaves")
+    }
+    file = generate_file(**params)
+    output = args.output or RESULTS / f"{sea.__version__}.json"
+    baseline = args.baseline or find_baseline(output)
+    previous = json.loads(baseline.read_text())["results"] if baseline else {}
+    if baseline:
+        print(f"baseline: {baseline}")
+
+    results, regressions = {}, []
+    for name, function in get_benchmarks(file).items():
+        if args.filter not in name:
+            continue
+        number, _ = timeit.Timer(function).autorange()
+        seconds = min(timeit.repeat(function, number=number, repeat=args.repeat))
+        results[name] = seconds / number
+        line = f"{name:40s} {results[name] * 1e3:10.3f}ms"
+        if name in previous:
+            ratio = results[name] / previous[name]
+            line += f" {ratio:6.2f}x"
+            if ratio > args.threshold:
+                regressions.append(name)
+                line += " regression"
+        print(line)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "version": sea.__version__,
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "params": params,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"saved results to {output}")
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
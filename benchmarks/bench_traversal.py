@@ -0,0 +1,90 @@
+"""
+Benchmark of the stack-based traversal against recursive generators on deep trees.
+
+Run with `python benchmarks/bench_traversal.py`. Trees are nested groups with a text
+at every level and built without a document index, so that every selection walks
+the tree. The recursive versions are the implementations replaced by
+`Node.traverse`, which yield each node through one generator per level.
+"""
+
+import sys
+import timeit
+
+from sea.entities import Node
+from sea.entities.index import compile_pattern
+from sea.synthetic import SyntheticFile
+
+DEPTHS = (10, 100, 500, 2000)
+
+
+def make_tree(depth: int) -> Node:
+    """
+    Create nested groups with a text at every level.
+
+    Nodes are validated bottom-up, as pydantic limits the depth of nested data.
+    """
+    generator = SyntheticFile()
+    node = Node(**generator.text("title"))
+    for _ in range(depth):
+        data = generator.node("GROUP", "group")
+        text = Node(**generator.text("title"))
+        node = Node(**data, children=[text, node])
+    return node
+
+
+def select_nodes_recursive(node: Node, type: str, pattern: str = ".+"):
+    """
+    Select descendant nodes with recursive generators.
+    """
+    if node.visible and node.children:
+        regex = compile_pattern(pattern)
+        for child in node.children:
+            if child.type == type and regex.search(child.name):
+                yield child
+            yield from select_nodes_recursive(child, type, pattern)
+
+
+def walk_recursive(node: Node, level: int = 0):
+    """
+    Walk the nodes with recursive generators, see `Node._walk`.
+    """
+    if not node.visible:
+        return
+    yield f"|{'-' * level} {node.type} ({node.name})"
+    for child in node.children or []:
+        yield from walk_recursive(child, level + 1)
+
+
+def measure(function) -> str:
+    """
+    Time a function in milliseconds, or report that it exceeds the recursion limit.
+    """
+    try:
+        seconds = min(timeit.repeat(function, number=5, repeat=3)) / 5
+    except RecursionError:
+        return "RecursionError"
+    return f"{seconds * 1e3:.3f}ms"
+
+
+def main():
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    for depth in DEPTHS:
+        tree = make_tree(depth)
+        timings = {
+            "select_nodes/recursive": lambda: list(
+                select_nodes_recursive(tree, "TEXT", "title")
+            ),
+            "select_nodes/stack": lambda: list(tree.select_nodes("TEXT", "title")),
+            "str/recursive": lambda: "\n".join(walk_recursive(tree)),
+            "str/stack": lambda: str(tree),
+            "traverse/bfs": lambda: list(tree.traverse(order="bfs")),
+            "traverse/limit": lambda: list(tree.traverse(limit=10)),
+        }
+        print(
+            f"depth={depth:5d} "
+            + ", ".join(f"{name}: {measure(f)}" for name, f in timings.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
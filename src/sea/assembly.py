@@ -0,0 +1,189 @@
+"""
+Concurrent assembly of a course from several Figma files with asyncio.
+
+Files are downloaded in threads, so that they share the connection pool and the
+rate limit of the client, while parsing and extraction are offloaded from the
+event loop to worker threads or processes. The number of files processed at once
+is bounded, and results are returned as soon as each file is done, so that a
+course split across files is built in about the time of the slowest file.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import AsyncGenerator, Awaitable, Callable, Literal, TypeVar
+
+from .entities.cache import FileCache
+from .entities.document import Document
+from .entities.projection import Projection
+from .pipeline import Pipeline
+from .writer import CourseWriter
+
+__all__ = ["assemble_course", "build_file", "fetch_documents"]
+
+T = TypeVar("T")
+
+
+async def _map_unordered(
+    function: Callable[[str], Awaitable[T]],
+    keys: list[str],
+    concurrency: int,
+) -> AsyncGenerator[tuple[str, T], None]:
+    """
+    Apply an async function to file keys concurrently, yielding results as they
+    complete.
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key: str) -> tuple[str, T]:
+        async with semaphore:
+            return key, await function(key)
+
+    tasks = [asyncio.create_task(run(key)) for key in keys]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # stop the remaining files if the consumer stops early or a file fails
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fetch_documents(
+    keys: list[str],
+    concurrency: int = 4,
+    cache: FileCache | None = None,
+    refresh: bool = False,
+    projection: Projection | None = None,
+) -> AsyncGenerator[tuple[str, Document], None]:
+    """
+    Fetch and parse Figma files concurrently.
+
+    Each file is fetched and parsed in a worker thread, see `Document.from_file_key`,
+    so the event loop is not blocked.
+
+    Parameters
+    ----------
+    keys : list[str]
+        Keys of the Figma files.
+    concurrency : int, default=4
+        Maximum number of files fetched and parsed at once.
+    cache : FileCache, optional
+        Cache to load the files from, see `Document.from_file_key`.
+    refresh : bool, default=False
+        If True, download the files even if the cached snapshots are up to date.
+    projection : Projection, optional
+        Projection of the nodes applied while the files are loaded.
+
+    Yields
+    ------
+    tuple[str, Document]
+        File keys and documents in the order the files are done.
+
+    Examples
+    --------
+    >>> async for key, document in fetch_documents(["key1", "key2"]):
+    ...     print(key, document.name)
+    """
+
+    async def fetch(key: str) -> Document:
+        return await asyncio.to_thread(
+            Document.from_file_key,
+            key,
+            cache=cache,
+            refresh=refresh,
+            projection=projection,
+        )
+
+    async for key, document in _map_unordered(fetch, keys, concurrency):
+        yield key, document
+
+
+def build_file(pipeline: Pipeline, key: str, path: Path) -> tuple[dict, Pipeline]:
+    """
+    Build the course of a downloaded file, run in worker threads or processes.
+
+    Returns
+    -------
+    tuple[dict, Pipeline]
+        Course of the file, see `Pipeline.build`, and the copy of the pipeline it
+        was built with, whose `timings`, `skipped` and `report` are of the file.
+    """
+    pipeline = pipeline.copy()
+    return pipeline.build(key, path=path), pipeline
+
+
+async def assemble_course(
+    keys: list[str],
+    output: str | os.PathLike,
+    pipeline: Pipeline | None = None,
+    concurrency: int = 4,
+    executor: Executor | None = None,
+    refresh: bool = False,
+    format: Literal["json", "ndjson"] = "json",
+    header: dict | None = None,
+) -> dict[str, Pipeline]:
+    """
+    Build one course from several Figma files and stream it to a file.
+
+    Files are downloaded into the cache of the pipeline in threads and built with
+    `Pipeline.build` in the executor. The course of each file is written as soon
+    as it and the files before it are done, so that files keep their order, e.g.,
+    `{"name": ..., "files": [{"key": ..., "sections": [...]}, ...]}`.
+
+    Parameters
+    ----------
+    keys : list[str]
+        Keys of the Figma files in the order of the course, e.g., one per module.
+    output : str | os.PathLike
+        Path to write the course to.
+    pipeline : Pipeline, optional
+        Pipeline to build each file with. It is copied to worker processes, so
+        its `workers` should be `0` if the executor is a process pool. Defaults
+        to a pipeline that extracts frames in the worker.
+    concurrency : int, default=4
+        Maximum number of files downloaded or built at once.
+    executor : Executor, optional
+        Executor to build the files in, e.g., a `ProcessPoolExecutor` to parse
+        and extract several files in parallel. Defaults to worker threads.
+    refresh : bool, default=False
+        If True, download the files even if the cached snapshots are up to date.
+    format : Literal["json", "ndjson"], default="json"
+        Format of the output, see `CourseWriter`.
+    header : dict, optional
+        Metadata of the course written before the files.
+
+    Returns
+    -------
+    dict[str, Pipeline]
+        Copies of the pipeline each file was built with by file key, see
+        `Pipeline.print_summary`.
+    """
+    keys = list(dict.fromkeys(keys))
+    pipeline = pipeline or Pipeline(workers=0)
+    cache = pipeline.cache or FileCache()
+    loop = asyncio.get_running_loop()
+
+    async def build(key: str) -> tuple[dict, Pipeline]:
+        # downloads share the client and its rate limit across threads
+        path = await asyncio.to_thread(cache.fetch, key, refresh)
+        return await loop.run_in_executor(
+            executor, partial(build_file, pipeline, key, path)
+        )
+
+    pipelines, done, position = {}, {}, 0
+    with CourseWriter(output, format=format, header=header, key="files") as writer:
+        async for key, (course, pipelines[key]) in _map_unordered(
+            build, keys, concurrency
+        ):
+            done[key] = course
+            # write the files that are done in the order of the keys
+            while position < len(keys) and keys[position] in done:
+                writer.write(done.pop(keys[position]))
+                position += 1
+    return {key: pipelines[key] for key in keys}
@@ -0,0 +1,322 @@
+"""
+Command line interface of the pipeline.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from dotenv import load_dotenv
+
+from .assembly import assemble_course
+from .entities.cache import FileCache
+from .entities.images import ImageExporter
+from .entities.instrumentation import instrument
+from .entities.projection import Projection
+from .entities.variants import VariantGenerator
+from .pipeline import Pipeline
+from .service import RebuildService
+from .service import serve as run_server
+
+__all__ = ["main"]
+
+
+def fetch(args: argparse.Namespace) -> None:
+    """
+    Download a Figma file into the cache unless the cached snapshot is up to date.
+    """
+    cache = FileCache(args.cache_dir, max_size=args.max_size)
+    path = cache.fetch(args.file_key, refresh=args.refresh)
+    print(path)
+
+
+def get_pipeline(args: argparse.Namespace, workers: int) -> Pipeline:
+    """
+    Create a pipeline from the options shared by commands that build courses.
+    """
+    images = variants = None
+    if args.images is not None:
+        images = ImageExporter(args.images, base_url=args.image_base_url)
+        if args.variants:
+            variants = VariantGenerator(
+                images,
+                widths=[int(width) for width in args.variants.split(",")],
+                formats=args.variant_formats.split(","),
+                workers=workers,
+            )
+    elif args.variants:
+        raise SystemExit("--variants requires --images")
+    return Pipeline(
+        workers=workers,
+        cache=FileCache(args.cache_dir, max_size=args.max_size),
+        incremental=args.incremental,
+        images=images,
+        variants=variants,
+        text_format=args.text_format,
+        projection=(
+            Projection(skip_invisible=args.skip_invisible)
+            if args.prune or args.skip_invisible
+            else None
+        ),
+    )
+
+
+def build(args: argparse.Namespace) -> None:
+    """
+    Build a course JSON from one or more Figma files.
+    """
+    keys = args.file_keys
+    if len(keys) > 1 and args.from_file is not None:
+        raise SystemExit("--from-file requires a single file key")
+    instrumented = args.stats or args.trace is not None
+    # frames extracted by worker processes are not instrumented
+    workers = 0 if instrumented and args.workers is None else args.workers
+    if workers is None:
+        workers = os.cpu_count()
+    # several files are built in parallel rather than their frames
+    pipeline = get_pipeline(args, workers if len(keys) == 1 else 0)
+    with instrument(args.trace) if instrumented else nullcontext() as instrumentation:
+        if len(keys) == 1:
+            pipeline.run(
+                keys[0],
+                args.output,
+                refresh=args.refresh,
+                format=args.format,
+                path=args.from_file,
+            )
+            pipeline.print_summary()
+        else:
+            executor = (
+                ProcessPoolExecutor(min(workers, args.concurrency)) if workers else None
+            )
+            try:
+                pipelines = asyncio.run(
+                    assemble_course(
+                        keys,
+                        args.output,
+                        pipeline,
+                        concurrency=args.concurrency,
+                        executor=executor,
+                        refresh=args.refresh,
+                        format=args.format,
+                    )
+                )
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+            for key, file_pipeline in pipelines.items():
+                print(f"{key}:", file=sys.stderr)
+                file_pipeline.print_summary()
+    if instrumentation is not None:
+        print(instrumentation.stats.summary(), file=sys.stderr)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """
+    Serve Figma webhooks and rebuild the courses of the files that change.
+    """
+    service = RebuildService(
+        get_pipeline(args, args.workers),
+        args.output_dir,
+        debounce=args.debounce,
+        max_delay=args.max_delay,
+        format=args.format,
+        keys=args.file_keys or None,
+        passcode=args.passcode,
+        concurrency=args.concurrency,
+        refresh=args.refresh,
+    )
+    run_server(service, host=args.host, port=args.port)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Create a parser for the command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog="sea", description=__doc__.strip())
+    subparsers = parser.add_subparsers(required=True)
+
+    # options shared by commands that download Figma files
+    cache = argparse.ArgumentParser(add_help=False)
+    cache.add_argument(
+        "--cache-dir",
+        help="directory to cache Figma files in, defaults to SEA_CACHE_DIR or ~/.cache/sea",
+    )
+    cache.add_argument(
+        "--max-size",
+        type=int,
+        default=2**30,
+        help="maximum size of the cache in bytes",
+    )
+    cache.add_argument(
+        "--refresh",
+        action="store_true",
+        help="download the file even if the cached snapshot is up to date",
+    )
+
+    # options shared by commands that build courses
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument(
+        "-f",
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="format of the output, ndjson writes one section per line",
+    )
+    options.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only extract frames that have changed since the previous build",
+    )
+    options.add_argument(
+        "--text-format",
+        choices=["plain", "markdown", "html"],
+        default="plain",
+        help="format of body texts, markdown and html keep bold, italic, links and lists",
+    )
+    options.add_argument(
+        "--prune",
+        action="store_true",
+        help="drop node properties and types unused by the extractors while loading",
+    )
+    options.add_argument(
+        "--skip-invisible",
+        action="store_true",
+        help="also drop invisible nodes with their subtrees while loading, implies --prune",
+    )
+    options.add_argument(
+        "--images",
+        metavar="DIRECTORY",
+        help="export images to a directory and write their paths into the frames",
+    )
+    options.add_argument(
+        "--image-base-url",
+        help="URL the image directory is served at to use instead of local paths",
+    )
+    options.add_argument(
+        "--variants",
+        metavar="WIDTHS",
+        help="comma-separated widths of responsive variants of images, e.g., 320,640",
+    )
+    options.add_argument(
+        "--variant-formats",
+        default="webp,avif",
+        help="comma-separated formats of the variants",
+    )
+
+    parser_fetch = subparsers.add_parser(
+        "fetch", parents=[cache], help="download a Figma file into the cache"
+    )
+    parser_fetch.add_argument("file_key", help="key of the Figma file")
+    parser_fetch.set_defaults(func=fetch)
+
+    parser_build = subparsers.add_parser(
+        "build", parents=[cache, options], help="build a course JSON from Figma files"
+    )
+    parser_build.add_argument(
+        "file_keys",
+        nargs="+",
+        metavar="file_key",
+        help="key of the Figma file, several files are built into one course",
+    )
+    parser_build.add_argument(
+        "-o",
+        "--output",
+        default="course.json",
+        help="path to write the course JSON to",
+    )
+    parser_build.add_argument(
+        "--from-file",
+        metavar="PATH",
+        help="build from a local JSON export of the file, optionally gzip or zstd compressed",
+    )
+    parser_build.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="number of worker processes, defaults to the number of CPUs or to 0 with --stats or --trace",
+    )
+    parser_build.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="maximum number of files downloaded or built at once with several file keys",
+    )
+    parser_build.add_argument(
+        "--stats",
+        action="store_true",
+        help="print traversal counters and timings of each frame class and fetch",
+    )
+    parser_build.add_argument(
+        "--trace",
+        help="path to save a trace file viewable in chrome://tracing or Perfetto to",
+    )
+    parser_build.set_defaults(func=build)
+
+    parser_serve = subparsers.add_parser(
+        "serve",
+        parents=[cache, options],
+        help="rebuild courses when Figma webhooks report changes to the files",
+    )
+    parser_serve.add_argument(
+        "file_keys",
+        nargs="*",
+        metavar="file_key",
+        help="keys of the Figma files to rebuild, defaults to any file",
+    )
+    parser_serve.add_argument(
+        "-o",
+        "--output-dir",
+        default="courses",
+        help="directory to publish the course JSON of each file to as <file_key>.json",
+    )
+    parser_serve.add_argument(
+        "--host", default="127.0.0.1", help="address to listen on"
+    )
+    parser_serve.add_argument(
+        "--port", type=int, default=8000, help="port to listen on"
+    )
+    parser_serve.add_argument(
+        "--debounce",
+        type=float,
+        default=10.0,
+        help="seconds without changes to a file after which it is rebuilt",
+    )
+    parser_serve.add_argument(
+        "--max-delay",
+        type=float,
+        default=120.0,
+        help="maximum seconds between the first change to a file and its rebuild",
+    )
+    parser_serve.add_argument(
+        "--passcode",
+        default=os.getenv("SEA_WEBHOOK_PASSCODE"),
+        help="passcode of the webhooks, defaults to SEA_WEBHOOK_PASSCODE",
+    )
+    parser_serve.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes per rebuild, defaults to the number of CPUs",
+    )
+    parser_serve.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="maximum number of files rebuilt at once",
+    )
+    parser_serve.set_defaults(func=serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Run the command line interface.
+    """
+    load_dotenv()
+    args = get_parser().parse_args(argv)
+    args.func(args)
@@ -3,6 +3,7 @@ Data entities (models) that define the basic objects to work with
 [Figma API](https://www.figma.com/developers/api).
 """
 
+from .compact import *
 from .document import *
 from .frames import *
 from .node import *
@@ -0,0 +1,139 @@
+"""
+On-disk cache of Figma files keyed by the file version.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from .client import FigmaClient
+
+__all__ = ["FileCache"]
+
+
+class FileCache:
+    """
+    Cache of Figma file responses stored as compressed snapshots on disk.
+
+    Before a file is loaded from the cache, its current version is checked with
+    a cheap request that only fetches the top level of the document. The file is
+    downloaded again only if it has changed since it was cached. The least recently
+    used snapshots are evicted once the cache exceeds its maximum size.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        max_size: int = 2**30,
+        client: FigmaClient | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        directory : str | os.PathLike, optional
+            Directory to store the snapshots in. Defaults to `SEA_CACHE_DIR`
+            environment variable or `~/.cache/sea`.
+        max_size : int, default=2**30
+            Maximum total size of the snapshots in bytes.
+        client : FigmaClient, optional
+            Client to download the files with. Defaults to the shared client.
+        """
+        if directory is None:
+            directory = os.getenv("SEA_CACHE_DIR", "~/.cache/sea")
+        self.directory = Path(directory).expanduser()
+        self.max_size = max_size
+        self.client = client
+
+    def get_version(self, key: str) -> str:
+        """
+        Get an identifier of the current version of a Figma file.
+
+        Parameters
+        ----------
+        key : str
+            A file key to check.
+
+        Returns
+        -------
+        str
+            Digest of the `version` and `lastModified` metadata of the file.
+        """
+        client = self.client or FigmaClient.default()
+        data = client.get_file(key, depth=1).json()
+        version = f"{data.get('version')}:{data.get('lastModified')}"
+        return hashlib.sha1(version.encode()).hexdigest()[:16]
+
+    def get_path(self, key: str, version: str) -> Path:
+        """
+        Get the path of the snapshot of a file version.
+        """
+        return self.directory / f"{key}-{version}.json.gz"
+
+    def fetch(self, key: str, refresh: bool = False) -> Path:
+        """
+        Get the path to an up-to-date snapshot of a Figma file, downloading it if
+        necessary.
+
+        Parameters
+        ----------
+        key : str
+            A file key to export JSON from.
+        refresh : bool, default=False
+            If True, download the file even if the cached snapshot is up to date.
+
+        Returns
+        -------
+        Path
+            Path to a gzip-compressed snapshot of the file response.
+        """
+        path = self.get_path(key, self.get_version(key))
+        if path.exists() and not refresh:
+            path.touch()  # mark as recently used
+            return path
+        self.directory.mkdir(parents=True, exist_ok=True)
+        client = self.client or FigmaClient.default()
+        with client.get_file(key, stream=True) as response:
+            # write to a temporary file first not to leave partial snapshots
+            with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as file:
+                try:
+                    with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+                        shutil.copyfileobj(response.raw, archive)
+                except BaseException:
+                    file.close()
+                    os.unlink(file.name)
+                    raise
+        os.replace(file.name, path)
+        # older versions of the file are no longer needed
+        for other in self.directory.glob(f"{key}-*.json.gz"):
+            if other != path:
+                other.unlink(missing_ok=True)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used snapshots until the cache fits its maximum size.
+        """
+        stats = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                stats.append((path.stat(), path))
+            except FileNotFoundError:
+                pass  # removed by another thread fetching a file concurrently
+        stats.sort(key=lambda item: item[0].st_mtime)
+        size = sum(stat.st_size for stat, _ in stats)
+        for stat, path in stats[:-1]:  # always keep the most recent snapshot
+            if size <= self.max_size:
+                break
+            size -= stat.st_size
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """
+        Remove all snapshots from the cache.
+        """
+        for path in self.directory.glob("*.json.gz"):
+            path.unlink(missing_ok=True)
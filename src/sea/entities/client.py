@@ -0,0 +1,351 @@
+"""
+Client for [Figma API](https://www.figma.com/developers/api) with connection
+pooling, rate limiting and retries.
+"""
+
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+from . import instrumentation
+
+__all__ = ["EndpointStats", "FigmaClient", "TokenBucket"]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are added at a constant rate up to the capacity of the bucket and each
+    request takes one token, waiting until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Parameters
+        ----------
+        rate : float
+            Number of tokens added per second.
+        capacity : int
+            Maximum number of tokens, i.e., the size of a burst of requests.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Take a token from the bucket, waiting until one is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # take the token in advance and wait for it outside the lock
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class EndpointStats(BaseModel):
+    """
+    Latency statistics of requests to an endpoint.
+    """
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = 0.0
+    bytes: int = 0
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean latency of a request in seconds.
+        """
+        return self.total / self.requests if self.requests else 0.0
+
+    def record(self, latency: float) -> None:
+        """
+        Record the latency of a request in seconds.
+        """
+        self.requests += 1
+        self.total += latency
+        self.min = min(self.min, latency)
+        self.max = max(self.max, latency)
+
+
+class FigmaClient:
+    """
+    Reusable client for Figma API.
+
+    All requests share a pooled session and a token bucket, so that the rate limit
+    applies across calls and threads. Throttled (429) and server error responses
+    as well as connection errors are retried with a jittered exponential backoff,
+    respecting the `Retry-After` header if present.
+    """
+
+    _default: "FigmaClient | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        token: str | None = None,
+        base_url: str = "https://api.figma.com",
+        rate: float = 1.0,
+        burst: int = 5,
+        retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        timeout: float = 30,
+        pool_size: int = 10,
+    ):
+        """
+        Parameters
+        ----------
+        token : str, optional
+            Personal access token. Defaults to `FIGMA_API_KEY` environment variable.
+        base_url : str, default="https://api.figma.com"
+            Base URL of the API, which can point to a local server for testing.
+        rate : float, default=1.0
+            Maximum sustained number of requests per second.
+        burst : int, default=5
+            Maximum number of requests sent at once before the rate applies.
+        retries : int, default=5
+            Maximum number of retries of a failed request.
+        backoff : float, default=1.0
+            Base delay in seconds that is doubled on each retry.
+        max_backoff : float, default=60.0
+            Maximum delay in seconds before a retry, which also bounds the delay
+            requested by `Retry-After`.
+        timeout : float, default=30
+            Timeout of a request in seconds.
+        pool_size : int, default=10
+            Maximum number of connections kept in the pool.
+        """
+        if token is None:
+            token = os.environ["FIGMA_API_KEY"]
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self.session.headers["X-Figma-Token"] = token
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "FigmaClient":
+        """
+        Get a client shared by all fetches that are not given a client explicitly.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def _get_endpoint(path: str) -> str:
+        """
+        Get the endpoint name from a path, e.g., "files/:key/nodes".
+        """
+        return re.sub(r"^v1/(\w+)/[^/]+", r"\1/:key", path.strip("/"))
+
+    def _get_stats(self, endpoint: str) -> EndpointStats:
+        with self._lock:
+            return self.stats.setdefault(endpoint, EndpointStats())
+
+    def _get_delay(self, attempt: int, response: requests.Response | None) -> float:
+        """
+        Get the delay before a retry from `Retry-After` or a jittered backoff.
+
+        `Retry-After` is either a number of seconds or an HTTP date, and the delay
+        is clamped to `[0, max_backoff]`.
+        """
+        if response is not None and (value := response.headers.get("Retry-After")):
+            try:
+                delay = float(value)
+            except ValueError:
+                try:
+                    date = parsedate_to_datetime(value)
+                    if date.tzinfo is None:
+                        date = date.replace(tzinfo=timezone.utc)
+                    delay = (date - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = math.nan
+            if not math.isnan(delay):
+                return min(max(delay, 0.0), self.max_backoff)
+        return random.uniform(0, min(self.backoff * 2**attempt, self.max_backoff))
+
+    def get(
+        self,
+        path: str,
+        params: dict | None = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Send a GET request to an endpoint, retrying if it fails.
+
+        Parameters
+        ----------
+        path : str
+            Path of the endpoint, e.g., "v1/files/{key}".
+        params : dict, optional
+            Query parameters of the request.
+        stream : bool, default=False
+            If True, do not download the response body immediately. The content
+            of `response.raw` is decoded in this case.
+
+        Returns
+        -------
+        requests.Response
+            Successful response.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        stats = self._get_stats(self._get_endpoint(path))
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, params=params, timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                with self._lock:
+                    stats.errors += 1
+                if attempt == self.retries:
+                    raise
+                response = None
+            else:
+                latency = time.perf_counter() - start
+                if stream:
+                    size = int(response.headers.get("Content-Length", 0))
+                else:
+                    size = len(response.content)
+                with self._lock:
+                    stats.record(latency)
+                    stats.bytes += size
+                if instrumentation.current is not None:
+                    instrumentation.current.record_fetch(
+                        self._get_endpoint(path), start, latency, size
+                    )
+                if response.status_code != 429 and response.status_code < 500:
+                    if not response.ok:
+                        # release the connection of a streamed response
+                        response.close()
+                        response.raise_for_status()
+                    response.raw.decode_content = True
+                    return response
+                with self._lock:
+                    stats.errors += 1
+                response.close()
+                if attempt == self.retries:
+                    response.raise_for_status()
+            with self._lock:
+                stats.retries += 1
+            time.sleep(self._get_delay(attempt, response))
+            attempt += 1
+
+    def get_file(self, key: str, stream: bool = False, **params) -> requests.Response:
+        """
+        Get a Figma file, see https://www.figma.com/developers/api#get-files-endpoint.
+        """
+        return self.get(f"v1/files/{key}", params=params, stream=stream)
+
+    def get_file_nodes(self, key: str, ids: list[str], **params) -> dict:
+        """
+        Get nodes from a Figma file, see
+        https://www.figma.com/developers/api#get-file-nodes-endpoint.
+        """
+        params = {"ids": ",".join(ids)} | params
+        return self.get(f"v1/files/{key}/nodes", params=params).json()
+
+    def get_images(self, key: str, ids: list[str], **params) -> dict[str, str | None]:
+        """
+        Render nodes from a Figma file as images, see
+        https://www.figma.com/developers/api#get-images-endpoint.
+
+        Returns
+        -------
+        dict[str, str | None]
+            URLs of the rendered images by node ID, None if a node failed to render.
+        """
+        params = {"ids": ",".join(ids)} | params
+        data = self.get(f"v1/images/{key}", params=params).json()
+        if data.get("err"):
+            raise requests.HTTPError(f"Failed to render images: {data['err']}")
+        return data["images"]
+
+    def download(self, url: str) -> bytes:
+        """
+        Download a file that is not served by the API, e.g., a rendered image,
+        over the pooled session.
+
+        The request does not count towards the rate limit of the API and the token
+        is not sent with it. Connection errors and server errors are retried.
+
+        Parameters
+        ----------
+        url : str
+            Absolute URL of the file.
+
+        Returns
+        -------
+        bytes
+            Content of the file.
+        """
+        stats = self._get_stats("download")
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                # drop the token header of the session for other hosts
+                response = self.session.get(
+                    url, timeout=self.timeout, headers={"X-Figma-Token": None}
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+            else:
+                latency = time.perf_counter() - start
+                with self._lock:
+                    stats.record(latency)
+                    stats.bytes += len(response.content)
+                if instrumentation.current is not None:
+                    instrumentation.current.record_fetch(
+                        "download", start, latency, len(response.content)
+                    )
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response.content
+            with self._lock:
+                stats.errors += 1
+            if attempt == self.retries:
+                if response is None:
+                    raise requests.ConnectionError(f"Failed to download {url}")
+                response.raise_for_status()
+            with self._lock:
+                stats.retries += 1
+            time.sleep(self._get_delay(attempt, response))
+            attempt += 1
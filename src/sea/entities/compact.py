@@ -0,0 +1,491 @@
+"""
+Compact array-backed representation of a document tree.
+
+Instead of a model per node, the tree is stored as parallel arrays indexed by the
+position of a node in the pre-order of the tree. Only the properties used to
+extract frames are kept. Thin views expose the same selection API as `Node` and
+full models are only materialised on demand.
+"""
+
+from __future__ import annotations  # allow forward references
+
+import math
+import os
+from array import array
+from typing import Generator, get_args
+
+from . import instrumentation
+from .client import FigmaClient
+from .document import Document
+from .index import compile_pattern, select_positions
+from .node import Node, NodeType
+from .selector import query
+from .snapshot import Snapshot
+
+__all__ = ["CompactDocument", "CompactNode"]
+
+_TYPES: tuple[str, ...] = get_args(NodeType)
+_CODES: dict[str, int] = {type: code for code, type in enumerate(_TYPES)}
+
+# bit flags stored per node
+_VISIBLE = 1
+_HAS_CHILDREN = 2
+
+
+def _reading_order(data: dict) -> tuple[float, float]:
+    """
+    Get a sorting key to present raw nodes in the reading order, see `Node`.
+    """
+    box = data.get("absoluteBoundingBox") or {}
+    return box.get("y", 0), box.get("x", 0)
+
+
+class CompactDocument:
+    """
+    Document tree stored as parallel arrays.
+
+    Nodes are numbered in the pre-order of the tree with children in the reading
+    order. Names are interned in a table, whereas the IDs and text characters are
+    stored in single strings sliced by offsets.
+    """
+
+    def __init__(self, metadata: dict):
+        self.metadata = metadata
+        # tree structure
+        self.parents = array("i")
+        self.ends = array("I")
+        self.hidden = array("i")
+        # children of a node are children[offsets[i] : offsets[i + 1]]
+        self.offsets = array("I", [0])
+        self.children = array("I")
+        # node properties
+        self.types = array("B")
+        self.flags = array("B")
+        self.names = array("I")
+        self.name_table: list[str] = []
+        self.boxes = array("d")  # x, y, width and height per node
+        self.id_offsets = array("I", [0])
+        self.id_data = ""
+        self.text_spans = array("i")  # start and stop per node, -1 if there is none
+        self.text_data = ""
+        # lazily computed lookups
+        self._type_positions: dict[str, array] = {}
+        self._matches: dict[tuple[str, str], list[int]] = {}
+        self.memo: dict[tuple, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @classmethod
+    def from_data(cls, data: dict) -> "CompactDocument":
+        """
+        Factory class to create a compact document from a Figma file response.
+
+        Parameters
+        ----------
+        data : dict
+            Figma file response with the DOCUMENT node under "document" and
+            the remaining keys treated as metadata.
+
+        Returns
+        -------
+        CompactDocument
+            Compact document built from the response.
+        """
+        metadata = {key: value for key, value in data.items() if key != "document"}
+        self = cls(metadata)
+        self._build(data["document"])
+        return self
+
+    @classmethod
+    def from_document(cls, document: Document) -> "CompactDocument":
+        """
+        Factory class to create a compact document from a document instance.
+        """
+        data = document.model_dump(exclude={"metadata"})
+        return cls.from_data({"document": data} | document.metadata)
+
+    @classmethod
+    def from_snapshot(cls, path: str | os.PathLike) -> "CompactDocument":
+        """
+        Factory class to create a compact document from a binary snapshot.
+
+        The arrays of the document are views of the memory-mapped snapshot, so
+        only the strings are decoded when the document is loaded.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to a snapshot saved with `Document.save_snapshot`.
+
+        Returns
+        -------
+        CompactDocument
+            Compact document backed by the snapshot.
+        """
+        snapshot = Snapshot(path)
+        self = cls(snapshot.metadata)
+        for name in (
+            "parents",
+            "ends",
+            "hidden",
+            "offsets",
+            "children",
+            "types",
+            "flags",
+            "names",
+            "boxes",
+            "id_offsets",
+            "text_spans",
+        ):
+            setattr(self, name, snapshot.arrays[name])
+        self.name_table = snapshot.get_names()
+        self.id_data = snapshot.get_text("id_data")
+        self.text_data = snapshot.get_text("text_data")
+        return self
+
+    @classmethod
+    def from_file_key(
+        cls, key: str, client: FigmaClient | None = None
+    ) -> "CompactDocument":
+        """
+        Factory class to create a compact document from a Figma file key.
+
+        Parameters
+        ----------
+        key : str
+            A file key to export JSON from.
+        client : FigmaClient, optional
+            Client to download the file with. Defaults to the shared client.
+
+        Returns
+        -------
+        CompactDocument
+            Compact document built from the file.
+        """
+        client = client or FigmaClient.default()
+        return cls.from_data(client.get_file(key).json())
+
+    def _build(self, root: dict) -> None:
+        """
+        Fill in the arrays from a raw node tree.
+        """
+        names: dict[str, int] = {}
+        ids: list[str] = []
+        texts: list[str] = []
+        text_length = 0
+        children: list[list[int]] = []
+        stack = [(root, -1)]
+        while stack:
+            data, parent = stack.pop()
+            position = len(self.types)
+            self.parents.append(parent)
+            self.ends.append(position)
+            if parent == -1:
+                self.hidden.append(-1)
+            elif not self.flags[parent] & _VISIBLE:
+                self.hidden.append(parent)
+            else:
+                self.hidden.append(self.hidden[parent])
+            if parent != -1:
+                children[parent].append(position)
+            children.append([])
+            try:
+                self.types.append(_CODES[data["type"]])
+            except KeyError as error:
+                raise ValueError(f"Unsupported node type {data['type']}") from error
+            nested = data.get("children")
+            self.flags.append(
+                _VISIBLE * data.get("visible", True)
+                | _HAS_CHILDREN * (nested is not None)
+            )
+            name = data["name"]
+            if (code := names.get(name)) is None:
+                code = names[name] = len(self.name_table)
+                self.name_table.append(name)
+            self.names.append(code)
+            box = data.get("absoluteBoundingBox") or {}
+            self.boxes.extend(
+                box.get(key, math.nan) for key in ("x", "y", "width", "height")
+            )
+            ids.append(data["id"])
+            self.id_offsets.append(self.id_offsets[-1] + len(data["id"]))
+            if (characters := data.get("characters")) is None:
+                self.text_spans.extend((-1, -1))
+            else:
+                self.text_spans.extend((text_length, text_length + len(characters)))
+                texts.append(characters)
+                text_length += len(characters)
+            if nested:
+                nested = sorted(nested, key=_reading_order)
+                stack.extend((child, position) for child in reversed(nested))
+        self.id_data = "".join(ids)
+        self.text_data = "".join(texts)
+        for nested in children:
+            self.children.extend(nested)
+            self.offsets.append(len(self.children))
+        for position in range(len(self.types) - 1, 0, -1):
+            parent = self.parents[position]
+            self.ends[parent] = max(self.ends[parent], self.ends[position])
+
+    @property
+    def root(self) -> CompactNode:
+        """
+        The DOCUMENT node.
+        """
+        return CompactNode(self, 0)
+
+    def node_id(self, position: int) -> str:
+        """
+        Get the ID of a node at a position.
+        """
+        return self.id_data[self.id_offsets[position] : self.id_offsets[position + 1]]
+
+    def characters(self, position: int) -> str | None:
+        """
+        Get the text characters of a node at a position, if any.
+        """
+        start, stop = self.text_spans[2 * position : 2 * position + 2]
+        return self.text_data[start:stop] if start != -1 else None
+
+    def _match(self, type: NodeType, pattern: str) -> list[int]:
+        """
+        Get the positions of all nodes of a type whose names match a pattern.
+        """
+        key = (type, pattern)
+        if (matches := self._matches.get(key)) is None:
+            if (positions := self._type_positions.get(type)) is None:
+                code = _CODES[type]
+                positions = array(
+                    "I", (i for i, value in enumerate(self.types) if value == code)
+                )
+                self._type_positions[type] = positions
+            regex = compile_pattern(pattern)
+            matches = [
+                position
+                for position in positions
+                if regex.search(self.name_table[self.names[position]])
+            ]
+            self._matches[key] = matches
+            if instrumentation.current is not None:
+                instrumentation.current.count("nodes_visited", len(positions))
+        return matches
+
+    def to_document(self) -> Document:
+        """
+        Materialise the whole tree as a document instance.
+        """
+        return Document(**self.root._data(), metadata=self.metadata)
+
+    def select_nodes(self, *args, **kwargs) -> Generator[CompactNode, None, None]:
+        """
+        Select descendant nodes of the root node, see `CompactNode.select_nodes`.
+        """
+        return self.root.select_nodes(*args, **kwargs)
+
+    def select_node(self, *args, **kwargs) -> CompactNode | None:
+        """
+        Select the first descendant node of the root node, see `CompactNode.select_node`.
+        """
+        return self.root.select_node(*args, **kwargs)
+
+    def select(self, selector: str) -> CompactNode | None:
+        """
+        Select the first descendant of the root node matching a selector, see
+        `CompactNode.select`.
+        """
+        return self.root.select(selector)
+
+    def select_all(self, selector: str) -> list[CompactNode]:
+        """
+        Select all descendants of the root node matching a selector, see
+        `CompactNode.select_all`.
+        """
+        return self.root.select_all(selector)
+
+    def display(self, depth: int = -1) -> None:
+        """
+        Display the document structure in a tree-like format.
+        """
+        self.root.display(depth)
+
+    def __str__(self) -> str:
+        return str(self.root)
+
+
+class CompactNode:
+    """
+    Thin view of a node stored in a compact document.
+
+    The view provides the properties used to extract frames and the same selection
+    API as `Node`, so that it can be passed to `from_node` of frames and components.
+    """
+
+    __slots__ = ("document", "position")
+
+    def __init__(self, document: CompactDocument, position: int):
+        self.document = document
+        self.position = position
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, CompactNode)
+            and self.document is other.document
+            and self.position == other.position
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.document), self.position))
+
+    def __repr__(self) -> str:
+        return f"CompactNode(id={self.id!r}, name={self.name!r}, type={self.type!r})"
+
+    @property
+    def id(self) -> str:
+        return self.document.node_id(self.position)
+
+    @property
+    def name(self) -> str:
+        return self.document.name_table[self.document.names[self.position]]
+
+    @property
+    def type(self) -> NodeType:
+        return _TYPES[self.document.types[self.position]]
+
+    @property
+    def visible(self) -> bool:
+        return bool(self.document.flags[self.position] & _VISIBLE)
+
+    @property
+    def characters(self) -> str | None:
+        return self.document.characters(self.position)
+
+    @property
+    def absoluteBoundingBox(self) -> dict | None:
+        box = self.document.boxes[4 * self.position : 4 * self.position + 4]
+        if all(map(math.isnan, box)):
+            return None
+        keys = ("x", "y", "width", "height")
+        return {key: value for key, value in zip(keys, box) if not math.isnan(value)}
+
+    @property
+    def children(self) -> list[CompactNode] | None:
+        document, position = self.document, self.position
+        if not document.flags[position] & _HAS_CHILDREN:
+            return None
+        start, stop = document.offsets[position], document.offsets[position + 1]
+        return [CompactNode(document, child) for child in document.children[start:stop]]
+
+    @property
+    def parent(self) -> CompactNode | None:
+        position = self.document.parents[self.position]
+        return CompactNode(self.document, position) if position != -1 else None
+
+    def __str__(self) -> str:
+        """
+        Return a human-readable string representation of the node as a tree-like structure.
+        """
+        return "\n".join(self._walk())
+
+    def _walk(self, level: int = 0, depth: int = -1) -> Generator[str, None, None]:
+        """
+        Walk the nodes to yield basic node information, see `Node._walk`.
+        """
+        if not self.visible:
+            return
+        if level > depth and depth != -1:
+            return
+        yield f"|{'-' * level} {self.type} ({self.name})"
+        for child in self.children or []:
+            yield from child._walk(level + 1, depth=depth)
+
+    def display(self, depth: int = -1) -> None:
+        """
+        Display the node structure in a tree-like format.
+        """
+        print("\n".join(self._walk(depth=depth)))
+
+    def select_nodes(
+        self,
+        type: NodeType,
+        pattern: str = ".+",
+        recursive: bool = True,
+    ) -> Generator[CompactNode, None, None]:
+        """
+        Select descendant nodes of a certain type whose names match a pattern,
+        see `Node.select_nodes`.
+        """
+        document, position = self.document, self.position
+        if not self.visible:
+            return
+        if not recursive:
+            regex = compile_pattern(pattern)
+            children = self.children or []
+            if instrumentation.current is not None:
+                instrumentation.current.count("nodes_visited", len(children))
+            for child in children:
+                if child.type == type and regex.search(child.name):
+                    yield child
+            return
+        matches = document._match(type, pattern)
+        end = document.ends[position]
+        for match in select_positions(matches, position, end, document.hidden):
+            yield CompactNode(document, match)
+
+    def select_node(
+        self,
+        type: NodeType,
+        pattern: str = ".+",
+        recursive: bool = True,
+    ) -> CompactNode | None:
+        """
+        Select the first descendant node of a certain type whose name matches
+        a pattern, see `Node.select_node`.
+        """
+        if instrumentation.current is not None:
+            instrumentation.current.count("select_node_calls")
+        return next(self.select_nodes(type, pattern, recursive), None)
+
+    def select(self, selector: str) -> CompactNode | None:
+        """
+        Select the first descendant node matching a selector, see `Node.select`.
+        """
+        return query(self, selector, first=True)
+
+    def select_all(self, selector: str) -> list[CompactNode]:
+        """
+        Select all descendant nodes matching a selector, see `Node.select_all`.
+        """
+        return query(self, selector, first=False)
+
+    def to_node(self) -> Node:
+        """
+        Materialise the subtree as a node model with the stored properties.
+        """
+        return Node(**self._data())
+
+    def _data(self) -> dict:
+        """
+        Get the stored properties of the subtree as a raw node.
+        """
+        root = self._properties()
+        stack = [(self, root)]
+        while stack:
+            node, data = stack.pop()
+            if (children := node.children) is not None:
+                nested = data["children"] = [child._properties() for child in children]
+                stack.extend(zip(children, nested))
+        return root
+
+    def _properties(self) -> dict:
+        """
+        Get the stored properties of the node without its children.
+        """
+        data = {"id": self.id, "name": self.name, "type": self.type}
+        if not self.visible:
+            data["visible"] = False
+        if (box := self.absoluteBoundingBox) is not None:
+            data["absoluteBoundingBox"] = box
+        if (characters := self.characters) is not None:
+            data["characters"] = characters
+        return data
@@ -2,13 +2,31 @@
 Reusable components used to create frame templates.
 """
 
-from typing import Literal
+from typing import ClassVar, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
 from .node import Node
+from .plan import ExtractionPlan, Select
+from .richtext import get_text
 
-__all__ = ["Image", "Intro", "Card", "LessonThumbnail", "Concept"]
+__all__ = ["ImageVariant", "Image", "Intro", "Card", "LessonThumbnail", "Concept"]
+
+
+class ImageVariant(BaseModel):
+    """
+    Resized variant of an image in another format, see `variants.VariantGenerator`.
+    """
+
+    url: str
+    width: int
+    type: str  # MIME type, e.g., "image/webp"
 
 
 class Image(BaseModel):
@@ -19,6 +37,25 @@ class Image(BaseModel):
     src: str
     caption: str | None = None
     url: str | None = None
+    # variants to choose from by width like in a `srcset` attribute
+    srcset: list[ImageVariant] | None = None
+
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        src=Select("RECTANGLE"),
+        caption=Select("TEXT"),
+    )
+    # ID of the node to export the image from, see `images.ImageExporter`
+    _node_id: str | None = PrivateAttr(default=None)
+
+    # the return type is not annotated to keep the fields in the JSON schema
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler):
+        data = handler(self)
+        # only images with variants have a srcset, so that the output of builds
+        # without variants is unchanged
+        if self.srcset is None:
+            data.pop("srcset", None)
+        return data
 
     @classmethod
     def from_node(cls, node: Node) -> "Image":
@@ -35,10 +72,13 @@ class Image(BaseModel):
         Image
             An instance of the Image class populated with data from the node.
         """
-        return cls(
-            src=node.select_node("RECTANGLE").name,
-            caption=node.select_node("TEXT").characters,
+        nodes = cls.plan.collect(node)
+        image = cls(
+            src=nodes["src"].name,
+            caption=nodes["caption"].characters,
         )
+        image._node_id = nodes["src"].id
+        return image
 
 
 class Intro(BaseModel):
@@ -49,6 +89,11 @@ class Intro(BaseModel):
     label: str
     number: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        label=Select("TEXT", "label"),
+        number=Select("TEXT", "number"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Intro":
         """
@@ -64,9 +109,10 @@ class Intro(BaseModel):
         Intro
             An instance of the Intro class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
-            label=node.select_node("TEXT", "label").characters.title(),
-            number=node.select_node("TEXT", "number").characters,
+            label=nodes["label"].characters.title(),
+            number=nodes["number"].characters,
         )
 
 
@@ -79,6 +125,12 @@ class Card(BaseModel):
     title: str
     description: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        image=Select("GROUP", "image"),
+        title=Select("TEXT", "title"),
+        description=Select("TEXT", "description"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Card":
         """
@@ -94,10 +146,11 @@ class Card(BaseModel):
         Card
             An instance of the Card class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
-            image=Image.from_node(node.select_node("GROUP", "image")),
-            title=node.select_node("TEXT", "title").characters,
-            description=node.select_node("TEXT", "description").characters,
+            image=Image.from_node(nodes["image"]),
+            title=nodes["title"].characters,
+            description=get_text(nodes["description"]),
         )
 
 
@@ -114,6 +167,12 @@ class LessonThumbnail(BaseModel):
     # type: str
     progress: Literal["completed", "in_progress", "not_started"]
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        progress=Select("RECTANGLE", "progress"),
+        title=Select("TEXT", "title"),
+        image=Select("GROUP", "image"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "LessonThumbnail":
         """
@@ -129,15 +188,16 @@ class LessonThumbnail(BaseModel):
         LessonThumbnail
             An instance of the LessonThumbnail class populated with data from the node.
         """
-        if node.select_node("RECTANGLE", "progress") is None:
+        nodes = cls.plan.collect(node)
+        if nodes["progress"] is None:
             progress = "not_started"
         # elif ...:
         #     progress = "in_progress"
         else:
             progress = "completed"
         return cls(
-            title=node.select_node("TEXT", "title").characters,
-            image=Image.from_node(node.select_node("GROUP", "image")),
+            title=nodes["title"].characters,
+            image=Image.from_node(nodes["image"]),
             progress=progress,
         )
 
@@ -151,6 +211,12 @@ class Concept(BaseModel):
     body: str
     source: str | None
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        title=Select("TEXT", "title"),
+        body=Select("TEXT", "body"),
+        source=Select("TEXT", "source"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Concept":
         """
@@ -166,14 +232,13 @@ class Concept(BaseModel):
         Concept
             An instance of the Concept class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
-            title=node.select_node("TEXT", "title").characters,
-            body=node.select_node("TEXT", "body").characters,
+            title=nodes["title"].characters,
+            body=get_text(nodes["body"]),
             # parse cta if it is available, otherwise, use None
             source=(
-                source.characters
-                if (source := node.select_node("TEXT", "source")) is not None
-                else None
+                get_text(source) if (source := nodes["source"]) is not None else None
             ),
         )
 
@@ -190,6 +255,14 @@ class NextBlock(BaseModel):
     image: Image
     # next_block_id: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        intro=Select("TEXT", "intro"),
+        title=Select("TEXT", "title"),
+        cta=Select("TEXT", "cta"),
+        button_cta=Select("TEXT", "buttonCta"),
+        image=Select("GROUP", "image"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "NextBlock":
         """
@@ -205,10 +278,11 @@ class NextBlock(BaseModel):
         NextBlock
             An instance of the NextBlock class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
-            intro=node.select_node("TEXT", "intro").characters,
-            title=node.select_node("TEXT", "title").characters,
-            cta=node.select_node("TEXT", "cta").characters,
-            button_cta=node.select_node("TEXT", "buttonCta").characters,
-            image=Image.from_node(node.select_node("GROUP", "image")),
+            intro=get_text(nodes["intro"]),
+            title=nodes["title"].characters,
+            cta=nodes["cta"].characters,
+            button_cta=nodes["button_cta"].characters,
+            image=Image.from_node(nodes["image"]),
         )
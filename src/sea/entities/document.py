@@ -2,24 +2,111 @@
 Document node type. See https://www.figma.com/developers/api#node-types.
 """
 
+import gzip
+import json
+import mmap
 import os
+from typing import BinaryIO, Generator
 
-import requests
+import orjson
 
+from .cache import FileCache
+from .client import FigmaClient
+from .index import NodeIndex
+from .instrumentation import span
 from .node import Node
+from .projection import Projection
+from .snapshot import Snapshot, save_snapshot
+from .stream import iter_nodes, load_document
 
 __all__ = ["Document"]
 
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _load_file(path: str | os.PathLike) -> dict:
+    """
+    Parse a JSON file, optionally compressed with gzip or zstd, from a memory map.
+    """
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+        memoryview(buffer) as view,
+    ):
+        if view[:2] == _GZIP_MAGIC:
+            with span("decompress"):
+                content = gzip.decompress(view)
+        elif view[:4] == _ZSTD_MAGIC:
+            try:
+                import zstandard  # optional dependency
+            except ImportError as error:
+                raise ImportError(
+                    f"{path} is compressed with zstd, install sea[zstd] to read it"
+                ) from error
+            with span("decompress"):
+                # the content size is not stored in frames written in a stream
+                with zstandard.ZstdDecompressor().stream_reader(view) as reader:
+                    content = reader.read()
+        else:
+            content = view
+        with span("parse"):
+            return orjson.loads(content)
+
 
 class Document(Node):
     """
     Document node type that can be instantiated from a Figma file key.
+
+    The document indexes its tree on creation, so that selecting nodes from the
+    document or any of its descendants does not require walking the tree.
     """
 
     metadata: dict
 
+    def model_post_init(self, __context) -> None:
+        super().model_post_init(__context)
+        NodeIndex(self)
+
+    def __copy__(self) -> "Document":
+        copied = super().__copy__()
+        NodeIndex(copied)
+        return copied
+
+    def __deepcopy__(self, memo: dict | None = None) -> "Document":
+        copied = super().__deepcopy__(memo)
+        NodeIndex(copied)
+        return copied
+
+    @property
+    def index(self) -> NodeIndex:
+        """
+        The index of the document tree.
+        """
+        return self._index
+
+    @classmethod
+    def _from_data(cls, data: dict, projection: Projection | None) -> "Document":
+        """
+        Create a document instance from a parsed Figma file response.
+        """
+        document = data.pop("document")
+        if projection is not None:
+            with span("project"):
+                projection.apply(document)
+        with span("validate"):
+            return cls(**document, metadata=data)
+
     @classmethod
-    def from_file_key(cls, key: str) -> "Document":
+    def from_file_key(
+        cls,
+        key: str,
+        stream: bool = False,
+        cache: FileCache | None = None,
+        refresh: bool = False,
+        client: FigmaClient | None = None,
+        projection: Projection | None = None,
+    ) -> "Document":
         """
         Factory class to create a document instance from a Figma file key.
 
@@ -27,16 +114,223 @@ class Document(Node):
         ----------
         key : str
             A file key to export JSON from.
+        stream : bool, default=False
+            If True, parse the response body in chunks as it is downloaded, see
+            `from_stream`, instead of loading the whole body at once.
+        cache : FileCache, optional
+            If provided, load the file from a cached snapshot, which is only
+            downloaded again if the file has changed.
+        refresh : bool, default=False
+            If True, download the file even if the cached snapshot is up to date.
+        client : FigmaClient, optional
+            Client to download the file with if it is not cached. Defaults to
+            the shared client.
+        projection : Projection, optional
+            If provided, drop node data unused by the extractors before the
+            nodes are validated, see `Projection`.
 
         Returns
         -------
         dict
             Node of type DOCUMENT as a JSON object.
         """
-        endpoint = f"https://api.figma.com/v1/files/{key}"
-        headers = {"X-Figma-Token": os.environ["FIGMA_API_KEY"]}
-        response = requests.get(endpoint, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        document = data.pop("document")
-        return cls(**document, metadata=data)
+        if cache is not None:
+            with gzip.open(cache.fetch(key, refresh=refresh)) as file:
+                if stream:
+                    return cls.from_stream(file, projection=projection)
+                with span("parse"):
+                    data = json.load(file)
+            return cls._from_data(data, projection)
+        client = client or FigmaClient.default()
+        response = client.get_file(key, stream=stream)
+        if stream:
+            with response:
+                return cls.from_stream(response.raw, projection=projection)
+        with span("parse"):
+            data = response.json()
+        return cls._from_data(data, projection)
+
+    @classmethod
+    def from_file(
+        cls, path: str | os.PathLike, projection: Projection | None = None
+    ) -> "Document":
+        """
+        Factory class to create a document instance from a local Figma JSON export.
+
+        The file is memory-mapped and parsed from the mapped bytes, so it is not
+        read into a string first. Files compressed with gzip or zstd, e.g.,
+        `file.json.gz` or `file.json.zst`, are detected by their content. Reading
+        zstd requires [zstandard](https://pypi.org/project/zstandard), e.g.,
+        `pip install sea[zstd]`.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to a response of the files endpoint of the Figma API.
+        projection : Projection, optional
+            If provided, drop node data unused by the extractors before the
+            nodes are validated, see `Projection`.
+
+        Returns
+        -------
+        Document
+            Document instance equal to the one created by `from_file_key`.
+        """
+        return cls._from_data(_load_file(path), projection)
+
+    def save_snapshot(self, path: str | os.PathLike) -> None:
+        """
+        Save the document to a binary snapshot that is fast to load.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to save the snapshot to.
+        """
+        save_snapshot(path, self, self.metadata)
+
+    @classmethod
+    def load_snapshot(cls, path: str | os.PathLike) -> "Document":
+        """
+        Factory class to create a document instance from a binary snapshot.
+
+        The snapshot is memory-mapped and its nodes are already validated and
+        sorted, so the models are constructed without validation, which is much
+        faster than parsing and validating the file again.
+
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to a snapshot saved with `save_snapshot`.
+
+        Returns
+        -------
+        Document
+            Document instance loaded from the snapshot.
+        """
+        snapshot = Snapshot(path)
+        with span("load_snapshot"):
+            return snapshot.to_tree(cls, index=True, metadata=snapshot.metadata)
+
+    @classmethod
+    def from_nodes(
+        cls,
+        key: str,
+        ids: list[str],
+        depth: int | None = None,
+        client: FigmaClient | None = None,
+        **params,
+    ) -> "Document":
+        """
+        Factory class to create a document instance from a subset of nodes in a Figma file.
+
+        Only the requested nodes and their descendants are downloaded. The nodes
+        become the children of the document, so that the document can be used in
+        the same way as the one created from the whole file.
+
+        Parameters
+        ----------
+        key : str
+            A file key to export JSON from.
+        ids : list[str]
+            IDs of the nodes to export, e.g., the IDs of the SECTION nodes to rebuild.
+        depth : int, optional
+            How deep into the node trees to traverse. If not set, the whole subtrees
+            are returned.
+        client : FigmaClient, optional
+            Client to download the nodes with. Defaults to the shared client.
+        **params
+            Other query parameters passed to the endpoint. Vector geometry is only
+            included if `geometry="paths"` is passed, so it is omitted by default.
+
+        Returns
+        -------
+        Document
+            Document with the requested nodes as children.
+        """
+        client = client or FigmaClient.default()
+        if depth is not None:
+            params["depth"] = depth
+        data = client.get_file_nodes(key, ids, **params)
+        nodes = data.pop("nodes")
+        # keep the components and styles used by the nodes as metadata
+        data["nodes"] = {
+            id: {name: value for name, value in node.items() if name != "document"}
+            for id, node in nodes.items()
+            if node is not None
+        }
+        children = [nodes[id]["document"] for id in ids if nodes.get(id) is not None]
+        return cls(
+            id="0:0",
+            name=data.get("name", "Document"),
+            type="DOCUMENT",
+            children=children,
+            metadata=data,
+        )
+
+    @classmethod
+    def from_stream(
+        cls,
+        source: BinaryIO,
+        depth: int = 2,
+        projection: Projection | None = None,
+    ) -> "Document":
+        """
+        Factory class to create a document instance from a Figma file response
+        read in chunks.
+
+        Nodes at the given depth are validated as soon as they are read, so the
+        peak memory is bounded by the largest of such nodes rather than the file.
+
+        Parameters
+        ----------
+        source : BinaryIO
+            File-like object with a Figma file response, e.g., an open file or
+            a raw HTTP response.
+        depth : int, default=2
+            Depth at which nodes are validated incrementally. Pages (CANVAS) are
+            at depth `1` and top-level nodes on each page are at depth `2`.
+        projection : Projection, optional
+            If provided, drop node data unused by the extractors before the
+            nodes are validated, see `Projection`.
+
+        Returns
+        -------
+        Document
+            Document instance built from the response.
+        """
+        # nodes are validated while the stream is parsed
+        with span("parse+validate"):
+            document, metadata = load_document(source, depth, projection)
+            return cls(**document, metadata=metadata)
+
+    @staticmethod
+    def iter_file_key(
+        key: str,
+        depth: int = 2,
+        client: FigmaClient | None = None,
+    ) -> Generator[Node, None, None]:
+        """
+        Stream nodes at a given depth from a Figma file one at a time.
+
+        Only one such node is kept in memory at once, which makes it possible to
+        process large files one page (CANVAS) or section (SECTION) at a time.
+
+        Parameters
+        ----------
+        key : str
+            A file key to export JSON from.
+        depth : int, default=2
+            Depth of the nodes to yield. Pages (CANVAS) are at depth `1` and
+            top-level nodes on each page, e.g., SECTION, are at depth `2`.
+        client : FigmaClient, optional
+            Client to download the file with. Defaults to the shared client.
+
+        Yields
+        ------
+        Node
+            Nodes at the given depth in the order they appear in the file.
+        """
+        client = client or FigmaClient.default()
+        with client.get_file(key, stream=True) as response:
+            yield from iter_nodes(response.raw, depth)
@@ -2,14 +2,22 @@
 Individual frames to be converted to JSON templates.
 """
 
-from typing import Literal
+from functools import cache
+from typing import ClassVar, Literal
 
 from pydantic import BaseModel, Field
+from pydantic_core import SchemaSerializer, core_schema
 
 from .components import Card, Concept, Image, Intro, LessonThumbnail, NextBlock
+from .instrumentation import timed
 from .node import Node
+from .plan import ExtractionPlan, Select
+from .richtext import get_text
 
 __all__ = [
+    "FRAMES",
+    "register",
+    "dump_contents",
     "Cover",
     "ModuleText",
     "LearningObjectives",
@@ -22,14 +30,52 @@ __all__ = [
 ]
 
 
+# registry of frame classes by the template names of frame nodes
+FRAMES: dict[str, type["FrameBase"]] = {}
+
+
+def register(*names: str):
+    """
+    Register a frame class for frame nodes with the given template names.
+
+    Parameters
+    ----------
+    *names : str
+        Names of frame nodes in Figma, e.g., "module_cover".
+
+    Returns
+    -------
+    Callable
+        Class decorator that adds the class to `FRAMES`.
+    """
+
+    def decorator(cls: type[FrameBase]) -> type[FrameBase]:
+        for name in names:
+            FRAMES[name] = cls
+        return cls
+
+    return decorator
+
+
 class FrameBase(BaseModel):
     """
     Base class all frames inherit from.
+
+    Body texts of frames and components, e.g., `TextElement.text`, are extracted
+    as plain text or with their styles in the format set by `text_format`.
     """
 
     id: str = Field(alias="template_id")
     colorscheme: Literal["light", "dark"] | None = Field(default=None)
 
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        # time the extraction of each frame class, see `instrumentation.instrument`
+        if isinstance(method := cls.__dict__.get("from_node"), classmethod):
+            cls.from_node = classmethod(timed("from_node")(method.__func__))
+
+    @timed("to_content")
     def to_content(self) -> dict:
         """
         Dumpt the model to a dictionary with content.
@@ -43,7 +89,93 @@ class FrameBase(BaseModel):
         content = self.model_dump(exclude=fields)
         return self.model_dump(include=fields) | {"content": content}
 
+    @timed("to_content")
+    def to_content_json(self) -> bytes:
+        """
+        Serialise the model to JSON with content in a single pass.
+
+        The output is the same as JSON-encoding the dictionary returned by
+        `to_content`, without building the dictionary first.
+
+        Returns
+        -------
+        bytes
+            The JSON object with non-metadata fields wrapped in "content".
+        """
+        serializer = get_content_serializer(type(self))
+        return serializer.to_json(
+            {"id": self.id, "colorscheme": self.colorscheme, "content": self},
+            by_alias=False,
+        )
+
+
+@cache
+def get_content_serializer(cls: type[FrameBase]) -> SchemaSerializer:
+    """
+    Build the serialiser of frames of a class wrapped as in `FrameBase.to_content`.
+
+    The metadata fields are excluded from the schema of the class itself rather
+    than for each call, and the serialiser is cached per class.
+
+    Parameters
+    ----------
+    cls : type[FrameBase]
+        Frame class to build the serialiser for.
+
+    Returns
+    -------
+    SchemaSerializer
+        Serialiser of dictionaries with "id", "colorscheme" and "content" keys,
+        where "content" is an instance of the class.
+    """
+    schema = cls.__pydantic_core_schema__
+    if schema["type"] != "model" or schema["schema"]["type"] != "model-fields":
+        raise TypeError(f"Unsupported schema of {cls.__name__}")
+    fields = schema["schema"]["fields"]
+    content = schema | {
+        "schema": schema["schema"]
+        | {
+            "fields": {
+                name: (
+                    field | {"serialization_exclude": True}
+                    if name in FrameBase.model_fields
+                    else field
+                )
+                for name, field in fields.items()
+            }
+        }
+    }
+    # avoid clashing with the reference of the original schema
+    content.pop("ref", None)
+    return SchemaSerializer(
+        core_schema.typed_dict_schema(
+            {
+                name: core_schema.typed_dict_field(fields[name]["schema"])
+                for name in FrameBase.model_fields
+            }
+            | {"content": core_schema.typed_dict_field(content)}
+        )
+    )
+
+
+def dump_contents(frames: list[FrameBase]) -> bytes:
+    """
+    Serialise frames of any classes to a JSON array of their contents.
+
+    Parameters
+    ----------
+    frames : list[FrameBase]
+        Frames to serialise.
+
+    Returns
+    -------
+    bytes
+        JSON array of the frames as returned by `FrameBase.to_content_json`.
+    """
+    return b"[" + b",".join(frame.to_content_json() for frame in frames) + b"]"
+
 
+@register("module_cover", "chapter_cover", "lesson_cover", "lesson_part_cover")
 class Cover(FrameBase):
     """
     Cover frame for a module, chapter, lesson or lesson part.
@@ -54,6 +186,14 @@ class Cover(FrameBase):
     title: str
     cta: str | None = Field(default="Scroll, tab or use your keyboard to move ahead")
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        module=Select("GROUP", "module|chapter|lesson"),
+        intro=Select("TEXT", "intro"),
+        image=Select("GROUP", "image"),
+        title=Select("TEXT", "title"),
+        cta=Select("TEXT", "cta"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Cover":
         """
@@ -70,23 +210,20 @@ class Cover(FrameBase):
             An instance of the Cover class populated with data from the node.
         """
         assert node.name.endswith("_cover"), f"Expected a cover node, not {node.name}"
+        nodes = cls.plan.collect(node)
         # parse the intro
-        if (module_node := node.select_node("GROUP", "module|chapter|lesson")) is None:
+        if (module_node := nodes["module"]) is None:
             # handle lesson_part_cover that uses a single string instead
-            intro = node.select_node("TEXT", "intro").characters
+            intro = get_text(nodes["intro"])
         else:
             intro = Intro.from_node(module_node)
         return cls(
             template_id=node.name,
-            image=Image.from_node(node.select_node("GROUP", "image")),
+            image=Image.from_node(nodes["image"]),
             intro=intro,
-            title=node.select_node("TEXT", "title").characters,
+            title=nodes["title"].characters,
             # parse cta if it is available, otherwise, use None
-            cta=(
-                cta.characters
-                if (cta := node.select_node("TEXT", "cta")) is not None
-                else None
-            ),
+            cta=cta.characters if (cta := nodes["cta"]) is not None else None,
         )
 
 
@@ -97,6 +234,8 @@ class TextElement(FrameBase):
 
     text: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(text=Select("TEXT", "text"))
+
     @classmethod
     def from_node(cls, node: Node) -> "TextElement":
         """
@@ -114,10 +253,11 @@ class TextElement(FrameBase):
         """
         return cls(
             template_id=node.name,
-            text=node.select_node("TEXT", "text").characters,
+            text=get_text(cls.plan.collect(node)["text"]),
         )
 
 
+@register("text")
 class ModuleText(FrameBase):
     """
     Module text frame.
@@ -125,6 +265,10 @@ class ModuleText(FrameBase):
 
     content: list[TextElement]
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        content=Select("GROUP", many=True),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "ModuleText":
         """
@@ -143,10 +287,11 @@ class ModuleText(FrameBase):
         return cls(
             template_id="text",
             colorscheme="dark",
-            content=map(TextElement.from_node, node.select_nodes("GROUP")),
+            content=map(TextElement.from_node, cls.plan.collect(node)["content"]),
         )
 
 
+@register("learning_objectives", "key_takeaways")
 class LearningObjectives(FrameBase):
     """
     Learning objectives frame, also used for key takeaways.
@@ -156,6 +301,12 @@ class LearningObjectives(FrameBase):
     intro: str
     cards: list[Card]  # use a generic name instead of objectives or takeaways
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        title=Select("TEXT", "title"),
+        intro=Select("TEXT", "intro"),
+        cards=Select("GROUP", "objectives", many=True),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "LearningObjectives":
         """
@@ -175,14 +326,16 @@ class LearningObjectives(FrameBase):
             "learning_objectives",
             "key_takeaways",
         }, f"Node '{node.name}' is not supported"
+        nodes = cls.plan.collect(node)
         return cls(
             template_id=node.name,
-            title=node.select_node("TEXT", "title").characters,
-            intro=node.select_node("TEXT", "intro").characters,
-            cards=map(Card.from_node, node.select_nodes("GROUP", "objectives")),
+            title=nodes["title"].characters,
+            intro=get_text(nodes["intro"]),
+            cards=map(Card.from_node, nodes["cards"]),
         )
 
 
+@register("connection_next")
 class ConnectionNext(FrameBase):
     """
     Next connection frame.
@@ -194,6 +347,13 @@ class ConnectionNext(FrameBase):
     cta: str = Field(default="Start learning")
     # next_lesson_id: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        image=Select("GROUP", "image"),
+        intro=Select("TEXT", "intro"),
+        title=Select("TEXT", "title"),
+        cta=Select("TEXT", "cta"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "ConnectionNext":
         """
@@ -209,15 +369,17 @@ class ConnectionNext(FrameBase):
         ConnectionContent
             An instance of the ConnectionContent class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
             template_id="connection_next",
-            image=Image.from_node(node.select_node("GROUP", "image")),
-            intro=node.select_node("TEXT", "intro").characters,
-            title=node.select_node("TEXT", "title").characters,
-            cta=node.select_node("TEXT", "cta").characters,
+            image=Image.from_node(nodes["image"]),
+            intro=get_text(nodes["intro"]),
+            title=nodes["title"].characters,
+            cta=nodes["cta"].characters,
         )
 
 
+@register("list_of_lessons")
 class LessonOverview(FrameBase):
     """
     Lesson overview frame.
@@ -226,6 +388,11 @@ class LessonOverview(FrameBase):
     title: str
     lessons: list[LessonThumbnail]
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        title=Select("TEXT", "title"),
+        lessons=Select("GROUP", "lessons", many=True),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "LessonOverview":
         """
@@ -241,15 +408,15 @@ class LessonOverview(FrameBase):
         LessonOverview
             An instance of the LessonOverview class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
             template_id="list_of_lessons",
-            title=node.select_node("TEXT", "title").characters,
-            lessons=map(
-                LessonThumbnail.from_node, node.select_nodes("GROUP", "lessons")
-            ),
+            title=nodes["title"].characters,
+            lessons=map(LessonThumbnail.from_node, nodes["lessons"]),
         )
 
 
+@register("key_concepts")
 class KeyConcepts(FrameBase):
     """
     Key concepts frame.
@@ -259,6 +426,12 @@ class KeyConcepts(FrameBase):
     intro: str
     concepts: list[Concept]
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        title=Select("TEXT", "title"),
+        intro=Select("TEXT", "intro"),
+        concepts=Select("GROUP", "concepts", many=True),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "KeyConcepts":
         """
@@ -274,15 +447,17 @@ class KeyConcepts(FrameBase):
         KeyConcepts
             An instance of the KeyConcepts class populated with data from the node.
         """
+        nodes = cls.plan.collect(node)
         return cls(
             template_id="key_concepts",
             colorscheme="dark",
-            title=node.select_node("TEXT", "title").characters,
-            intro=node.select_node("TEXT", "intro").characters,
-            concepts=map(Concept.from_node, node.select_nodes("GROUP", "concepts")),
+            title=nodes["title"].characters,
+            intro=get_text(nodes["intro"]),
+            concepts=map(Concept.from_node, nodes["concepts"]),
         )
 
 
+@register("photo-vertical")
 class PhotoVertical(FrameBase):
     """
     Photo vertical frame.
@@ -312,6 +487,7 @@ class PhotoVertical(FrameBase):
         )
 
 
+@register("quote_large_with_name")
 class Quote(FrameBase):
     """
     Large quote with a name frame.
@@ -320,6 +496,11 @@ class Quote(FrameBase):
     quote: str
     author: str
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        quote=Select("TEXT", "quote"),
+        author=Select("TEXT", "author"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Quote":
         """
@@ -336,13 +517,15 @@ class Quote(FrameBase):
             An instance of the Quote class populated with data from the node.
         """
         assert node.name.startswith("quote_"), f"Expected a quote node, not {node.name}"
+        nodes = cls.plan.collect(node)
         return cls(
             template_id=node.name,
-            quote=node.select_node("TEXT", "quote").characters,
-            author=node.select_node("TEXT", "author").characters,
+            quote=nodes["quote"].characters,
+            author=nodes["author"].characters,
         )
 
 
+@register("module_outro", "chapter_outro")
 class Outro(FrameBase):
     """
     Outro frame for a module or chapter.
@@ -354,6 +537,14 @@ class Outro(FrameBase):
     body: str
     next_block: NextBlock
 
+    plan: ClassVar[ExtractionPlan] = ExtractionPlan(
+        first_line=Select("TEXT", "first_line"),
+        intro=Select("TEXT", "intro"),
+        subtitle=Select("TEXT", "subtitle"),
+        body=Select("TEXT", "body"),
+        next_block=Select("GROUP", "quiz"),
+    )
+
     @classmethod
     def from_node(cls, node: Node) -> "Outro":
         """
@@ -370,17 +561,18 @@ class Outro(FrameBase):
             An instance of the Outro class populated with data from the node.
         """
         assert node.name.endswith("_outro"), f"Expected an outro node, not {node.name}"
+        nodes = cls.plan.collect(node)
         title = " ".join(
             [
-                node.select_node("TEXT", "first_line").characters,
-                node.select_node("TEXT", "first_line").characters,
+                nodes["first_line"].characters,
+                nodes["first_line"].characters,
             ]
         )
         return cls(
             template_id=node.name,
-            intro=node.select_node("TEXT", "intro").characters,
+            intro=get_text(nodes["intro"]),
             title=title,
-            subtitle=node.select_node("TEXT", "subtitle").characters,
-            body=node.select_node("TEXT", "body").characters,
-            next_block=NextBlock.from_node(node.select_node("GROUP", "quiz")),
+            subtitle=nodes["subtitle"].characters,
+            body=get_text(nodes["body"]),
+            next_block=NextBlock.from_node(nodes["next_block"]),
         )
@@ -0,0 +1,82 @@
+"""
+Content hashes of node subtrees used to detect changes between file versions.
+"""
+
+import hashlib
+import json
+
+from .node import Node
+
+__all__ = ["HASHED_FIELDS", "content_hash"]
+
+# node properties read by frame and component extractors, including the styles
+# of rich text, see `richtext.get_text`
+HASHED_FIELDS = (
+    "type",
+    "name",
+    "visible",
+    "characters",
+    "style",
+    "characterStyleOverrides",
+    "styleOverrideTable",
+    "lineTypes",
+    "lineIndentations",
+)
+
+
+def _digest(node: Node, children: list[str]) -> str:
+    """
+    Compute the hash of a node from its own properties and the hashes of its children.
+    """
+    values = [getattr(node, field, None) for field in HASHED_FIELDS]
+    payload = json.dumps([values, children], separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _hash_tree(root: Node) -> dict[int, str]:
+    """
+    Compute hashes of all nodes in a tree bottom-up without recursion.
+
+    Returns
+    -------
+    dict[int, str]
+        Mapping from the object ID of a node to its hash.
+    """
+    hashes = {}
+    stack = [(root, None)]
+    while stack:
+        node, children = stack.pop()
+        if children is None:
+            # keep the children on the stack until their parent is hashed
+            children = node.children or []
+            stack.append((node, children))
+            stack.extend((child, None) for child in children)
+        else:
+            hashes[id(node)] = _digest(node, [hashes[id(child)] for child in children])
+    return hashes
+
+
+def content_hash(node: Node) -> str:
+    """
+    Get a stable hash of the content of a node subtree.
+
+    The hash is computed Merkle-style from the properties read by extractors and
+    the hashes of the children in the reading order, so that it only changes if
+    the subtree has changed. For indexed nodes, hashes of the whole document are
+    computed once and reused.
+
+    Parameters
+    ----------
+    node : Node
+        Root node of the subtree.
+
+    Returns
+    -------
+    str
+        Hexadecimal hash of the subtree.
+    """
+    if (index := node.__pydantic_private__["_index"]) is None:
+        return _hash_tree(node)[id(node)]
+    if index.hashes is None:
+        index.hashes = _hash_tree(index.nodes[0])
+    return index.hashes[id(node)]
@@ -0,0 +1,308 @@
+"""
+Export of images rendered by Figma into a content-addressed cache on disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Generator, Literal
+
+from pydantic import BaseModel
+
+from .client import FigmaClient
+from .components import Image, ImageVariant
+from .node import Node
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+__all__ = ["ImageExporter", "collect_images", "resolve_images"]
+
+
+@contextmanager
+def _lock(path: Path) -> Generator[None, None, None]:
+    """
+    Hold an exclusive lock on a file across processes where supported.
+    """
+    with open(path, "a") as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def collect_images(node: Node) -> list[Node]:
+    """
+    Collect visible nodes with image fills in the reading order.
+
+    Parameters
+    ----------
+    node : Node
+        Root node of the subtree to collect from, e.g., a document.
+
+    Returns
+    -------
+    list[Node]
+        Nodes with at least one fill of type IMAGE.
+    """
+    images = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if not node.visible:
+            continue
+        fills = (node.__pydantic_extra__ or {}).get("fills") or []
+        if any(fill.get("type") == "IMAGE" for fill in fills):
+            images.append(node)
+        stack.extend(reversed(node.children or []))
+    return images
+
+
+def resolve_images(
+    model: BaseModel,
+    urls: dict[str, str],
+    srcsets: dict[str, list[ImageVariant]] | None = None,
+) -> BaseModel:
+    """
+    Write URLs of exported images into the `Image` models nested in a model.
+
+    Parameters
+    ----------
+    model : BaseModel
+        Frame or component whose images to resolve.
+    urls : dict[str, str]
+        URLs or paths of exported images by node ID, see `ImageExporter.export`.
+    srcsets : dict[str, list[ImageVariant]], optional
+        Variants of exported images by node ID, see `VariantGenerator.generate`.
+
+    Returns
+    -------
+    BaseModel
+        The same model, modified in place.
+    """
+    stack = [model]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Image):
+            if (url := urls.get(value._node_id)) is not None:
+                value.url = url
+            if srcsets and (srcset := srcsets.get(value._node_id)) is not None:
+                value.srcset = srcset
+        elif isinstance(value, BaseModel):
+            stack.extend(getattr(value, name) for name in type(value).model_fields)
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return model
+
+
+class ImageExporter:
+    """
+    Exporter of nodes rendered as images by the Figma images endpoint.
+
+    Images are stored under the SHA-256 digest of their content, so identical
+    images are stored once. A manifest maps a key of the properties that affect
+    the rendering of a node to the stored image, so that nodes which have not
+    changed since a previous export are neither rendered nor downloaded again.
+
+    Renders are requested in batches of many node IDs per request and the
+    rendered images are downloaded concurrently over the pooled session of the
+    client, starting as soon as each batch is rendered.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        client: FigmaClient | None = None,
+        format: Literal["png", "jpg", "svg", "pdf"] = "png",
+        scale: float = 1.0,
+        batch_size: int = 100,
+        workers: int = 8,
+        base_url: str | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        directory : str | os.PathLike, optional
+            Directory to store the images in. Defaults to `images` directory in
+            `SEA_CACHE_DIR` environment variable or `~/.cache/sea`.
+        client : FigmaClient, optional
+            Client to render and download the images with. Defaults to the shared
+            client.
+        format : Literal["png", "jpg", "svg", "pdf"], default="png"
+            Format of the rendered images.
+        scale : float, default=1.0
+            Scale of the rendered images between 0.01 and 4.
+        batch_size : int, default=100
+            Maximum number of node IDs per render request.
+        workers : int, default=8
+            Number of concurrent downloads.
+        base_url : str, optional
+            URL the directory is served at. If provided, images are resolved to
+            URLs relative to it instead of local paths.
+        """
+        if directory is None:
+            directory = Path(os.getenv("SEA_CACHE_DIR", "~/.cache/sea"), "images")
+        self.directory = Path(directory).expanduser()
+        self.client = client
+        self.format = format
+        self.scale = scale
+        self.batch_size = batch_size
+        self.workers = workers
+        self.base_url = base_url.rstrip("/") if base_url is not None else None
+        self.manifest_path = self.directory / "manifest.json"
+        if self.manifest_path.exists():
+            self.manifest: dict[str, str] = json.loads(self.manifest_path.read_text())
+        else:
+            self.manifest = {}
+        self.downloaded = 0
+        # names of the stored images by node ID after an export
+        self.names: dict[str, str] = {}
+        # errors of the downloads that failed by node ID after an export
+        self.failed: dict[str, str] = {}
+
+    def get_key(self, node: Node) -> str:
+        """
+        Get a key of the properties that affect the rendering of a node.
+        """
+        extra = node.__pydantic_extra__ or {}
+        box = extra.get("absoluteBoundingBox") or {}
+        payload = [
+            node.type,
+            node.rotation,
+            extra.get("fills"),
+            extra.get("strokes"),
+            box.get("width"),
+            box.get("height"),
+            self.format,
+            self.scale,
+        ]
+        payload = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get_path(self, name: str) -> Path:
+        """
+        Get the path of a stored image by its name, i.e., digest and extension.
+        """
+        return self.directory / name[:2] / name
+
+    def get_url(self, name: str) -> str:
+        """
+        Get the URL or path an image is resolved to.
+        """
+        if self.base_url is None:
+            return str(self.get_path(name))
+        return f"{self.base_url}/{name[:2]}/{name}"
+
+    def store(self, content: bytes) -> str:
+        """
+        Store an image under the digest of its content.
+
+        Returns
+        -------
+        str
+            Name of the stored image.
+        """
+        name = f"{hashlib.sha256(content).hexdigest()}.{self.format}"
+        path = self.get_path(name)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first not to leave partial images
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+                try:
+                    file.write(content)
+                except BaseException:
+                    file.close()
+                    os.unlink(file.name)
+                    raise
+            os.replace(file.name, path)
+        return name
+
+    def export(self, key: str, nodes: list[Node]) -> dict[str, str]:
+        """
+        Export nodes of a Figma file as images.
+
+        Parameters
+        ----------
+        key : str
+            Key of the Figma file the nodes belong to.
+        nodes : list[Node]
+            Nodes to export, e.g., as returned by `collect_images`.
+
+        Returns
+        -------
+        dict[str, str]
+            URLs or paths of the images by node ID. Nodes that failed to render
+            or download are omitted, see `failed`.
+        """
+        client = self.client or FigmaClient.default()
+        keys = {node.id: self.get_key(node) for node in nodes}
+        # render one node per key that has not been exported yet
+        pending: dict[str, str] = {}
+        for id, image_key in keys.items():
+            name = self.manifest.get(image_key)
+            if name is None or not self.get_path(name).exists():
+                pending.setdefault(image_key, id)
+        ids = list(pending.values())
+        self.failed = {}
+        try:
+            with ThreadPoolExecutor(self.workers) as pool:
+                futures = {}
+                for start in range(0, len(ids), self.batch_size):
+                    batch = ids[start : start + self.batch_size]
+                    urls = client.get_images(
+                        key, batch, format=self.format, scale=self.scale
+                    )
+                    for id in batch:
+                        if (url := urls.get(id)) is not None:
+                            futures[id] = pool.submit(client.download, url)
+                for id, future in futures.items():
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        # other images are still stored and added to the manifest
+                        self.failed[id] = f"{type(e).__name__}: {e}"
+                        continue
+                    self.manifest[keys[id]] = self.store(content)
+                    self.downloaded += 1
+        finally:
+            # keep the images stored so far even if a render request fails
+            self.save()
+        self.names = {
+            id: self.manifest[image_key]
+            for id, image_key in keys.items()
+            if image_key in self.manifest
+        }
+        return {id: self.get_url(name) for id, name in self.names.items()}
+
+    def save(self) -> None:
+        """
+        Save the manifest of exported images.
+
+        The manifest is merged with the one on disk under a file lock, so that
+        exporters in other processes sharing the directory, e.g., files built on
+        a process pool, do not drop each other's images.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _lock(self.directory / "manifest.lock"):
+            if self.manifest_path.exists():
+                saved = json.loads(self.manifest_path.read_text())
+            else:
+                saved = {}
+            # copy the manifest, which may be updated by exports in other threads
+            manifest = saved | dict(self.manifest)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.directory, delete=False, suffix=".json"
+            ) as file:
+                json.dump(manifest, file)
+            os.replace(file.name, self.manifest_path)
+        for image_key, name in saved.items():
+            self.manifest.setdefault(image_key, name)
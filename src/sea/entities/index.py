@@ -0,0 +1,226 @@
+"""
+Inverted index of a node tree used to select nodes without walking the tree.
+"""
+
+from __future__ import annotations  # allow forward references
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import TYPE_CHECKING, Generator, Sequence
+
+from . import instrumentation
+
+if TYPE_CHECKING:
+    from .node import Node, NodeType
+
+__all__ = ["NodeIndex", "select_positions"]
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile a regex pattern for matching node names, caching the result.
+    """
+    return re.compile(pattern)
+
+
+def select_positions(
+    matches: Sequence[int],
+    position: int,
+    end: int,
+    hidden: Sequence[int],
+) -> Generator[int, None, None]:
+    """
+    Select the positions of matching nodes within a subtree in the pre-order.
+
+    Parameters
+    ----------
+    matches : Sequence[int]
+        Sorted positions of all matching nodes in the tree.
+    position : int
+        Position of the root node of the subtree.
+    end : int
+        Position of the last descendant of the root node of the subtree.
+    hidden : Sequence[int]
+        Position of the deepest invisible ancestor of each node, -1 if there is none.
+
+    Yields
+    ------
+    int
+        Positions of the matching descendants that are not nested in an invisible
+        node within the subtree.
+    """
+    start = bisect_right(matches, position)
+    stop = bisect_right(matches, end, lo=start)
+    # only the matches within the subtree are visited, not all its descendants
+    if instrumentation.current is not None:
+        instrumentation.current.count("nodes_visited", stop - start)
+    for match in matches[start:stop]:
+        if hidden[match] < position:
+            yield match
+
+
+class NodeIndex:
+    """
+    Index of a node tree by node type with parent and ancestry links.
+
+    Nodes are numbered in the pre-order of the tree, in which children are already
+    stored in the reading order. A subtree then occupies a contiguous range of
+    positions, so that its descendants of a given type can be found by bisecting
+    the list of positions of that type.
+
+    The index is built once and assumes the tree is not modified afterwards.
+    """
+
+    def __init__(self, root: Node | None = None):
+        self.nodes: list[Node] = []
+        # position of the parent node, -1 for the root
+        self.parents: list[int] = []
+        # position of the last descendant of a node
+        self.ends: list[int] = []
+        # position of the deepest invisible ancestor of a node, -1 if there is none
+        self.hidden: list[int] = []
+        self.positions: dict[int, int] = {}
+        self.types: dict[str, list[int]] = {}
+        self._matches: dict[tuple[str, str], list[int]] = {}
+        # content hashes by the object ID of a node, see `hashing.content_hash`
+        self.hashes: dict[int, str] | None = None
+        # results of selectors by the root position, see `selector.query`
+        self.memo: dict[tuple, object] = {}
+        if root is not None:
+            self._build(root)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        nodes: list[Node],
+        parents: Sequence[int],
+        ends: Sequence[int],
+        hidden: Sequence[int],
+    ) -> NodeIndex:
+        """
+        Create an index from nodes already numbered in the pre-order, e.g., loaded
+        from a snapshot, without walking the tree.
+
+        The nodes are not linked to the index, which is left to the caller.
+        """
+        index = cls()
+        index.nodes = nodes
+        index.parents = list(parents)
+        index.ends = list(ends)
+        index.hidden = list(hidden)
+        index.positions = {id(node): position for position, node in enumerate(nodes)}
+        for position, node in enumerate(nodes):
+            index.types.setdefault(node.type, []).append(position)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _build(self, root: Node) -> None:
+        """
+        Number the nodes in pre-order and link each node to the index.
+        """
+        stack = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            position = len(self.nodes)
+            self.nodes.append(node)
+            self.parents.append(parent)
+            self.ends.append(position)
+            if parent == -1:
+                self.hidden.append(-1)
+            elif not self.nodes[parent].visible:
+                self.hidden.append(parent)
+            else:
+                self.hidden.append(self.hidden[parent])
+            self.positions[id(node)] = position
+            self.types.setdefault(node.type, []).append(position)
+            node.__pydantic_private__["_index"] = self
+            if node.children:
+                stack.extend((child, position) for child in reversed(node.children))
+        # propagate the subtree ends from the leaves upwards
+        for position in range(len(self.nodes) - 1, 0, -1):
+            parent = self.parents[position]
+            self.ends[parent] = max(self.ends[parent], self.ends[position])
+
+    def _match(self, type: NodeType, pattern: str) -> list[int]:
+        """
+        Get the positions of all nodes of a type whose names match a pattern.
+        """
+        key = (type, pattern)
+        if (matches := self._matches.get(key)) is None:
+            regex = compile_pattern(pattern)
+            positions = self.types.get(type, [])
+            matches = [
+                position
+                for position in positions
+                if regex.search(self.nodes[position].name)
+            ]
+            self._matches[key] = matches
+            if instrumentation.current is not None:
+                instrumentation.current.count("nodes_visited", len(positions))
+        return matches
+
+    def select_nodes(
+        self,
+        node: Node,
+        type: NodeType,
+        pattern: str = ".+",
+        recursive: bool = True,
+    ) -> Generator[Node, None, None]:
+        """
+        Select descendant nodes of a certain type whose names match a pattern.
+
+        The nodes are yielded in the same order as `Node.select_nodes`.
+
+        Parameters
+        ----------
+        node : Node
+            The node whose descendants to select.
+        type : NodeType
+            Node type to filter.
+        pattern : str, default=".+"
+            Regex pattern to match against node names.
+        recursive : bool, default=True
+            If True, select all descendant nodes that match the criteria,
+            otherwise only select from immediate descendants.
+
+        Yields
+        ------
+        Node
+            Matching nodes of a given type.
+        """
+        if not node.visible:
+            return
+        if not recursive:
+            regex = compile_pattern(pattern)
+            if instrumentation.current is not None:
+                instrumentation.current.count("nodes_visited", len(node.children or []))
+            for child in node.children or []:
+                if child.type == type and regex.search(child.name):
+                    yield child
+            return
+        position = self.positions[id(node)]
+        matches = self._match(type, pattern)
+        for match in select_positions(
+            matches, position, self.ends[position], self.hidden
+        ):
+            yield self.nodes[match]
+
+    def parent(self, node: Node) -> Node | None:
+        """
+        Get the parent of a node or None for the root node.
+        """
+        position = self.parents[self.positions[id(node)]]
+        return self.nodes[position] if position != -1 else None
+
+    def ancestors(self, node: Node) -> Generator[Node, None, None]:
+        """
+        Yield the ancestors of a node starting from its parent up to the root.
+        """
+        position = self.parents[self.positions[id(node)]]
+        while position != -1:
+            yield self.nodes[position]
+            position = self.parents[position]
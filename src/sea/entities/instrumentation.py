@@ -0,0 +1,318 @@
+"""
+Opt-in instrumentation of traversals, frame extraction and fetches.
+
+Hooks in the hot paths only check whether `current` is set, so the overhead is
+negligible unless the instrumentation is enabled with `instrument`.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Generator
+
+from pydantic import BaseModel, Field
+
+__all__ = ["Stats", "Instrumentation", "instrument", "span", "timed"]
+
+# instrumentation enabled by `instrument`, if any
+current: "Instrumentation | None" = None
+
+
+class TimingStats(BaseModel):
+    """
+    Wall time statistics of repeated calls.
+    """
+
+    calls: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean wall time of a call in seconds.
+        """
+        return self.total / self.calls if self.calls else 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the wall time of a call in seconds.
+        """
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+class ExtractorStats(BaseModel):
+    """
+    Statistics of a frame class, or of the work outside of any frame class.
+    """
+
+    # nodes examined by traversals and selections, i.e., with an index, the
+    # nodes of the selected type rather than every descendant
+    nodes_visited: int = 0
+    select_node_calls: int = 0
+    from_node: TimingStats = Field(default_factory=TimingStats)
+    to_content: TimingStats = Field(default_factory=TimingStats)
+
+
+class FetchStats(TimingStats):
+    """
+    Latency and payload size of requests to an endpoint.
+    """
+
+    bytes: int = 0
+
+
+class Stats(BaseModel):
+    """
+    Statistics collected while the instrumentation is enabled.
+    """
+
+    # by frame class name, work outside of frame classes is recorded under "-"
+    extractors: dict[str, ExtractorStats] = Field(default_factory=dict)
+    # by endpoint name, e.g., "files/:key"
+    fetches: dict[str, FetchStats] = Field(default_factory=dict)
+    # by span name, e.g., "validate"
+    spans: dict[str, TimingStats] = Field(default_factory=dict)
+    # sorts of children, which happen while nodes are built, see `Node`
+    sorts: int = 0
+
+    def summary(self) -> str:
+        """
+        Format the statistics as a table sorted by the total time.
+        """
+        lines = []
+        for name, stats in sorted(self.fetches.items()):
+            lines.append(
+                f"fetch {name}: {stats.calls} requests, {stats.total:.2f}s, "
+                f"{stats.bytes / 2**20:.1f} MiB"
+            )
+        for name, stats in sorted(self.spans.items(), key=lambda item: -item[1].total):
+            lines.append(f"span {name}: {stats.calls} calls, {stats.total:.3f}s")
+        if self.sorts:
+            lines.append(f"nodes: {self.sorts} sorts of children")
+        extractors = sorted(
+            self.extractors.items(),
+            key=lambda item: -(item[1].from_node.total + item[1].to_content.total),
+        )
+        for name, stats in extractors:
+            lines.append(
+                f"extractor {name}: "
+                f"from_node {stats.from_node.calls} calls {stats.from_node.total:.3f}s, "
+                f"to_content {stats.to_content.calls} calls "
+                f"{stats.to_content.total:.3f}s, "
+                f"{stats.nodes_visited} nodes visited, "
+                f"{stats.select_node_calls} select_node calls"
+            )
+        return "\n".join(lines)
+
+
+class Instrumentation:
+    """
+    Collector of statistics and, optionally, trace events.
+
+    Counters are attributed to the innermost frame class whose `from_node` or
+    `to_content` is running in the current thread. Trace events are recorded in
+    the Chrome trace event format, which can be opened in `chrome://tracing` or
+    https://ui.perfetto.dev.
+    """
+
+    def __init__(self, trace: bool = False):
+        """
+        Parameters
+        ----------
+        trace : bool, default=False
+            If True, record an event for each timed call.
+        """
+        self.stats = Stats()
+        self.events: list[dict] | None = [] if trace else None
+        self.start = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def extractor(self) -> ExtractorStats:
+        """
+        Statistics of the frame class running in the current thread.
+        """
+        stack = getattr(self._local, "stack", None)
+        name = stack[-1] if stack else "-"
+        if (stats := self.stats.extractors.get(name)) is None:
+            with self._lock:
+                stats = self.stats.extractors.setdefault(name, ExtractorStats())
+        return stats
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Increment a counter of the current extractor, e.g., "nodes_visited".
+        """
+        stats = self.extractor
+        setattr(stats, name, getattr(stats, name) + value)
+
+    def count_sort(self) -> None:
+        """
+        Count a sort of children, which is not attributed to an extractor.
+        """
+        with self._lock:
+            self.stats.sorts += 1
+
+    def add_event(self, name: str, category: str, start: float, seconds: float, **args):
+        """
+        Record a complete trace event with a start and duration in seconds.
+        """
+        if self.events is None:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.start) * 1e6,
+            "dur": seconds * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "span"):
+        """
+        Time a block of code as a named span.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                stats = self.stats.spans.setdefault(name, TimingStats())
+                stats.record(seconds)
+            self.add_event(name, category, start, seconds)
+
+    @contextmanager
+    def call(self, extractor: str, method: str):
+        """
+        Time a call of a frame class method and attribute counters to the class.
+        """
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(extractor)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            getattr(self.extractor, method).record(seconds)
+            stack.pop()
+            self.add_event(f"{extractor}.{method}", "frame", start, seconds)
+
+    def record_fetch(self, endpoint: str, start: float, seconds: float, size: int):
+        """
+        Record the latency and payload size of a request.
+        """
+        with self._lock:
+            stats = self.stats.fetches.setdefault(endpoint, FetchStats())
+            stats.record(seconds)
+            stats.bytes += size
+        self.add_event(endpoint, "fetch", start, seconds, bytes=size)
+
+    def save_trace(self, path: str | os.PathLike) -> None:
+        """
+        Save the trace events to a JSON file in the Chrome trace event format.
+        """
+        counters = {
+            "ph": "C",
+            "ts": (time.perf_counter() - self.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        events = list(self.events or [])
+        for name, stats in self.stats.extractors.items():
+            args = stats.model_dump(include={"nodes_visited", "select_node_calls"})
+            events.append(counters | {"name": name, "args": args})
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+@contextmanager
+def instrument(
+    trace: str | os.PathLike | None = None,
+) -> Generator[Instrumentation, None, None]:
+    """
+    Enable the instrumentation within a block of code.
+
+    Work done in other processes, e.g., frames extracted by worker processes of
+    `Pipeline`, is not recorded.
+
+    Parameters
+    ----------
+    trace : str | os.PathLike, optional
+        Path to save a trace file to when the block exits.
+
+    Yields
+    ------
+    Instrumentation
+        The enabled instrumentation, whose statistics are available in `stats`.
+
+    Examples
+    --------
+    >>> with instrument("trace.json") as instrumentation:
+    ...     Cover.from_node(node)
+    >>> print(instrumentation.stats.summary())
+    """
+    global current
+    previous, current = current, Instrumentation(trace=trace is not None)
+    instrumentation = current
+    try:
+        yield instrumentation
+    finally:
+        current = previous
+        if trace is not None:
+            instrumentation.save_trace(trace)
+
+
+def span(name: str):
+    """
+    Time a block of code as a named span if the instrumentation is enabled.
+
+    Examples
+    --------
+    >>> with span("validate"):
+    ...     document = Document(**data)
+    """
+    return nullcontext() if current is None else current.span(name)
+
+
+def timed(method: str) -> Callable:
+    """
+    Decorate a frame class method to time its calls if the instrumentation is
+    enabled.
+
+    Parameters
+    ----------
+    method : str
+        Name of the timing statistics, i.e., "from_node" or "to_content".
+
+    Returns
+    -------
+    Callable
+        Decorator of functions whose first argument is a frame class or instance.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(owner, *args, **kwargs):
+            if current is None:
+                return function(owner, *args, **kwargs)
+            cls = owner if isinstance(owner, type) else type(owner)
+            with current.call(cls.__name__, method):
+                return function(owner, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -5,10 +5,17 @@ See https://www.figma.com/developers/api#files for details.
 
 from __future__ import annotations  # allow forward references
 
-import re
-from typing import Generator, Literal
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Generator, Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from . import instrumentation
+from .index import compile_pattern
+from .selector import query
+
+if TYPE_CHECKING:
+    from .index import NodeIndex
 
 __all__ = ["NodeType", "Node"]
 
@@ -71,6 +78,39 @@ class Node(BaseModel):
         default=None,
         description="Descendant nodes if applicable.",
     )
+    # set when the node is part of an indexed tree, see `Document`
+    _index: NodeIndex | None = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        """
+        Store children in the reading order once, so that traversals can walk the
+        tree without sorting it again.
+        """
+        if self.children:
+            self.children.sort(key=_reading_order)
+            if instrumentation.current is not None:
+                instrumentation.current.count_sort()
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        # the index refers to the whole tree, so it is not pickled with a subtree
+        private = state["__pydantic_private__"]
+        if private and private.get("_index") is not None:
+            state["__pydantic_private__"] = private | {"_index": None}
+        return state
+
+    def __copy__(self) -> "Node":
+        copied = super().__copy__()
+        # the index refers to the original tree, in which the copy has no position
+        copied.__pydantic_private__["_index"] = None
+        return copied
+
+    def __deepcopy__(self, memo: dict | None = None) -> "Node":
+        memo = {} if memo is None else memo
+        # copy the index of the original tree as None for every copied node
+        if (index := self.__pydantic_private__["_index"]) is not None:
+            memo.setdefault(id(index), None)
+        return super().__deepcopy__(memo)
 
     def __str__(self):
         """
@@ -80,7 +120,7 @@ class Node(BaseModel):
 
     def _walk(self, level: int = 0, depth: int = -1) -> Generator[str, None, None]:
         """
-        Recursively walk the nodes to yield basic node information.
+        Walk the visible nodes to yield basic node information.
 
         Parameters
         ----------
@@ -99,10 +139,12 @@ class Node(BaseModel):
         if level > depth and depth != -1:
             return
         yield f"|{'-' * level} {self.type} ({self.name})"
-        if children := self.children:
-            children = self.sort_nodes(self.children)
-            for child in children:
-                yield from child._walk(level + 1, depth=depth)
+        descendants = self.traverse(
+            max_depth=None if depth == -1 else depth - level,
+            prune=_is_invisible,
+        )
+        for node, offset in descendants:
+            yield f"|{'-' * (level + offset)} {node.type} ({node.name})"
 
     def display(self, depth: int = -1) -> None:
         """
@@ -110,6 +152,86 @@ class Node(BaseModel):
         """
         print("\n".join(self._walk(depth=depth)))
 
+    def traverse(
+        self,
+        order: Literal["dfs", "bfs"] = "dfs",
+        max_depth: int | None = None,
+        limit: int | None = None,
+        prune: Callable[[Node], bool] | None = None,
+        descend: Callable[[Node], bool] | None = None,
+        match: Callable[[Node], bool] | None = None,
+    ) -> Generator[tuple[Node, int], None, None]:
+        """
+        Traverse the descendant nodes with an explicit stack or queue.
+
+        Unlike recursive generators, each node is yielded directly regardless of
+        its depth, so deeply nested trees neither slow down the traversal nor hit
+        the recursion limit.
+
+        Parameters
+        ----------
+        order : Literal["dfs", "bfs"], default="dfs"
+            Depth-first order, i.e., the pre-order of the tree, or breadth-first
+            order, i.e., level by level. Siblings are visited in the reading order.
+        max_depth : int, optional
+            Maximum depth of the visited descendants, e.g., `1` for the children.
+        limit : int, optional
+            Maximum number of nodes to yield, after which the traversal stops.
+        prune : Callable[[Node], bool], optional
+            Predicate of descendants to skip together with their subtrees, e.g.,
+            invisible nodes or nodes of certain types.
+        descend : Callable[[Node], bool], optional
+            Predicate of nodes, including this node, whose children to visit.
+            Other nodes are visited, but not their descendants.
+        match : Callable[[Node], bool], optional
+            Predicate of visited nodes to yield. Defaults to all visited nodes.
+
+        Yields
+        ------
+        tuple[Node, int]
+            Descendant nodes and their depth below this node, starting at `1`.
+
+        Examples
+        --------
+        >>> nodes = node.traverse(
+        ...     order="bfs",
+        ...     max_depth=2,
+        ...     limit=10,
+        ...     prune=lambda node: not node.visible or node.type == "VECTOR",
+        ... )
+        """
+        if order not in ("dfs", "bfs"):
+            raise ValueError(f"Unknown traversal order {order!r}")
+        if limit is not None and limit <= 0:
+            return
+        # a deque serves as the stack of the DFS and the queue of the BFS
+        pending = deque([(self, 0)])
+        pop = pending.popleft if order == "bfs" else pending.pop
+        found = 0
+        while pending:
+            node, depth = pop()
+            if depth:
+                if prune is not None and prune(node):
+                    continue
+                if match is None or match(node):
+                    yield node, depth
+                    found += 1
+                    if found == limit:
+                        return
+            children = node.children
+            if not children or depth == max_depth:
+                continue
+            if descend is not None and not descend(node):
+                continue
+            if instrumentation.current is not None:
+                instrumentation.current.count("nodes_visited", len(children))
+            # children are already sorted in the reading order, see `model_post_init`
+            depth += 1
+            if order == "bfs":
+                pending.extend((child, depth) for child in children)
+            else:
+                pending.extend((child, depth) for child in reversed(children))
+
     def select_nodes(
         self,
         type: NodeType,
@@ -134,14 +256,20 @@ class Node(BaseModel):
         Node
             Matching nodes of a given type.
         """
-        if self.visible and (children := self.children):
-            # sort the nodes to present in the righ-to-left, top-to-bottom manner
-            children = self.sort_nodes(self.children)
-            for child in children:
-                if child.type == type and re.search(pattern, child.name):
-                    yield child
-                if recursive:
-                    yield from child.select_nodes(type, pattern, recursive)
+        # private attributes are read from their dictionary directly, as reading
+        # them as attributes falls back to the slow `BaseModel.__getattr__`
+        if (index := self.__pydantic_private__["_index"]) is not None:
+            yield from index.select_nodes(self, type, pattern, recursive)
+            return
+        search = compile_pattern(pattern).search
+        # invisible nodes are selected, but not their descendants
+        descendants = self.traverse(
+            max_depth=None if recursive else 1,
+            descend=_is_visible,
+            match=lambda node: node.type == type and search(node.name) is not None,
+        )
+        for node, _ in descendants:
+            yield node
 
     def select_node(
         self,
@@ -167,11 +295,53 @@ class Node(BaseModel):
         Node or None
             The first matching node of a given type or None.
         """
+        if instrumentation.current is not None:
+            instrumentation.current.count("select_node_calls")
         try:
             return next(self.select_nodes(type, pattern, recursive))
         except StopIteration:
             return None
 
+    def select(self, selector: str) -> Node | None:
+        """
+        Select the first descendant node matching a selector.
+
+        A selector is a sequence of node types, each optionally followed by a regex
+        pattern in square brackets to match node names. Types separated by whitespace
+        select descendants, whereas types separated by `>` select immediate children,
+        e.g., `SECTION[Lesson 1.1] > FRAME[key_concepts] TEXT[title]`.
+
+        Selectors are compiled once and, for nodes in a `Document`, the results are
+        memoised per document and selector.
+
+        Parameters
+        ----------
+        selector : str
+            Selector to match.
+
+        Returns
+        -------
+        Node or None
+            The first matching node or None.
+        """
+        return query(self, selector, first=True)
+
+    def select_all(self, selector: str) -> list[Node]:
+        """
+        Select all descendant nodes matching a selector, see `select`.
+
+        Parameters
+        ----------
+        selector : str
+            Selector to match.
+
+        Returns
+        -------
+        list[Node]
+            Matching nodes.
+        """
+        return query(self, selector, first=False)
+
     @staticmethod
     def sort_nodes(nodes: list[Node]) -> list[Node]:
         """
@@ -187,10 +357,25 @@ class Node(BaseModel):
         list[Node]
             The sorted list of nodes.
         """
-        return sorted(
-            nodes,
-            key=lambda node: (
-                node.model_dump().get("absoluteBoundingBox", {}).get("y", 0),
-                node.model_dump().get("absoluteBoundingBox", {}).get("x", 0),
-            ),
-        )
+        if instrumentation.current is not None:
+            instrumentation.current.count_sort()
+        return sorted(nodes, key=_reading_order)
+
+
+def _is_visible(node: Node) -> bool:
+    return node.visible
+
+
+def _is_invisible(node: Node) -> bool:
+    return not node.visible
+
+
+def _reading_order(node: Node) -> tuple[float, float]:
+    """
+    Get a sorting key to present nodes in the left-to-right, top-to-bottom manner.
+
+    The bounding box is read directly from the extra attributes to avoid dumping
+    the entire subtree of the node.
+    """
+    box = (node.__pydantic_extra__ or {}).get("absoluteBoundingBox") or {}
+    return box.get("y", 0), box.get("x", 0)
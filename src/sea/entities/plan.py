@@ -0,0 +1,110 @@
+"""
+Declarative extraction plans that select all nodes needed by a frame or component
+in a single traversal.
+"""
+
+from typing import NamedTuple
+
+from . import instrumentation
+from .index import compile_pattern
+from .node import Node, NodeType
+
+__all__ = ["Select", "ExtractionPlan"]
+
+
+class Select(NamedTuple):
+    """
+    Selection of descendant nodes of a certain type whose names match a pattern.
+
+    If `many` is False, the first matching node or None is selected as with
+    `Node.select_node`, otherwise, all matching nodes are selected as with
+    `Node.select_nodes`.
+    """
+
+    type: NodeType
+    pattern: str = ".+"
+    many: bool = False
+
+
+class ExtractionPlan:
+    """
+    Plan to select several nodes from a subtree at once.
+
+    The selections are grouped by node type and compiled once, so that all of them
+    are collected in a single traversal of the subtree, which stops as soon as all
+    single selections are found. The results are the same as if each selection was
+    made separately with `Node.select_node` or `Node.select_nodes`.
+    """
+
+    def __init__(self, **selections: Select):
+        """
+        Parameters
+        ----------
+        **selections : Select
+            Selections by the names under which the results are returned.
+        """
+        self.selections = selections
+        self.types: dict[str, list[tuple[str, object, bool]]] = {}
+        for name, (type, pattern, many) in selections.items():
+            self.types.setdefault(type, []).append(
+                (name, compile_pattern(pattern), many)
+            )
+        self.singles = sum(not selection.many for selection in selections.values())
+        self.many = self.singles < len(selections)
+
+    def collect(self, node: Node) -> dict[str, Node | list[Node] | None]:
+        """
+        Collect the selected descendant nodes of a node.
+
+        Indexed nodes, i.e., nodes in a `Document` or views of a `CompactDocument`,
+        answer each selection from the index without walking the subtree.
+
+        Parameters
+        ----------
+        node : Node
+            The node whose descendants to select.
+
+        Returns
+        -------
+        dict[str, Node | list[Node] | None]
+            Selected nodes by the names of the selections.
+        """
+        if (
+            not isinstance(node, Node)
+            or node.__pydantic_private__["_index"] is not None
+        ):
+            return {
+                name: (
+                    list(node.select_nodes(type, pattern))
+                    if many
+                    else node.select_node(type, pattern)
+                )
+                for name, (type, pattern, many) in self.selections.items()
+            }
+        results = {
+            name: [] if selection.many else None
+            for name, selection in self.selections.items()
+        }
+        if not node.visible:
+            return results
+        pending = self.singles
+        visited = 0
+        stack = list(reversed(node.children or []))
+        while stack:
+            child = stack.pop()
+            visited += 1
+            for name, regex, many in self.types.get(child.type, ()):
+                if not regex.search(child.name):
+                    continue
+                if many:
+                    results[name].append(child)
+                elif results[name] is None:
+                    results[name] = child
+                    pending -= 1
+            if not pending and not self.many:
+                break
+            if child.visible and child.children:
+                stack.extend(reversed(child.children))
+        if instrumentation.current is not None:
+            instrumentation.current.count("nodes_visited", visited)
+        return results
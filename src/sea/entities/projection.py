@@ -0,0 +1,108 @@
+"""
+Projections that drop node data unused by the extractors while a file is loaded.
+"""
+
+from typing import Iterable
+
+from .node import Node, NodeType
+
+__all__ = ["DEFAULT_PROPERTIES", "DEFAULT_SKIPPED_TYPES", "Projection"]
+
+# extra properties read by extractors, the reading order and image exports
+DEFAULT_PROPERTIES = (
+    "absoluteBoundingBox",
+    "characters",
+    "fills",
+    "strokes",
+    # styles of rich text, see `richtext.get_text`
+    "style",
+    "characterStyleOverrides",
+    "styleOverrideTable",
+    "lineTypes",
+    "lineIndentations",
+)
+# node types that no extractor selects, e.g., shapes of icons and illustrations
+DEFAULT_SKIPPED_TYPES = ("VECTOR", "BOOLEAN_OPERATION")
+
+
+class Projection:
+    """
+    Projection of the raw JSON of nodes applied before they are validated.
+
+    Node fields, e.g., `id`, `name`, `type` or `children`, are always kept. Other
+    properties are kept only if whitelisted, and nodes of skipped types are dropped
+    with their subtrees, so that they are neither validated nor kept in memory.
+
+    Invisible nodes are not selected by extractors, but the nodes themselves may be
+    selected, so they are only dropped if `skip_invisible` is set.
+    """
+
+    def __init__(
+        self,
+        properties: Iterable[str] | None = DEFAULT_PROPERTIES,
+        skip_invisible: bool = False,
+        skip_types: Iterable[NodeType] = DEFAULT_SKIPPED_TYPES,
+    ):
+        """
+        Parameters
+        ----------
+        properties : Iterable[str], optional
+            Extra properties to keep on each node, see `DEFAULT_PROPERTIES`. If
+            set to None, all properties are kept.
+        skip_invisible : bool, default=False
+            If True, drop invisible nodes with their subtrees.
+        skip_types : Iterable[NodeType], default=DEFAULT_SKIPPED_TYPES
+            Types of nodes to drop with their subtrees.
+        """
+        self.properties = (
+            None
+            if properties is None
+            else frozenset(properties).union(Node.model_fields)
+        )
+        self.skip_invisible = skip_invisible
+        self.skip_types = frozenset(skip_types)
+
+    def keep(self, data: dict) -> bool:
+        """
+        Check whether to keep a node given its raw JSON.
+        """
+        if data.get("type") in self.skip_types:
+            return False
+        return not self.skip_invisible or data.get("visible", True)
+
+    def project(self, data: dict) -> dict:
+        """
+        Drop the properties of a node that are not kept, but not of its children.
+
+        Returns
+        -------
+        dict
+            The same JSON object, modified in place.
+        """
+        if self.properties is not None:
+            for key in [key for key in data if key not in self.properties]:
+                del data[key]
+        return data
+
+    def apply(self, data: dict) -> dict:
+        """
+        Project a node and drop the descendants that are not kept.
+
+        Parameters
+        ----------
+        data : dict
+            Raw JSON of the node whose descendants are raw JSON as well. The node
+            itself is kept even if it would be dropped, e.g., the document.
+
+        Returns
+        -------
+        dict
+            The same JSON object, modified in place.
+        """
+        stack = [data]
+        while stack:
+            node = self.project(stack.pop())
+            if children := node.get("children"):
+                node["children"] = [child for child in children if self.keep(child)]
+                stack.extend(node["children"])
+        return data
@@ -0,0 +1,324 @@
+"""
+Conversion of styled text of TEXT nodes to Markdown or HTML.
+
+Figma stores the style of each character of a text as an ID in
+`characterStyleOverrides`, which refers to a style in `styleOverrideTable`, and
+the list type of each line in `lineTypes`. Characters with the same style form
+runs, which are converted to spans, e.g., bold, italic or links, and lines of
+lists are converted to list items.
+"""
+
+import html
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import groupby
+from typing import Generator, Literal, NamedTuple
+
+from .node import Node
+
+__all__ = ["TextFormat", "get_text", "render_text", "text_format"]
+
+TextFormat = Literal["plain", "markdown", "html"]
+
+# format of rich text fields of frames and components, see `text_format`
+_format: ContextVar[TextFormat] = ContextVar("text_format", default="plain")
+
+_MARKDOWN_ESCAPES = str.maketrans({char: f"\\{char}" for char in "\\`*_~[]"})
+# markers that start blocks at the beginning of a line, e.g., headings or lists,
+# which are never added by formatting
+_BLOCK_MARKER = re.compile(r"^(\s*\d*)((?<=\d)[.)]|(?<!\d)[#>+=-])")
+# schemes of links that are kept, links without a scheme are relative
+_LINK_SCHEMES = {"http", "https", "mailto", "tel"}
+_LINK_SCHEME = re.compile(r"^([a-z][a-z0-9+.-]*):", re.IGNORECASE)
+_LIST_TAGS = {"ORDERED": "ol", "UNORDERED": "ul"}
+
+
+class Style(NamedTuple):
+    """
+    Formatting of a run of characters relative to the style of the text.
+    """
+
+    bold: bool = False
+    italic: bool = False
+    strikethrough: bool = False
+    underline: bool = False
+    link: str | None = None
+
+
+@contextmanager
+def text_format(format: TextFormat) -> Generator[None, None, None]:
+    """
+    Set the format of rich text fields of frames and components within a block.
+
+    Fields such as `TextElement.text` or `Concept.body` keep the styles and lists
+    of the text in the given format, whereas other fields, e.g., titles, remain
+    plain text.
+
+    Examples
+    --------
+    >>> with text_format("markdown"):
+    ...     frame = ModuleText.from_node(node)
+    """
+    token = _format.set(format)
+    try:
+        yield
+    finally:
+        _format.reset(token)
+
+
+def _get_link(url: str | None) -> str | None:
+    """
+    Get the URL of a link unless its scheme is unsafe, e.g., "javascript:".
+    """
+    if url is None:
+        return None
+    # browsers ignore whitespace and control characters in the scheme
+    match = _LINK_SCHEME.match(re.sub(r"[\x00-\x20]", "", url))
+    if match is not None and match.group(1).lower() not in _LINK_SCHEMES:
+        return None
+    return url
+
+
+def _get_style(override: dict, base: dict, link: str | None) -> Style:
+    """
+    Get the formatting of a style override that differs from the base style.
+    """
+    weight = override.get("fontWeight", 0)
+    decoration = override.get("textDecoration")
+    if "hyperlink" in override:
+        link = _get_link((override["hyperlink"] or {}).get("url"))
+    return Style(
+        bold=weight >= 700 > base.get("fontWeight", 400),
+        italic=bool(override.get("italic")) and not base.get("italic"),
+        strikethrough=decoration == "STRIKETHROUGH" != base.get("textDecoration"),
+        underline=decoration == "UNDERLINE" != base.get("textDecoration"),
+        link=link,
+    )
+
+
+def _format_markdown(text: str, style: Style) -> str:
+    """
+    Format a run of text in Markdown, keeping surrounding whitespace unstyled.
+    """
+    text = text.translate(_MARKDOWN_ESCAPES)
+    if style == Style() or not (inner := text.strip()):
+        return text
+    lead, trail = text[: len(text) - len(text.lstrip())], text[len(text.rstrip()) :]
+    if style.strikethrough:
+        inner = f"~~{inner}~~"
+    if style.italic:
+        inner = f"*{inner}*"
+    if style.bold:
+        inner = f"**{inner}**"
+    if style.link:
+        inner = f"[{inner}]({style.link})"
+    return lead + inner + trail
+
+
+def _format_html(text: str, style: Style) -> str:
+    """
+    Format a run of text in HTML.
+    """
+    text = html.escape(text, quote=False)
+    if style.underline:
+        text = f"<u>{text}</u>"
+    if style.strikethrough:
+        text = f"<s>{text}</s>"
+    if style.italic:
+        text = f"<em>{text}</em>"
+    if style.bold:
+        text = f"<strong>{text}</strong>"
+    if style.link:
+        text = f'<a href="{html.escape(style.link)}">{text}</a>'
+    return text
+
+
+def _join_markdown(lines: list[tuple[str, str, int]]) -> str:
+    """
+    Join formatted lines, turning lines of lists into Markdown list items.
+    """
+    output, counters = [], []
+    for text, type, level in lines:
+        # plain text must not start a heading, quote or list
+        text = _BLOCK_MARKER.sub(r"\1\\\2", text, count=1)
+        if type not in _LIST_TAGS:
+            counters.clear()
+            output.append(text)
+            continue
+        level = max(level, 1)
+        # number items per level, restarting nested lists
+        del counters[level:]
+        counters.extend([0] * (level - len(counters)))
+        counters[level - 1] += 1
+        marker = f"{counters[level - 1]}." if type == "ORDERED" else "-"
+        output.append(f"{'    ' * (level - 1)}{marker} {text}")
+    return "\n".join(output)
+
+
+def _join_html(lines: list[tuple[str, str, int]]) -> str:
+    """
+    Join formatted lines, turning lines of lists into nested HTML lists.
+    """
+    output, stack, plain = [], [], False
+    for text, type, level in lines:
+        if (tag := _LIST_TAGS.get(type)) is None:
+            while stack:
+                output.append(f"</li></{stack.pop()}>")
+            if plain:
+                output.append("<br>")
+            output.append(text)
+            plain = True
+            continue
+        plain = False
+        level = max(level, 1)
+        while len(stack) > level or (len(stack) == level and stack[-1] != tag):
+            output.append(f"</li></{stack.pop()}>")
+        if len(stack) == level:
+            output.append("</li><li>")
+        while len(stack) < level:
+            output.append(f"<{tag}><li>")
+            stack.append(tag)
+        output.append(text)
+    while stack:
+        output.append(f"</li></{stack.pop()}>")
+    return "".join(output)
+
+
+def render_text(
+    characters: str,
+    overrides: list[int] | None = None,
+    table: dict[str, dict] | None = None,
+    format: Literal["markdown", "html"] = "markdown",
+    style: dict | None = None,
+    line_types: list[str] | None = None,
+    line_indentations: list[int] | None = None,
+) -> str:
+    """
+    Render the characters of a TEXT node with their styles in Markdown or HTML.
+
+    Characters are never processed one by one in Python: runs of equal style IDs
+    are grouped in a single pass and each run is sliced from the text, so the
+    time is linear in the length of the text.
+
+    Markdown syntax in the characters is escaped, including markers that would
+    start a heading, a quote or a list at the beginning of a line. Links whose
+    scheme is not http, https, mailto or tel, e.g., "javascript:", are dropped.
+
+    Parameters
+    ----------
+    characters : str
+        Text of the node.
+    overrides : list[int], optional
+        Style ID of each character, `0` for the style of the node. Characters
+        beyond the end of the list have the style of the node.
+    table : dict[str, dict], optional
+        Styles by their IDs as strings.
+    format : Literal["markdown", "html"], default="markdown"
+        Format to render.
+    style : dict, optional
+        Style of the node, whose properties are not rendered, e.g., a bold title.
+    line_types : list[str], optional
+        List type of each line, i.e., "NONE", "ORDERED" or "UNORDERED".
+    line_indentations : list[int], optional
+        Indentation level of each line, i.e., the nesting of lists.
+
+    Returns
+    -------
+    str
+        The formatted text.
+    """
+    base, table = style or {}, table or {}
+    link = _get_link((base.get("hyperlink") or {}).get("url"))
+    overrides = overrides or []
+    # style IDs refer to UTF-16 code units as in JavaScript, which differ from
+    # Python characters only if the text has characters beyond the BMP
+    if characters and max(characters) > "\uffff":
+        data, width = characters.encode("utf-16-le"), 2
+    else:
+        data, width = characters, 1
+    length = len(data) // width
+    styles = {0: Style(link=link)}
+    runs: list[tuple[Style, int]] = []
+    for id, group in groupby(overrides[:length]):
+        if (current := styles.get(id)) is None:
+            current = styles[id] = _get_style(table.get(str(id), {}), base, link)
+        size = len(list(group))
+        if runs and runs[-1][0] == current:
+            runs[-1] = (current, runs[-1][1] + size)
+        else:
+            runs.append((current, size))
+    if (rest := length - min(len(overrides), length)) > 0:
+        runs.append((styles[0], rest))
+
+    # split the runs into lines of formatted spans
+    format_span = _format_markdown if format == "markdown" else _format_html
+    lines, spans, start, stop = [], [], 0, 0
+    for current, size in runs:
+        # end of the run in the style IDs, whereas the start of the next slice
+        # moves past surrogate pairs kept in the previous run
+        stop += size
+        if stop <= start:
+            continue
+        if width == 1:
+            text, end = data[start:stop], stop
+        else:
+            end = stop
+            # keep surrogate pairs in one run, the high byte of a unit is second
+            if end < length and 0xD8 <= data[2 * end - 1] <= 0xDB:
+                end += 1
+            text = data[2 * start : 2 * end].decode("utf-16-le")
+        start = end
+        pieces = text.split("\n")
+        for index, piece in enumerate(pieces):
+            if index:
+                lines.append("".join(spans))
+                spans = []
+            if piece:
+                spans.append(format_span(piece, current))
+    lines.append("".join(spans))
+
+    line_types = line_types or []
+    line_indentations = line_indentations or []
+    lines = [
+        (
+            text,
+            line_types[index] if index < len(line_types) else "NONE",
+            line_indentations[index] if index < len(line_indentations) else 0,
+        )
+        for index, text in enumerate(lines)
+    ]
+    return _join_markdown(lines) if format == "markdown" else _join_html(lines)
+
+
+def get_text(node: Node, format: TextFormat | None = None) -> str:
+    """
+    Get the text of a TEXT node in the format of rich text fields.
+
+    Parameters
+    ----------
+    node : Node
+        Text node, or a view of a node without styles, e.g., `CompactNode`.
+    format : TextFormat, optional
+        Format of the text. Defaults to the format set with `text_format`,
+        which is "plain" unless set.
+
+    Returns
+    -------
+    str
+        The plain characters of the node or the characters rendered with their
+        styles, see `render_text`.
+    """
+    format = format or _format.get()
+    if format == "plain":
+        return node.characters
+    extra = getattr(node, "__pydantic_extra__", None) or {}
+    return render_text(
+        node.characters,
+        extra.get("characterStyleOverrides"),
+        extra.get("styleOverrideTable"),
+        format=format,
+        style=extra.get("style"),
+        line_types=extra.get("lineTypes"),
+        line_indentations=extra.get("lineIndentations"),
+    )
@@ -0,0 +1,190 @@
+"""
+Compact selector syntax to navigate node trees, e.g.,
+`SECTION[Lesson 1.1] > FRAME[key_concepts] TEXT[title]`.
+"""
+
+from __future__ import annotations  # allow forward references
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Generator, NamedTuple, get_args
+
+from .index import compile_pattern
+
+if TYPE_CHECKING:
+    from .node import Node, NodeType
+
+__all__ = ["Selector", "compile_selector", "query"]
+
+_TYPE = re.compile(r"[A-Z_]+")
+
+
+class Step(NamedTuple):
+    """
+    A single step of a selector.
+    """
+
+    type: NodeType
+    pattern: str
+    regex: re.Pattern
+    # whether to select from all descendants or only immediate children
+    recursive: bool
+
+
+class Selector:
+    """
+    Compiled selector of nodes.
+
+    A selector is a sequence of node types, each optionally followed by a regex
+    pattern in square brackets to match node names, e.g., `FRAME[key_concepts]`.
+    Types separated by whitespace select descendants of the nodes matched so far,
+    whereas types separated by `>` only select their immediate children.
+    """
+
+    def __init__(self, text: str):
+        """
+        Parameters
+        ----------
+        text : str
+            Selector to compile, e.g., "SECTION[Lesson 1.1] > FRAME[key_concepts]".
+        """
+        self.text = text
+        self.steps = self._parse(text)
+
+    def __repr__(self) -> str:
+        return f"Selector({self.text!r})"
+
+    @staticmethod
+    def _parse(text: str) -> tuple[Step, ...]:
+        """
+        Parse a selector into steps.
+        """
+        from .node import NodeType  # avoid a circular import
+
+        types = set(get_args(NodeType))
+        steps = []
+        position, recursive = 0, True
+        while position < len(text):
+            if text[position].isspace():
+                position += 1
+                continue
+            if text[position] == ">":
+                if not recursive or not steps:
+                    raise ValueError(f"Unexpected '>' at {position} in {text!r}")
+                recursive = False
+                position += 1
+                continue
+            if (match := _TYPE.match(text, position)) is None or match[0] not in types:
+                raise ValueError(f"Expected a node type at {position} in {text!r}")
+            position = match.end()
+            pattern = ".+"
+            if position < len(text) and text[position] == "[":
+                # find the matching bracket allowing for brackets in the regex
+                start, depth = position + 1, 0
+                while position < len(text):
+                    if text[position] == "\\":
+                        position += 1
+                    elif text[position] == "[":
+                        depth += 1
+                    elif text[position] == "]":
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    position += 1
+                if depth:
+                    raise ValueError(f"Unclosed '[' in {text!r}")
+                pattern = text[start:position]
+                position += 1
+            steps.append(Step(match[0], pattern, compile_pattern(pattern), recursive))
+            recursive = True
+        if not steps or not recursive:
+            raise ValueError(f"Incomplete selector {text!r}")
+        return tuple(steps)
+
+    def _select(self, nodes, step: Step) -> Generator[Node, None, None]:
+        """
+        Select nodes matching a step from a sequence of context nodes.
+        """
+        seen = set()
+        for node in nodes:
+            for match in node.select_nodes(step.type, step.pattern, step.recursive):
+                if step.recursive:
+                    # nested context nodes may select the same descendant
+                    if match.id in seen:
+                        continue
+                    seen.add(match.id)
+                yield match
+
+    def iter(self, node: Node) -> Generator[Node, None, None]:
+        """
+        Lazily select descendants of a node matching the selector.
+
+        Parameters
+        ----------
+        node : Node
+            The node whose descendants to select.
+
+        Yields
+        ------
+        Node
+            Matching nodes grouped by the nodes matched by the previous step in
+            their reading order.
+        """
+        nodes = iter([node])
+        for step in self.steps:
+            nodes = self._select(nodes, step)
+        yield from nodes
+
+    def first(self, node: Node) -> Node | None:
+        """
+        Select the first matching descendant, stopping as soon as it is found.
+        """
+        return next(self.iter(node), None)
+
+    def all(self, node: Node) -> list[Node]:
+        """
+        Select all matching descendants.
+        """
+        return list(self.iter(node))
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text: str) -> Selector:
+    """
+    Compile a selector, caching the result.
+    """
+    return Selector(text)
+
+
+def query(node: Node, selector: str, first: bool) -> Node | list[Node] | None:
+    """
+    Select nodes with a selector, memoising the results per document and selector.
+
+    Parameters
+    ----------
+    node : Node
+        The node whose descendants to select.
+    selector : str
+        Selector to match, see `Selector`.
+    first : bool
+        If True, select the first matching node or None, otherwise, select all
+        matching nodes.
+
+    Returns
+    -------
+    Node | list[Node] | None
+        The selected nodes.
+    """
+    compiled = compile_selector(selector)
+    # read the index without `BaseModel.__getattr__`, compact nodes have none
+    private = getattr(node, "__pydantic_private__", None)
+    if private and (index := private["_index"]) is not None:
+        memo, key = index.memo, (selector, first, index.positions[id(node)])
+    elif (document := getattr(node, "document", None)) is not None:
+        # views of a compact document
+        memo, key = document.memo, (selector, first, node.position)
+    else:
+        return compiled.first(node) if first else compiled.all(node)
+    if key not in memo:
+        memo[key] = compiled.first(node) if first else tuple(compiled.all(node))
+    return memo[key] if first else list(memo[key])
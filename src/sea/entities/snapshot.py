@@ -0,0 +1,319 @@
+"""
+Binary snapshots of parsed node trees that are memory-mapped when loaded.
+
+A snapshot starts with a magic number and a JSON header, followed by sections of
+fixed-width arrays aligned to 8 bytes. Nodes are stored in the pre-order of the
+tree with children in the reading order, in the same layout as `CompactDocument`:
+
+- tree structure: `parents`, `ends`, `hidden`, `offsets` and `children`;
+- node records: `types`, `flags`, `fields`, `names`, `boxes` and `rotations`;
+- strings: an interned table of names, node IDs and text characters stored as
+  UTF-8 blobs sliced by offsets;
+- other properties of the nodes as a JSON array of objects in `extra_data`.
+
+The arrays of the tree structure are those of `NodeIndex`, so the index of a
+loaded tree is not built again.
+"""
+
+import json
+import math
+import mmap
+import os
+import sys
+from array import array
+from typing import TypeVar, get_args
+
+import orjson
+
+from .index import NodeIndex
+from .node import Node, NodeType
+
+__all__ = ["Snapshot", "save_snapshot"]
+
+MAGIC = b"SEASNAP\x02"
+_ALIGNMENT = 8
+
+# bit flags stored per node, see `CompactDocument`
+_VISIBLE = 1
+_HAS_CHILDREN = 2
+# bit flags of the fields with defaults that were set when a node was validated
+_SET_FIELDS = {"visible": 1, "rotation": 2, "children": 4}
+
+# names and type codes of the array sections
+SECTIONS = {
+    "parents": "i",
+    "ends": "I",
+    "hidden": "i",
+    "offsets": "I",
+    "children": "I",
+    "types": "B",
+    "flags": "B",
+    "fields": "B",
+    "names": "I",
+    "boxes": "d",
+    "rotations": "d",
+    "id_offsets": "I",
+    "text_spans": "i",
+    "name_offsets": "I",
+}
+
+T = TypeVar("T", bound=Node)
+
+
+def save_snapshot(path: str | os.PathLike, root: Node, metadata: dict) -> None:
+    """
+    Save a node tree to a snapshot.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        Path to save the snapshot to.
+    root : Node
+        Root node of the tree, e.g., a document.
+    metadata : dict
+        Metadata stored with the tree, e.g., the metadata of a document.
+    """
+    types = get_args(NodeType)
+    codes = {type: code for code, type in enumerate(types)}
+    arrays = {name: array(code) for name, code in SECTIONS.items()}
+    arrays["offsets"].append(0)
+    arrays["id_offsets"].append(0)
+    arrays["name_offsets"].append(0)
+    names: dict[str, int] = {}
+    name_data, ids, texts, extras = bytearray(), [], [], []
+    id_length = text_length = 0
+    children: list[list[int]] = []
+    stack = [(root, -1)]
+    while stack:
+        node, parent = stack.pop()
+        position = len(arrays["types"])
+        arrays["parents"].append(parent)
+        arrays["ends"].append(position)
+        if parent == -1:
+            arrays["hidden"].append(-1)
+        elif not arrays["flags"][parent] & _VISIBLE:
+            arrays["hidden"].append(parent)
+        else:
+            arrays["hidden"].append(arrays["hidden"][parent])
+        if parent != -1:
+            children[parent].append(position)
+        children.append([])
+        arrays["types"].append(codes[node.type])
+        arrays["flags"].append(
+            _VISIBLE * node.visible | _HAS_CHILDREN * (node.children is not None)
+        )
+        arrays["fields"].append(
+            sum(
+                bit
+                for field, bit in _SET_FIELDS.items()
+                if field in node.__pydantic_fields_set__
+            )
+        )
+        if (code := names.get(node.name)) is None:
+            code = names[node.name] = len(names)
+            name_data += node.name.encode()
+            arrays["name_offsets"].append(len(name_data))
+        arrays["names"].append(code)
+        extra = node.__pydantic_extra__ or {}
+        box = extra.get("absoluteBoundingBox") or {}
+        arrays["boxes"].extend(
+            box.get(key, math.nan) for key in ("x", "y", "width", "height")
+        )
+        arrays["rotations"].append(node.rotation)
+        ids.append(node.id)
+        id_length += len(node.id)
+        arrays["id_offsets"].append(id_length)
+        if (characters := extra.get("characters")) is None:
+            arrays["text_spans"].extend((-1, -1))
+        else:
+            arrays["text_spans"].extend((text_length, text_length + len(characters)))
+            texts.append(characters)
+            text_length += len(characters)
+        extras.append(extra or None)
+        # children are already sorted in the reading order, see `Node`
+        stack.extend((child, position) for child in reversed(node.children or []))
+    for nested in children:
+        arrays["children"].extend(nested)
+        arrays["offsets"].append(len(arrays["children"]))
+    for position in range(len(arrays["types"]) - 1, 0, -1):
+        parent = arrays["parents"][position]
+        arrays["ends"][parent] = max(arrays["ends"][parent], arrays["ends"][position])
+
+    blobs = {name: data.tobytes() for name, data in arrays.items()}
+    blobs |= {
+        "name_data": bytes(name_data),
+        "id_data": "".join(ids).encode(),
+        "text_data": "".join(texts).encode(),
+        "extra_data": orjson.dumps(extras),
+    }
+    # lay out the sections after the header, which is padded to the alignment
+    sections, offset = {}, 0
+    for name, data in blobs.items():
+        sections[name] = [offset, len(data)]
+        offset += -len(data) % _ALIGNMENT + len(data)
+    header = {
+        "byteorder": sys.byteorder,
+        "types": types,
+        "metadata": metadata,
+        "sections": sections,
+    }
+    header = orjson.dumps(header)
+    start = len(MAGIC) + 8 + len(header)
+    header += b" " * (-start % _ALIGNMENT)
+    with open(path, "wb") as file:
+        file.write(MAGIC + len(header).to_bytes(8, "little") + header)
+        for data in blobs.values():
+            file.write(data + bytes(-len(data) % _ALIGNMENT))
+
+
+class Snapshot:
+    """
+    Snapshot of a node tree memory-mapped from a file.
+
+    The arrays are views of the mapped file, so loading a snapshot does not read
+    the file until the arrays are accessed. Only the strings are decoded.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        """
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to a snapshot saved with `save_snapshot`.
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        length = int.from_bytes(view[len(MAGIC) : len(MAGIC) + 8], "little")
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(view[start : start + length]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was saved with {header['byteorder']} byte order")
+        self.metadata: dict = header["metadata"]
+        start += length
+        self.sections = {
+            name: view[start + offset : start + offset + size]
+            for name, (offset, size) in header["sections"].items()
+        }
+        self.arrays = {
+            name: self.sections[name].cast(code) for name, code in SECTIONS.items()
+        }
+        types = get_args(NodeType)
+        if tuple(header["types"]) != types:
+            # translate codes saved with a different list of node types
+            codes = {type: code for code, type in enumerate(types)}
+            codes = [codes.get(type) for type in header["types"]]
+            unknown = {
+                header["types"][code]
+                for code in set(self.arrays["types"])
+                if codes[code] is None
+            }
+            if unknown:
+                raise ValueError(
+                    f"{path} contains nodes of unsupported types: "
+                    + ", ".join(sorted(unknown))
+                )
+            self.arrays["types"] = array(
+                "B", (codes[code] for code in self.arrays["types"])
+            )
+        self.types = types
+
+    def __len__(self) -> int:
+        return len(self.arrays["types"])
+
+    def get_names(self) -> list[str]:
+        """
+        Decode the table of interned node names.
+        """
+        data, offsets = bytes(self.sections["name_data"]), self.arrays["name_offsets"]
+        return [
+            data[offsets[code] : offsets[code + 1]].decode()
+            for code in range(len(offsets) - 1)
+        ]
+
+    def get_text(self, name: str) -> str:
+        """
+        Decode a string blob, i.e., "id_data" or "text_data".
+        """
+        return str(self.sections[name], "utf-8")
+
+    def to_tree(self, cls: type[T], index: bool = False, **fields) -> T:
+        """
+        Build the node models of the tree without validating them.
+
+        The nodes were validated and sorted when the snapshot was saved, so
+        `model_post_init` is not called.
+
+        Parameters
+        ----------
+        cls : type[T]
+            Class of the root node, e.g., `Document`. Other nodes are `Node`.
+        index : bool, default=False
+            If True, link the nodes to a `NodeIndex` created from the snapshot.
+        **fields
+            Other fields of the root node, e.g., `metadata`.
+
+        Returns
+        -------
+        T
+            The root node.
+        """
+        construct = object.__setattr__
+        arrays = self.arrays
+        types, flags, names = arrays["types"], arrays["flags"], self.get_names()
+        name_codes, rotations = arrays["names"], arrays["rotations"]
+        offsets, children = arrays["offsets"], arrays["children"]
+        set_fields = arrays["fields"]
+        # fields that are set for each combination of bit flags
+        fields_sets = [
+            {"id", "name", "type"}
+            | {field for field, bit in _SET_FIELDS.items() if mask & bit}
+            for mask in range(2 ** len(_SET_FIELDS))
+        ]
+        ids, id_offsets = self.get_text("id_data"), arrays["id_offsets"]
+        # decode the properties of all nodes at once
+        extras = orjson.loads(self.sections["extra_data"])
+        nodes: list[Node | None] = [None] * len(self)
+        privates: list[dict] = []
+        # build the children before their parents
+        for position in range(len(self) - 1, -1, -1):
+            flag = flags[position]
+            if flag & _HAS_CHILDREN:
+                nested = children[offsets[position] : offsets[position + 1]]
+                nested = [nodes[child] for child in nested]
+            else:
+                nested = None
+            data = {
+                "id": ids[id_offsets[position] : id_offsets[position + 1]],
+                "name": names[name_codes[position]],
+                "visible": bool(flag & _VISIBLE),
+                "type": self.types[types[position]],
+                "rotation": rotations[position],
+                "children": nested,
+            }
+            if position == 0:
+                data |= fields
+            # set the attributes of the validated models directly like
+            # `model_construct` does, children are already sorted
+            node = object.__new__(cls if position == 0 else Node)
+            construct(node, "__dict__", data)
+            construct(node, "__pydantic_extra__", extras[position] or {})
+            # only the fields that were set when the node was validated, so
+            # that `exclude_unset` dumps match those of validated models
+            fields_set = set(fields_sets[set_fields[position]])
+            if position == 0:
+                fields_set.update(fields)
+            construct(node, "__pydantic_fields_set__", fields_set)
+            private = {"_index": None}
+            construct(node, "__pydantic_private__", private)
+            privates.append(private)
+            nodes[position] = node
+        if index:
+            tree = NodeIndex.from_arrays(
+                nodes, arrays["parents"], arrays["ends"], arrays["hidden"]
+            )
+            for private in privates:
+                private["_index"] = tree
+        return nodes[0]
@@ -0,0 +1,189 @@
+"""
+Streaming parser to build nodes from a Figma file without loading it whole.
+
+The file is read in chunks and parsed into events with `ijson`. Nodes at a given
+depth below the document are validated one at a time as soon as they are read,
+so that the raw JSON of at most one such node is kept in memory at once.
+"""
+
+from typing import BinaryIO, Generator, Iterator
+
+import ijson
+
+from .node import Node
+from .projection import Projection
+
+__all__ = ["iter_nodes", "load_document"]
+
+_START = {"start_map", "start_array"}
+_END = {"end_map", "end_array"}
+
+Events = Iterator[tuple[str, object]]
+
+
+def _read_value(events: Events, event: str, value: object) -> object:
+    """
+    Build a JSON value from parser events, starting from a given event.
+    """
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = int(event in _START)
+    while depth:
+        event, value = next(events)
+        builder.event(event, value)
+        if event in _START:
+            depth += 1
+        elif event in _END:
+            depth -= 1
+    return builder.value
+
+
+def _read_node(
+    events: Events,
+    depth: int,
+    keep: bool,
+    projection: Projection | None = None,
+) -> Generator[Node, None, dict]:
+    """
+    Read the properties of a node from parser events following its `start_map`.
+
+    Parameters
+    ----------
+    events : Events
+        Parser events positioned right after the start of the node object.
+    depth : int
+        Number of levels below the node at which descendants are validated and
+        yielded. If set to `0`, the whole node is read as a dictionary.
+    keep : bool
+        If True, keep the yielded descendants in the properties of their parents,
+        otherwise, discard them once they are yielded.
+    projection : Projection, optional
+        Projection applied to the node and its descendants before they are
+        validated. Dropped descendants are not kept in the properties.
+
+    Yields
+    ------
+    Node
+        Descendant nodes at the given depth.
+
+    Returns
+    -------
+    dict
+        Properties of the node.
+    """
+    properties = {}
+    for event, key in events:
+        if event == "end_map":
+            break
+        event, value = next(events)
+        if key != "children" or depth == 0 or event != "start_array":
+            properties[key] = _read_value(events, event, value)
+            continue
+        children = []
+        for event, value in events:
+            if event == "end_array":
+                break
+            if depth == 1:
+                data = _read_value(events, event, value)
+                if projection is not None:
+                    if not projection.keep(data):
+                        continue
+                    projection.apply(data)
+                child = Node(**data)
+                yield child
+            else:
+                data = yield from _read_node(events, depth - 1, keep, projection)
+                if projection is not None and not projection.keep(data):
+                    continue
+                child = Node(**data)
+            if keep:
+                children.append(child)
+        properties["children"] = children
+    if projection is not None and depth == 0:
+        # children read as a whole are still raw JSON
+        projection.apply(properties)
+    elif projection is not None:
+        projection.project(properties)
+    return properties
+
+
+def _read_document(
+    source: BinaryIO,
+    depth: int,
+    keep: bool,
+    projection: Projection | None = None,
+) -> Generator[Node, None, tuple[dict, dict]]:
+    """
+    Read a Figma file response, yielding nodes at a given depth below the document.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        Properties of the document node and the remaining file metadata.
+    """
+    events = ijson.basic_parse(source, use_float=True)
+    event, _ = next(events)
+    if event != "start_map":
+        raise ValueError(f"Expected a JSON object, got {event}")
+    document, metadata = {}, {}
+    for event, key in events:
+        if event == "end_map":
+            break
+        event, value = next(events)
+        if key == "document":
+            document = yield from _read_node(events, depth, keep, projection)
+        else:
+            metadata[key] = _read_value(events, event, value)
+    return document, metadata
+
+
+def iter_nodes(source: BinaryIO, depth: int = 2) -> Generator[Node, None, None]:
+    """
+    Stream nodes at a given depth below the document one at a time.
+
+    Parameters
+    ----------
+    source : BinaryIO
+        File-like object with a Figma file response, e.g., an open file or a raw
+        HTTP response.
+    depth : int, default=2
+        Depth of the nodes to yield. Pages (CANVAS) are at depth `1` and top-level
+        nodes on each page, i.e., SECTION in a course file, are at depth `2`.
+
+    Yields
+    ------
+    Node
+        Nodes at the given depth in the order they appear in the file.
+    """
+    yield from _read_document(source, depth, keep=False)
+
+
+def load_document(
+    source: BinaryIO,
+    depth: int = 2,
+    projection: Projection | None = None,
+) -> tuple[dict, dict]:
+    """
+    Load a Figma file response validating nodes at a given depth as they are read.
+
+    Parameters
+    ----------
+    source : BinaryIO
+        File-like object with a Figma file response.
+    depth : int, default=2
+        Depth at which nodes are validated incrementally, see `iter_nodes`.
+    projection : Projection, optional
+        Projection applied to the nodes before they are validated.
+
+    Returns
+    -------
+    tuple[dict, dict]
+        Properties of the document node, whose descendants down to the given depth
+        are already validated, and the remaining file metadata.
+    """
+    reader = _read_document(source, depth, keep=True, projection=projection)
+    while True:
+        try:
+            next(reader)
+        except StopIteration as stop:
+            return stop.value
@@ -0,0 +1,185 @@
+"""
+Responsive variants of exported images in modern formats at several widths.
+
+Requires [Pillow](https://pillow.readthedocs.io), e.g., `pip install sea[images]`.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .components import ImageVariant
+from .images import ImageExporter
+
+__all__ = ["VariantGenerator", "make_variants"]
+
+# formats of Pillow without an alpha channel
+_OPAQUE_FORMATS = {"JPEG"}
+
+
+def make_variants(
+    source: Path,
+    directory: Path,
+    widths: tuple[int, ...],
+    formats: tuple[str, ...],
+    quality: int,
+) -> list[tuple[str, int, str]]:
+    """
+    Create the variants of an image that do not exist yet.
+
+    Images are never upscaled, so widths larger than the width of the source are
+    replaced by the width of the source. Transparent images are blended with a
+    white background for formats without an alpha channel, e.g., JPEG. The
+    function is run in worker processes.
+
+    Parameters
+    ----------
+    source : Path
+        Path to the image, whose name is the digest of its content.
+    directory : Path
+        Directory to store the variants in.
+    widths : tuple[int, ...]
+        Widths of the variants in pixels.
+    formats : tuple[str, ...]
+        Formats of the variants, e.g., "webp" or "avif".
+    quality : int
+        Quality of the variants between 1 and 100.
+
+    Returns
+    -------
+    list[tuple[str, int, str]]
+        Name, width and MIME type of each variant.
+    """
+    from PIL import Image  # optional dependency
+
+    with Image.open(source) as image:
+        targets = sorted({min(width, image.width) for width in widths})
+        variants = []
+        for format in formats:
+            for width in targets:
+                # the name is derived from the source digest and the parameters
+                name = f"{source.stem}-{width}w-q{quality}.{format}"
+                path = directory / name[:2] / name
+                if not path.exists():
+                    if image.mode not in {"RGB", "RGBA"}:
+                        image = image.convert("RGBA")
+                    height = max(1, round(image.height * width / image.width))
+                    variant = image.resize((width, height), Image.Resampling.LANCZOS)
+                    if format.upper() in _OPAQUE_FORMATS and variant.mode == "RGBA":
+                        # blend transparent pixels with a white background
+                        opaque = Image.new("RGB", variant.size, (255, 255, 255))
+                        opaque.paste(variant, mask=variant.getchannel("A"))
+                        variant = opaque
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    # write to a temporary file first not to leave partial images
+                    with tempfile.NamedTemporaryFile(
+                        dir=path.parent, delete=False
+                    ) as file:
+                        try:
+                            variant.save(file, format=format.upper(), quality=quality)
+                        except BaseException:
+                            file.close()
+                            os.unlink(file.name)
+                            raise
+                    os.replace(file.name, path)
+                variants.append((name, width, f"image/{format}"))
+    return variants
+
+
+class VariantGenerator:
+    """
+    Generator of resized variants of images exported by an `ImageExporter`.
+
+    Variants are stored next to the exported images and named after the digest
+    of the source image and the parameters, so they are only created once. Images
+    are processed in parallel on a process pool.
+    """
+
+    def __init__(
+        self,
+        exporter: ImageExporter,
+        widths: tuple[int, ...] = (320, 640, 1280),
+        formats: tuple[str, ...] = ("webp", "avif"),
+        quality: int = 75,
+        workers: int | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        exporter : ImageExporter
+            Exporter of the source images.
+        widths : tuple[int, ...], default=(320, 640, 1280)
+            Widths of the variants in pixels.
+        formats : tuple[str, ...], default=("webp", "avif")
+            Formats of the variants supported by Pillow.
+        quality : int, default=75
+            Quality of the variants between 1 and 100.
+        workers : int, optional
+            Number of worker processes. Defaults to the number of CPUs. If set
+            to `0`, variants are created in the current process.
+        """
+        from PIL import Image  # optional dependency
+
+        Image.init()
+        if unsupported := [name for name in formats if name.upper() not in Image.SAVE]:
+            raise ValueError(f"Unsupported formats {', '.join(unsupported)}")
+        if exporter.format not in {"png", "jpg"}:
+            raise ValueError(f"Cannot create variants of {exporter.format} images")
+        self.exporter = exporter
+        self.directory = exporter.directory / "variants"
+        self.widths = tuple(widths)
+        self.formats = tuple(formats)
+        self.quality = quality
+        self.workers = os.cpu_count() if workers is None else workers
+
+    def get_url(self, name: str) -> str:
+        """
+        Get the URL or path a variant is resolved to, see `ImageExporter.get_url`.
+        """
+        if self.exporter.base_url is None:
+            return str(self.directory / name[:2] / name)
+        return f"{self.exporter.base_url}/variants/{name[:2]}/{name}"
+
+    def generate(
+        self, names: dict[str, str] | None = None
+    ) -> dict[str, list[ImageVariant]]:
+        """
+        Create the variants of exported images.
+
+        Parameters
+        ----------
+        names : dict[str, str], optional
+            Names of the stored images by node ID. Defaults to the images of the
+            last export, see `ImageExporter.names`.
+
+        Returns
+        -------
+        dict[str, list[ImageVariant]]
+            Variants of the images by node ID, ordered by format and width.
+        """
+        names = self.exporter.names if names is None else names
+        sources = list(dict.fromkeys(names.values()))
+        tasks = [
+            (
+                self.exporter.get_path(name),
+                self.directory,
+                self.widths,
+                self.formats,
+                self.quality,
+            )
+            for name in sources
+        ]
+        if self.workers and tasks:
+            with ProcessPoolExecutor(self.workers) as pool:
+                results = list(pool.map(make_variants, *zip(*tasks)))
+        else:
+            results = [make_variants(*task) for task in tasks]
+        variants = {
+            source: [
+                ImageVariant(url=self.get_url(name), width=width, type=type)
+                for name, width, type in result
+            ]
+            for source, result in zip(sources, results)
+        }
+        return {id: variants[name] for id, name in names.items()}
@@ -0,0 +1,225 @@
+"""
+Incremental extraction of frames that only re-runs extractors for changed frames.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+
+from pydantic import BaseModel, Field
+
+from . import __version__
+from .entities.frames import FrameBase
+from .entities.hashing import content_hash
+from .entities.node import Node
+
+__all__ = ["BuildReport", "IncrementalBuilder", "get_extractor_digest"]
+
+
+class BuildReport(BaseModel):
+    """
+    Summary of changes in frames since the previous build.
+
+    Frames are listed as "name (id)".
+    """
+
+    added: list[str] = Field(default_factory=list)
+    changed: list[str] = Field(default_factory=list)
+    unchanged: list[str] = Field(default_factory=list)
+    removed: list[str] = Field(default_factory=list)
+
+    def __str__(self):
+        return ", ".join(
+            f"{len(frames)} {name}" for name, frames in self.model_dump().items()
+        )
+
+
+@cache
+def get_extractor_digest(frame: type[FrameBase]) -> str:
+    """
+    Get a digest of the source code a frame class is extracted with.
+
+    The source of the module of the class and of the modules of this package it
+    imports names from, e.g., components, extraction plans and rich text, is
+    hashed, so that cached contents are invalidated when an extractor changes
+    without a new version, e.g., in an editable install.
+
+    Parameters
+    ----------
+    frame : type[FrameBase]
+        Frame class to get the digest of.
+
+    Returns
+    -------
+    str
+        Hexadecimal digest of the source code.
+    """
+    package = __name__.partition(".")[0]
+    module = sys.modules[frame.__module__]
+    modules = {module.__name__: module}
+    for value in vars(module).values():
+        name = value.__name__ if isinstance(value, ModuleType) else None
+        name = name or getattr(value, "__module__", None)
+        if isinstance(name, str) and name.partition(".")[0] == package:
+            modules.setdefault(name, sys.modules.get(name))
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(modules):
+        path = getattr(modules[name], "__file__", None)
+        digest.update(name.encode())
+        if path is not None and os.path.exists(path):
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+class IncrementalBuilder:
+    """
+    Builder of frame contents cached on disk against the content hashes of frames.
+
+    The content of a frame is only extracted if no content has been cached for
+    the same hash of the frame subtree, frame class, source code of its extractor,
+    see `get_extractor_digest`, and package version. Hashes
+    from the previous build of a file are kept in a manifest to report changes.
+    """
+
+    def __init__(self, key: str, directory: str | os.PathLike | None = None):
+        """
+        Parameters
+        ----------
+        key : str
+            Key of the Figma file being built.
+        directory : str | os.PathLike, optional
+            Directory to cache frame contents in. Defaults to `frames` directory
+            in `SEA_CACHE_DIR` environment variable or `~/.cache/sea`.
+        """
+        if directory is None:
+            directory = Path(os.getenv("SEA_CACHE_DIR", "~/.cache/sea"), "frames")
+        self.directory = Path(directory).expanduser() / key
+        self.manifest_path = self.directory / "manifest.json"
+        if self.manifest_path.exists():
+            self.previous = json.loads(self.manifest_path.read_text())
+        else:
+            self.previous = {}
+        self.current: dict[str, dict] = {}
+        self.report = BuildReport()
+
+    def record(self, node: Node, frame: type[FrameBase], context: str = "") -> bool:
+        """
+        Record a frame in the build and check whether its content is cached.
+
+        The cached content is not read, see `load`, so that contents of large
+        builds need not be kept in memory until they are written.
+
+        Parameters
+        ----------
+        node : Node
+            Frame node to extract the content from.
+        frame : type[FrameBase]
+            Frame class to extract the content with.
+        context : str, default=""
+            Other inputs of the extraction that are not part of the frame, e.g.,
+            URLs of exported images, which invalidate the cached content if changed.
+
+        Returns
+        -------
+        bool
+            True if the content is cached, False if the frame has to be extracted.
+        """
+        digest = content_hash(node)
+        extractor = get_extractor_digest(frame)
+        key = f"{__version__}:{frame.__module__}.{frame.__qualname__}:{extractor}"
+        key += f":{digest}"
+        key += f":{context}" if context else ""
+        key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        path = self.directory / f"{key}.json"
+        label = f"{node.name} ({node.id})"
+        self.current[node.id] = {"name": node.name, "hash": digest, "path": path.name}
+        if (previous := self.previous.get(node.id)) is None:
+            self.report.added.append(label)
+        elif previous["hash"] != digest:
+            self.report.changed.append(label)
+        else:
+            self.report.unchanged.append(label)
+        return path.exists()
+
+    def load(self, node: Node) -> dict:
+        """
+        Load the cached content of a frame recorded by `record`.
+        """
+        path = self.directory / self.current[node.id]["path"]
+        return json.loads(path.read_text())
+
+    def lookup(
+        self, node: Node, frame: type[FrameBase], context: str = ""
+    ) -> dict | None:
+        """
+        Get the cached content of a frame and record the frame in the build.
+
+        Parameters
+        ----------
+        node : Node
+            Frame node to extract the content from.
+        frame : type[FrameBase]
+            Frame class to extract the content with.
+        context : str, default=""
+            Other inputs of the extraction, see `record`.
+
+        Returns
+        -------
+        dict or None
+            Cached frame content or None if the frame has to be extracted.
+        """
+        return self.load(node) if self.record(node, frame, context) else None
+
+    def store(self, node: Node, content: dict) -> None:
+        """
+        Cache the content of a frame recorded by `lookup`.
+        """
+        path = self.directory / self.current[node.id]["path"]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(content))
+
+    def build(self, node: Node, frame: type[FrameBase]) -> dict:
+        """
+        Get the content of a frame, extracting it only if the frame has changed.
+
+        Parameters
+        ----------
+        node : Node
+            Frame node to extract the content from.
+        frame : type[FrameBase]
+            Frame class to extract the content with.
+
+        Returns
+        -------
+        dict
+            Frame content as returned by `FrameBase.to_content`.
+        """
+        if (content := self.lookup(node, frame)) is None:
+            content = frame.from_node(node).to_content()
+            self.store(node, content)
+        return content
+
+    def save(self) -> BuildReport:
+        """
+        Save the hashes of the frames built for the next build and remove cached
+        contents that are no longer used.
+
+        Returns
+        -------
+        BuildReport
+            Summary of changes in frames since the previous build.
+        """
+        for id, frame in self.previous.items():
+            if id not in self.current:
+                self.report.removed.append(f"{frame['name']} ({id})")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.current))
+        used = {frame["path"] for frame in self.current.values()}
+        for path in self.directory.glob("*.json"):
+            if path.name not in used and path != self.manifest_path:
+                path.unlink(missing_ok=True)
+        return self.report
@@ -0,0 +1,409 @@
+"""
+End-to-end pipeline to build a course from a Figma file.
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Generator, Literal
+
+from .entities.cache import FileCache
+from .entities.components import ImageVariant
+from .entities.document import Document
+from .entities.frames import FRAMES
+from .entities.images import ImageExporter, collect_images, resolve_images
+from .entities.index import NodeIndex
+from .entities.instrumentation import span
+from .entities.node import Node
+from .entities.projection import Projection
+from .entities.richtext import TextFormat, text_format
+from .entities.variants import VariantGenerator
+from .incremental import BuildReport, IncrementalBuilder
+from .writer import CourseWriter
+
+__all__ = ["Pipeline", "extract_frames", "iter_sections"]
+
+
+def iter_sections(document: Node) -> Generator[tuple[list[str], Node], None, None]:
+    """
+    Iterate over the sections that contain frames in the reading order.
+
+    Parameters
+    ----------
+    document : Node
+        Document to iterate over.
+
+    Yields
+    ------
+    tuple[list[str], Node]
+        Names of the sections the section is nested in and the section itself,
+        e.g., (["Chapter, Lesson, and Part"], <SECTION "Lesson 1.1">).
+    """
+    stack = [([], document)]
+    while stack:
+        path, node = stack.pop()
+        if node.type == "SECTION":
+            if node.select_node("FRAME", recursive=False) is not None:
+                yield path, node
+            path = path + [node.name]
+        if node.visible:
+            stack.extend((path, child) for child in reversed(node.children or []))
+
+
+def extract_frames(
+    nodes: list[Node],
+    urls: dict[str, str] | None = None,
+    srcsets: dict[str, list[ImageVariant]] | None = None,
+    format: TextFormat = "plain",
+) -> list[dict]:
+    """
+    Extract the contents of frames using the frame classes from the registry.
+
+    The function is run in worker processes, so the frames are indexed anew as
+    their document index is not passed to the worker.
+
+    Parameters
+    ----------
+    nodes : list[Node]
+        Frame nodes whose names are registered in `FRAMES`.
+    urls : dict[str, str], optional
+        URLs of exported images by node ID written into the images of frames,
+        see `ImageExporter.export`.
+    srcsets : dict[str, list[ImageVariant]], optional
+        Variants of exported images by node ID written into the images of frames,
+        see `VariantGenerator.generate`.
+    format : TextFormat, default="plain"
+        Format of rich text fields, see `text_format`.
+
+    Returns
+    -------
+    list[dict]
+        Frame contents as returned by `FrameBase.to_content`.
+    """
+    contents = []
+    for node in nodes:
+        if node.__pydantic_private__["_index"] is None:
+            NodeIndex(node)
+        with text_format(format):
+            frame = FRAMES[node.name].from_node(node)
+        if urls:
+            resolve_images(frame, urls, srcsets)
+        contents.append(frame.to_content())
+    return contents
+
+
+class Pipeline:
+    """
+    Pipeline to build a course JSON from a Figma file.
+
+    Frames are dispatched to frame classes by their names using `FRAMES` and
+    sections are extracted in parallel on a process pool. Wall time of each stage
+    is recorded in `timings`.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        cache: FileCache | None = None,
+        incremental: bool = False,
+        images: ImageExporter | None = None,
+        variants: VariantGenerator | None = None,
+        projection: Projection | None = None,
+        text_format: TextFormat = "plain",
+    ):
+        """
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes. Defaults to the number of CPUs. If set
+            to `0`, frames are extracted in the current process.
+        cache : FileCache, optional
+            Cache to load Figma files from. If not provided, files are always
+            downloaded.
+        incremental : bool, default=False
+            If True, only extract frames that have changed since the previous
+            build, see `IncrementalBuilder`.
+        images : ImageExporter, optional
+            If provided, export images in the document before extracting frames
+            and write their URLs into the frames.
+        variants : VariantGenerator, optional
+            If provided, create responsive variants of the exported images and
+            write them into the frames. Requires `images`.
+        projection : Projection, optional
+            If provided, drop node data unused by the extractors while loading
+            files, see `Projection`.
+        text_format : TextFormat, default="plain"
+            Format of rich text fields of frames, i.e., "plain", "markdown" or
+            "html", see `richtext.text_format`.
+        """
+        if variants is not None and images is None:
+            raise ValueError("Variants require images to be exported")
+        self.workers = os.cpu_count() if workers is None else workers
+        self.cache = cache
+        self.incremental = incremental
+        self.images = images
+        self.variants = variants
+        self.projection = projection
+        self.text_format = text_format
+        self.timings: dict[str, float] = {}
+        self.skipped: list[str] = []
+        self.report: BuildReport | None = None
+
+    def copy(self) -> "Pipeline":
+        """
+        Copy the pipeline with its own timings, skipped frames and image exports,
+        e.g., to build several files at once in threads.
+
+        The manifest of exported images is shared with the copy.
+        """
+        pipeline = copy.copy(self)
+        pipeline.timings, pipeline.skipped, pipeline.report = {}, [], None
+        if self.images is not None:
+            pipeline.images = copy.copy(self.images)
+        if self.variants is not None:
+            pipeline.variants = copy.copy(self.variants)
+            pipeline.variants.exporter = pipeline.images
+        return pipeline
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Record the wall time of a pipeline stage.
+        """
+        start = time.perf_counter()
+        try:
+            with span(name):
+                yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0) + time.perf_counter() - start
+
+    def fetch(
+        self,
+        key: str,
+        refresh: bool = False,
+        path: str | os.PathLike | None = None,
+    ) -> Document:
+        """
+        Load a Figma file as a document, from a local export if `path` is given.
+        """
+        with self.stage("fetch"):
+            if path is not None:
+                return Document.from_file(path, projection=self.projection)
+            return Document.from_file_key(
+                key, cache=self.cache, refresh=refresh, projection=self.projection
+            )
+
+    def export_images(self, document: Document, key: str) -> dict[str, str]:
+        """
+        Export the images in a document, see `ImageExporter`.
+
+        Returns
+        -------
+        dict[str, str]
+            URLs or paths of the images by node ID.
+        """
+        with self.stage("images"):
+            return self.images.export(key, collect_images(document))
+
+    def make_variants(self) -> dict[str, list[ImageVariant]]:
+        """
+        Create variants of the exported images, see `VariantGenerator`.
+
+        Returns
+        -------
+        dict[str, list[ImageVariant]]
+            Variants of the images by node ID.
+        """
+        with self.stage("variants"):
+            return self.variants.generate()
+
+    def extract(
+        self,
+        document: Document,
+        key: str,
+        urls: dict[str, str] | None = None,
+        srcsets: dict[str, list[ImageVariant]] | None = None,
+    ) -> Generator[dict, None, None]:
+        """
+        Extract the contents of all registered frames in a document.
+
+        Sections are yielded in the reading order as soon as their frames are
+        extracted, so that they can be written without keeping the whole course.
+
+        Parameters
+        ----------
+        document : Document
+            Document to extract the frames from.
+        key : str
+            Key of the Figma file, used to cache frames for incremental builds.
+        urls : dict[str, str], optional
+            URLs of exported images by node ID, see `export_images`.
+        srcsets : dict[str, list[ImageVariant]], optional
+            Variants of exported images by node ID, see `make_variants`.
+
+        Yields
+        ------
+        dict
+            Section with its ID, name, path of parent section names and frames.
+        """
+        builder = IncrementalBuilder(key) if self.incremental else None
+        # sections are only built when they are yielded, so that their contents
+        # are released once written, and cached contents are only read then
+        pending: deque[tuple[dict, list[Node], list[Node]]] = deque()
+        for path, section in iter_sections(document):
+            frames, nodes = [], []
+            for node in section.select_nodes("FRAME", recursive=False):
+                if (frame := FRAMES.get(node.name)) is None:
+                    self.skipped.append(f"{node.name} ({node.id})")
+                    continue
+                frames.append(node)
+                if builder is None:
+                    nodes.append(node)
+                    continue
+                # cached contents are only valid for the same image URLs and text
+                # format
+                context = []
+                if urls:
+                    images = [
+                        [urls.get(image.id)]
+                        + [variant.url for variant in (srcsets or {}).get(image.id, [])]
+                        for image in collect_images(node)
+                    ]
+                    context.append(json.dumps(images))
+                if self.text_format != "plain":
+                    context.append(self.text_format)
+                if not builder.record(node, frame, ":".join(context)):
+                    nodes.append(node)
+            header = {"id": section.id, "name": section.name, "path": path}
+            pending.append((header, frames, nodes))
+        batches = [nodes for _, _, nodes in pending]
+        pool = ProcessPoolExecutor(self.workers) if self.workers else None
+        try:
+            # results are mapped lazily in the order of the sections
+            function = partial(
+                extract_frames, urls=urls, srcsets=srcsets, format=self.text_format
+            )
+            for contents in (pool.map if pool else map)(function, batches):
+                header, frames, nodes = pending.popleft()
+                extracted = {}
+                for node, content in zip(nodes, contents):
+                    extracted[node.id] = content
+                    if builder:
+                        builder.store(node, content)
+                yield header | {
+                    "frames": [
+                        (
+                            extracted[node.id]
+                            if node.id in extracted
+                            else builder.load(node)
+                        )
+                        for node in frames
+                    ]
+                }
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        if builder:
+            self.report = builder.save()
+
+    @staticmethod
+    def get_header(document: Document, key: str) -> dict:
+        """
+        Get the metadata of a course written before its sections.
+        """
+        metadata = {
+            name: document.metadata.get(name)
+            for name in ("name", "version", "lastModified")
+        }
+        return metadata | {"key": key}
+
+    def build(
+        self,
+        key: str,
+        refresh: bool = False,
+        path: str | os.PathLike | None = None,
+    ) -> dict:
+        """
+        Build a course from a Figma file in memory.
+
+        Parameters
+        ----------
+        key : str
+            Key of the Figma file.
+        refresh : bool, default=False
+            If True, download the file even if the cached snapshot is up to date.
+        path : str | os.PathLike, optional
+            Path to a local JSON export of the file, see `run`.
+
+        Returns
+        -------
+        dict
+            Metadata of the course, see `get_header`, with its sections.
+        """
+        document = self.fetch(key, refresh=refresh, path=path)
+        urls = self.export_images(document, key) if self.images else None
+        srcsets = self.make_variants() if self.variants else None
+        with self.stage("extract"):
+            sections = list(self.extract(document, key, urls, srcsets))
+        return self.get_header(document, key) | {"sections": sections}
+
+    def run(
+        self,
+        key: str,
+        output: str | os.PathLike,
+        refresh: bool = False,
+        format: Literal["json", "ndjson"] = "json",
+        path: str | os.PathLike | None = None,
+    ) -> None:
+        """
+        Build a course from a Figma file and stream it to a file.
+
+        Parameters
+        ----------
+        key : str
+            Key of the Figma file.
+        output : str | os.PathLike
+            Path to write the course to.
+        refresh : bool, default=False
+            If True, download the file even if the cached snapshot is up to date.
+        format : Literal["json", "ndjson"], default="json"
+            Format of the output, see `CourseWriter`.
+        path : str | os.PathLike, optional
+            Path to a local JSON export of the file, optionally compressed, to
+            build from instead of downloading it, see `Document.from_file`.
+        """
+        document = self.fetch(key, refresh=refresh, path=path)
+        urls = self.export_images(document, key) if self.images else None
+        srcsets = self.make_variants() if self.variants else None
+        header = self.get_header(document, key)
+        with CourseWriter(output, format=format, header=header) as writer:
+            sections = self.extract(document, key, urls, srcsets)
+            while True:
+                with self.stage("extract"):
+                    section = next(sections, None)
+                if section is None:
+                    break
+                with self.stage("write"):
+                    writer.write(section)
+
+    def print_summary(self, file=sys.stderr) -> None:
+        """
+        Print the wall time of each stage and the frames that were skipped.
+        """
+        for name, seconds in self.timings.items():
+            print(f"{name}: {seconds:.2f}s", file=file)
+        if self.skipped:
+            print(f"skipped unregistered frames: {', '.join(self.skipped)}", file=file)
+        if self.report is not None:
+            print(f"frames: {self.report}", file=file)
+        if self.images is not None and self.images.failed:
+            failed = ", ".join(
+                f"{id} ({error})" for id, error in self.images.failed.items()
+            )
+            print(f"failed images: {failed}", file=file)
@@ -0,0 +1,365 @@
+"""
+Long-running service that rebuilds courses when Figma files change.
+
+Figma posts a webhook event to the service whenever a file is edited
+(FILE_UPDATE) or a version is saved (FILE_VERSION_UPDATE). Editors make bursts of
+edits, so rebuilds are debounced per file: a file is rebuilt once no event has
+arrived for `debounce` seconds, or at the latest `max_delay` seconds after the
+first event of a burst. A file is never rebuilt twice at once, events received
+during a rebuild are coalesced into a single rebuild after it, and different files
+are rebuilt concurrently.
+
+Events can be posted locally to test the service, e.g.,
+`curl -d '{"event_type": "FILE_UPDATE", "file_key": "<key>"}' localhost:8000/webhook`.
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Literal
+
+import orjson
+from pydantic import BaseModel
+
+from .pipeline import Pipeline
+
+__all__ = ["EVENT_TYPES", "RebuildService", "RebuildStatus", "WebhookHandler", "serve"]
+
+# webhook events that trigger a rebuild of the file
+EVENT_TYPES = ("FILE_UPDATE", "FILE_VERSION_UPDATE")
+# maximum size of a webhook payload in bytes
+MAX_PAYLOAD_SIZE = 2**20
+
+
+class RebuildStatus(BaseModel):
+    """
+    Status of the rebuilds of a file.
+
+    Times are ISO 8601 timestamps in UTC.
+    """
+
+    events: int = 0
+    builds: int = 0
+    failures: int = 0
+    pending: bool = False
+    running: bool = False
+    last_event: str | None = None
+    last_build: str | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class RebuildService:
+    """
+    Scheduler of debounced rebuilds of Figma files triggered by webhook events.
+
+    Each rebuild runs a copy of the pipeline, whose cache downloads the file again
+    as its last modification has changed, and publishes the course to
+    `<directory>/<key>.<format>`, which `CourseWriter` replaces only once the course
+    is complete, so that readers never see a partial course.
+
+    Examples
+    --------
+    >>> with RebuildService(Pipeline(incremental=True), "public") as service:
+    ...     service.trigger("key")
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        directory: str | os.PathLike,
+        debounce: float = 10.0,
+        max_delay: float = 120.0,
+        format: Literal["json", "ndjson"] = "json",
+        keys: Iterable[str] | None = None,
+        passcode: str | None = None,
+        concurrency: int = 2,
+        refresh: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        pipeline : Pipeline
+            Pipeline to rebuild the files with, copied for each rebuild.
+        directory : str | os.PathLike
+            Directory to publish the courses to.
+        debounce : float, default=10.0
+            Seconds without events after which a file is rebuilt.
+        max_delay : float, default=120.0
+            Maximum seconds between the first event of a burst and the rebuild,
+            so that a file edited continuously is still rebuilt.
+        format : Literal["json", "ndjson"], default="json"
+            Format of the courses, see `CourseWriter`.
+        keys : Iterable[str], optional
+            Keys of the files that may be rebuilt. Defaults to any file.
+        passcode : str, optional
+            Passcode of the webhooks. If set, events with another passcode are
+            rejected.
+        concurrency : int, default=2
+            Maximum number of files rebuilt at once.
+        refresh : bool, default=False
+            If True, download the files even if the cached snapshots are up to
+            date.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.pipeline = pipeline
+        self.directory = Path(directory)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.format = format
+        self.keys = None if keys is None else frozenset(keys)
+        self.passcode = passcode
+        self.concurrency = concurrency
+        self.refresh = refresh
+        self.statuses: dict[str, RebuildStatus] = {}
+        # due times of pending rebuilds and first events of their bursts
+        self._due: dict[str, float] = {}
+        self._first: dict[str, float] = {}
+        self._running: set[str] = set()
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "RebuildService":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Start scheduling rebuilds in a background thread.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._condition:
+            if not self._stopped:
+                return
+            self._stopped = False
+        self._executor = ThreadPoolExecutor(
+            self.concurrency, thread_name_prefix="rebuild"
+        )
+        self._thread = threading.Thread(
+            target=self._schedule, name="scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop scheduling rebuilds, dropping pending ones.
+
+        Parameters
+        ----------
+        wait : bool, default=True
+            If True, wait for running rebuilds to finish.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def trigger(self, key: str) -> None:
+        """
+        Schedule a debounced rebuild of a file.
+        """
+        now = time.monotonic()
+        with self._condition:
+            status = self.statuses.setdefault(key, RebuildStatus())
+            status.events += 1
+            status.last_event = _now()
+            status.pending = True
+            first = self._first.setdefault(key, now)
+            self._due[key] = min(now + self.debounce, first + self.max_delay)
+            self._condition.notify()
+
+    def handle(self, payload: dict) -> tuple[HTTPStatus, str]:
+        """
+        Handle the payload of a webhook event.
+
+        Returns
+        -------
+        tuple[HTTPStatus, str]
+            Status and message of the response. Rebuilds are scheduled with
+            `HTTPStatus.ACCEPTED`, and ignored events, e.g., PING, are answered
+            with `HTTPStatus.OK`.
+        """
+        if self.passcode is not None and not hmac.compare_digest(
+            str(payload.get("passcode", "")).encode(), self.passcode.encode()
+        ):
+            return HTTPStatus.FORBIDDEN, "invalid passcode"
+        event = payload.get("event_type")
+        if event not in EVENT_TYPES:
+            return HTTPStatus.OK, f"ignored event {event}"
+        key = payload.get("file_key")
+        if not isinstance(key, str) or not key:
+            return HTTPStatus.BAD_REQUEST, "missing file_key"
+        if self.keys is not None and key not in self.keys:
+            return HTTPStatus.NOT_FOUND, f"unknown file {key}"
+        self.trigger(key)
+        return HTTPStatus.ACCEPTED, f"scheduled rebuild of {key}"
+
+    def status(self) -> dict[str, dict]:
+        """
+        Get the status of the rebuilds of each file.
+        """
+        with self._condition:
+            return {key: status.model_dump() for key, status in self.statuses.items()}
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Wait until no rebuild is pending or running.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._due and not self._running, timeout
+            )
+
+    def rebuild(self, key: str) -> Path:
+        """
+        Rebuild a file and publish its course.
+
+        Returns
+        -------
+        Path
+            Path of the published course.
+        """
+        path = self.directory / f"{key}.{self.format}"
+        # the course replaces the published file only once it is complete
+        self.pipeline.copy().run(key, path, refresh=self.refresh, format=self.format)
+        return path
+
+    def _schedule(self) -> None:
+        """
+        Submit rebuilds that are due, unless the file is already being rebuilt.
+        """
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                waiting = {
+                    key: due
+                    for key, due in self._due.items()
+                    if key not in self._running
+                }
+                for key, due in waiting.items():
+                    if due <= now:
+                        del self._due[key], self._first[key]
+                        self._running.add(key)
+                        status = self.statuses[key]
+                        status.pending, status.running = False, True
+                        self._executor.submit(self._run, key)
+                timeout = min(
+                    (due - now for due in waiting.values() if due > now), default=None
+                )
+                self._condition.wait(timeout)
+
+    def _run(self, key: str) -> None:
+        """
+        Rebuild a file and record its status.
+        """
+        start, error = time.perf_counter(), None
+        try:
+            path = self.rebuild(key)
+            print(f"published {path}", file=sys.stderr)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        with self._condition:
+            self._running.discard(key)
+            status = self.statuses[key]
+            status.running = False
+            status.builds += 1
+            status.failures += error is not None
+            status.last_build = _now()
+            status.last_duration = time.perf_counter() - start
+            status.last_error = error
+            # events received during the rebuild are already due or debounced
+            status.pending = key in self._due
+            self._condition.notify_all()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """
+    Handler of webhook events posted to `/webhook` and status requests to `/status`.
+    """
+
+    server: "ThreadingHTTPServer"
+
+    def _respond(self, status: HTTPStatus, body: dict) -> None:
+        data = orjson.dumps(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/status":
+            self._respond(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        self._respond(HTTPStatus.OK, self.server.service.status())
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/webhook":
+            self._respond(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        size = int(self.headers.get("Content-Length") or 0)
+        if size > MAX_PAYLOAD_SIZE:
+            self._respond(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "too large"})
+            return
+        try:
+            payload = orjson.loads(self.rfile.read(size))
+        except orjson.JSONDecodeError:
+            payload = None
+        if not isinstance(payload, dict):
+            self._respond(HTTPStatus.BAD_REQUEST, {"error": "invalid JSON object"})
+            return
+        status, message = self.server.service.handle(payload)
+        key = "error" if status >= HTTPStatus.BAD_REQUEST else "message"
+        self._respond(status, {key: message})
+
+
+def serve(service: RebuildService, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Serve webhook events until interrupted.
+
+    Parameters
+    ----------
+    service : RebuildService
+        Service to schedule the rebuilds with, started and stopped by the server.
+    host : str, default="127.0.0.1"
+        Address to listen on.
+    port : int, default=8000
+        Port to listen on.
+    """
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    server.service = service
+    print(f"listening on http://{host}:{server.server_port}/webhook", file=sys.stderr)
+    with service, server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,366 @@
+"""
+Generator of synthetic Figma files that follow the templates of the course, used
+to benchmark the pipeline without access to a live Figma file.
+"""
+
+import random
+
+__all__ = ["SyntheticFile", "generate_file"]
+
+# frames of a lesson section after its cover, repeated to fill the section
+LESSON_FRAMES = [
+    "text",
+    "key_concepts",
+    "photo-vertical",
+    "quote_large_with_name",
+    "lesson_part_cover",
+    "key_takeaways",
+]
+
+WORDS = (
+    "energy solar wind grid access power access transition climate finance policy "
+    "efficiency storage renewable household community market clean cooking"
+).split()
+
+
+class SyntheticFile:
+    """
+    Generator of nodes of a synthetic Figma file.
+
+    Nodes are created as JSON dictionaries in the format of the Figma API with
+    bounding boxes that place siblings in the order they are listed. Children are
+    shuffled like layers in Figma, which are not stored in the reading order.
+
+    Examples
+    --------
+    >>> generator = SyntheticFile(seed=42, items=4, leaves=20)
+    >>> frame = generator.frame("learning_objectives")
+    >>> node = Node(**frame)
+    """
+
+    def __init__(self, seed: int = 0, items: int = 3, leaves: int = 0):
+        """
+        Parameters
+        ----------
+        seed : int, default=0
+            Seed of the random generator of texts and layer order.
+        items : int, default=3
+            Number of repeated items in frames, e.g., cards or concepts.
+        leaves : int, default=0
+            Number of decorative vector nodes added to each frame and card.
+        """
+        self.random = random.Random(seed)
+        self.items = items
+        self.leaves = leaves
+        self.count = 0
+        self.templates = {
+            "module_cover": self.cover,
+            "chapter_cover": self.cover,
+            "lesson_cover": self.cover,
+            "lesson_part_cover": self.cover,
+            "text": self.text_frame,
+            "learning_objectives": self.cards,
+            "key_takeaways": self.cards,
+            "connection_next": self.connection_next,
+            "list_of_lessons": self.list_of_lessons,
+            "key_concepts": self.key_concepts,
+            "photo-vertical": self.photo_vertical,
+            "quote_large_with_name": self.quote,
+            "module_outro": self.outro,
+            "chapter_outro": self.outro,
+        }
+
+    def node(
+        self, type: str, name: str, children: list[dict] | None = None, **properties
+    ) -> dict:
+        """
+        Create a node placed below the nodes created before it.
+        """
+        self.count += 1
+        data = {
+            "id": f"{self.count // 1000}:{self.count % 1000}",
+            "name": name,
+            "type": type,
+            "absoluteBoundingBox": {
+                "x": 0,
+                "y": self.count * 10,
+                "width": 100,
+                "height": 10,
+            },
+        }
+        if children is not None:
+            data["children"] = self.random.sample(children, len(children))
+        return data | properties
+
+    def words(self, count: int) -> str:
+        """
+        Create a text of random words.
+        """
+        return " ".join(self.random.choices(WORDS, k=count))
+
+    def text(self, name: str, words: int = 3) -> dict:
+        """
+        Create a text node.
+        """
+        return self.node("TEXT", name, characters=self.words(words))
+
+    def decoration(self) -> list[dict]:
+        """
+        Create decorative vector nodes that frames do not extract.
+        """
+        if not self.leaves:
+            return []
+        vectors = [self.node("VECTOR", "Vector") for _ in range(self.leaves)]
+        return [self.node("GROUP", "decoration", vectors)]
+
+    def image(self, name: str = "image") -> dict:
+        """
+        Create an image group with a caption.
+        """
+        rectangle = self.node(
+            "RECTANGLE",
+            f"{self.words(1)}_{self.count}.png",
+            fills=[{"type": "IMAGE", "scaleMode": "FILL", "imageRef": str(self.count)}],
+        )
+        return self.node("GROUP", name, [rectangle, self.text("caption", 5)])
+
+    def cover(self, name: str) -> dict:
+        """
+        Create a cover frame, whose intro is a text in lesson part covers.
+        """
+        if name == "lesson_part_cover":
+            intro = self.text("intro", 2)
+        else:
+            label = name.removesuffix("_cover")
+            intro = self.node(
+                "GROUP",
+                label,
+                [self.text("label", 1), self.node("TEXT", "number", characters="1")],
+            )
+        children = [self.image(), intro, self.text("title", 5), self.text("cta", 6)]
+        return self.node("FRAME", name, children + self.decoration())
+
+    def text_frame(self, name: str) -> dict:
+        """
+        Create a text frame with paragraphs.
+        """
+        paragraphs = [
+            self.node("GROUP", f"paragraph_{i}", [self.text("text", 50)])
+            for i in range(self.items)
+        ]
+        return self.node("FRAME", name, paragraphs)
+
+    def cards(self, name: str) -> dict:
+        """
+        Create a learning objectives or key takeaways frame with cards.
+        """
+        # both frames name their cards as selected by `LearningObjectives.plan`
+        cards = [
+            self.node(
+                "GROUP",
+                f"objectives_{i}",
+                self.decoration()
+                + [self.image(), self.text("title", 4), self.text("description", 20)],
+            )
+            for i in range(self.items)
+        ]
+        children = [self.text("title", 3), self.text("intro", 10)] + cards
+        return self.node("FRAME", name, children + self.decoration())
+
+    def connection_next(self, name: str) -> dict:
+        """
+        Create a connection frame to the next module.
+        """
+        children = [
+            self.image(),
+            self.text("intro", 5),
+            self.text("title", 5),
+            self.text("cta", 2),
+        ]
+        return self.node("FRAME", name, children + self.decoration())
+
+    def list_of_lessons(self, name: str) -> dict:
+        """
+        Create a lesson overview frame with thumbnails.
+        """
+        lessons = [
+            self.node(
+                "GROUP",
+                f"lessons_{i}",
+                [self.image(), self.text("title", 4)]
+                + ([self.node("RECTANGLE", "progress")] if i % 2 else []),
+            )
+            for i in range(self.items)
+        ]
+        return self.node("FRAME", name, [self.text("title", 3)] + lessons)
+
+    def key_concepts(self, name: str) -> dict:
+        """
+        Create a key concepts frame, where every other concept has a source.
+        """
+        concepts = [
+            self.node(
+                "GROUP",
+                f"concepts_{i}",
+                [self.text("title", 2), self.text("body", 30)]
+                + ([self.text("source", 4)] if i % 2 else []),
+            )
+            for i in range(self.items)
+        ]
+        children = [self.text("title", 2), self.text("intro", 10)] + concepts
+        return self.node("FRAME", name, children + self.decoration())
+
+    def photo_vertical(self, name: str) -> dict:
+        """
+        Create a photo frame.
+        """
+        return self.node("FRAME", name, self.image()["children"])
+
+    def quote(self, name: str) -> dict:
+        """
+        Create a quote frame.
+        """
+        children = [self.text("quote", 30), self.text("author", 2)]
+        return self.node("FRAME", name, children + self.decoration())
+
+    def outro(self, name: str) -> dict:
+        """
+        Create an outro frame with a quiz block.
+        """
+        quiz = self.node(
+            "GROUP",
+            "quiz",
+            [
+                self.text("intro", 3),
+                self.text("title", 4),
+                self.text("cta", 2),
+                self.text("buttonCta", 2),
+                self.image(),
+            ],
+        )
+        children = [
+            self.text("intro", 3),
+            self.text("first_line", 4),
+            self.text("subtitle", 4),
+            self.text("body", 30),
+            quiz,
+        ]
+        return self.node("FRAME", name, children + self.decoration())
+
+    def frame(self, name: str) -> dict:
+        """
+        Create a frame node of a template.
+
+        Parameters
+        ----------
+        name : str
+            Template name of the frame, e.g., "key_concepts".
+
+        Returns
+        -------
+        dict
+            Frame node with the descendants expected by its frame class.
+        """
+        if (template := self.templates.get(name)) is None:
+            raise ValueError(f"Unknown template {name}")
+        return template(name)
+
+    def section(self, name: str, children: list[dict | str]) -> dict:
+        """
+        Create a section with frames, given by their template names, and nested
+        sections in the reading order.
+        """
+        children = [
+            self.frame(child) if isinstance(child, str) else child for child in children
+        ]
+        return self.node("SECTION", name, children)
+
+    def file(
+        self, modules: int = 1, chapters: int = 2, lessons: int = 3, frames: int = 6
+    ) -> dict:
+        """
+        Create a file with a page per module.
+
+        Parameters
+        ----------
+        modules : int, default=1
+            Number of modules.
+        chapters : int, default=2
+            Number of chapters per module.
+        lessons : int, default=3
+            Number of lessons per chapter.
+        frames : int, default=6
+            Number of frames per lesson after its cover.
+
+        Returns
+        -------
+        dict
+            File in the format returned by the Figma API.
+        """
+        lesson = [LESSON_FRAMES[i % len(LESSON_FRAMES)] for i in range(frames)]
+        pages = []
+        for module in range(1, modules + 1):
+            # nodes are created in the reading order to lay them out accordingly
+            children = ["module_cover", "text", "learning_objectives"]
+            children += ["connection_next"]
+            for chapter in range(1, chapters + 1):
+                nested = [
+                    self.section(
+                        f"Lesson {module}.{chapter}.{number}", ["lesson_cover"] + lesson
+                    )
+                    for number in range(1, lessons + 1)
+                ]
+                children.append(
+                    self.section(
+                        f"Chapter {module}.{chapter}",
+                        ["chapter_cover", "list_of_lessons", *nested, "chapter_outro"],
+                    )
+                )
+            children.append("module_outro")
+            section = self.section(f"Module {module}", children)
+            pages.append(self.node("CANVAS", f"Module {module}", [section]))
+        return {
+            "name": "Synthetic course",
+            "lastModified": "2024-01-01T00:00:00Z",
+            "version": "1",
+            "document": self.node("DOCUMENT", "Document", pages),
+        }
+
+
+def generate_file(
+    modules: int = 1,
+    chapters: int = 2,
+    lessons: int = 3,
+    frames: int = 6,
+    items: int = 3,
+    leaves: int = 10,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate a synthetic Figma file of a course.
+
+    Parameters
+    ----------
+    modules : int, default=1
+        Number of modules.
+    chapters : int, default=2
+        Number of chapters per module.
+    lessons : int, default=3
+        Number of lessons per chapter.
+    frames : int, default=6
+        Number of frames per lesson after its cover.
+    items : int, default=3
+        Number of repeated items in frames, e.g., cards or concepts.
+    leaves : int, default=10
+        Number of decorative vector nodes added to each frame and card.
+    seed : int, default=0
+        Seed of the random generator.
+
+    Returns
+    -------
+    dict
+        File in the format returned by the Figma API, which can be loaded with
+        `Document(**file.pop("document"), metadata=file)`.
+    """
+    generator = SyntheticFile(seed=seed, items=items, leaves=leaves)
+    return generator.file(modules, chapters, lessons, frames)
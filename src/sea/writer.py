@@ -0,0 +1,134 @@
+"""
+Streaming writer of course contents to JSON or NDJSON files.
+"""
+
+import os
+import secrets
+from pathlib import Path
+from typing import Literal
+
+import orjson
+from pydantic import BaseModel
+
+from .entities.frames import FrameBase
+
+__all__ = ["CourseWriter"]
+
+
+class CourseWriter:
+    """
+    Writer that streams items to disk as soon as they are extracted.
+
+    In the "json" format, the items are written incrementally as a well-formed JSON
+    array, which is wrapped in an object with the header if one is provided, e.g.,
+    `{"name": ..., "sections": [...]}`. In the "ndjson" format, each item is written
+    on a separate line, preceded by the header line if one is provided. Only one
+    item is kept in memory at once regardless of the number of items.
+
+    Items are written to a temporary file next to the path, which replaces the file
+    at the path only when the writer is closed without an error, so that a failed
+    build keeps the previous output.
+
+    Examples
+    --------
+    >>> with CourseWriter("course.json", header={"name": "Course"}) as writer:
+    ...     for section in sections:
+    ...         writer.write(section)
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        format: Literal["json", "ndjson"] = "json",
+        header: dict | None = None,
+        key: str = "sections",
+        buffer_size: int = 2**20,
+    ):
+        """
+        Parameters
+        ----------
+        path : str | os.PathLike
+            Path to write the items to.
+        format : Literal["json", "ndjson"], default="json"
+            Format of the output file.
+        header : dict, optional
+            Metadata written before the items.
+        key : str, default="sections"
+            Key of the array of items in the JSON object if a header is provided.
+        buffer_size : int, default=2**20
+            Size of the write buffer in bytes.
+        """
+        if format not in {"json", "ndjson"}:
+            raise ValueError(f"Unsupported format {format}")
+        self.format = format
+        self.count = 0
+        self.path = Path(path)
+        # items are written to a temporary file that replaces the output once
+        # finished, so that a failed build never leaves a truncated course
+        self.temporary = self.path.with_name(
+            f".{self.path.name}.{secrets.token_hex(4)}.tmp"
+        )
+        self.file = open(self.temporary, "xb", buffering=buffer_size)
+        if format == "ndjson":
+            if header is not None:
+                self.file.write(orjson.dumps(header, option=orjson.OPT_APPEND_NEWLINE))
+            self.footer = b""
+        elif header is None:
+            self.file.write(b"[")
+            self.footer = b"]"
+        else:
+            # leave the array and the object open to append the items
+            self.file.write(orjson.dumps(header | {key: []})[:-2])
+            self.footer = b"]}"
+
+    def __enter__(self) -> "CourseWriter":
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, item: dict | BaseModel) -> None:
+        """
+        Write an item, e.g., a section or a frame.
+
+        Parameters
+        ----------
+        item : dict | BaseModel
+            Item to write. Frames are written as returned by
+            `FrameBase.to_content_json` and other models as returned by
+            `model_dump_json`.
+        """
+        if isinstance(item, FrameBase):
+            data = item.to_content_json()
+        elif isinstance(item, BaseModel):
+            data = item.model_dump_json().encode()
+        else:
+            data = orjson.dumps(item)
+        if self.format == "ndjson":
+            self.file.write(data + b"\n")
+        else:
+            self.file.write(b"," + data if self.count else data)
+        self.count += 1
+
+    def close(self) -> None:
+        """
+        Finish the output and replace the file at the path with it.
+        """
+        if not self.file.closed:
+            try:
+                self.file.write(self.footer)
+                self.file.close()
+                os.replace(self.temporary, self.path)
+            except BaseException:
+                self.abort()
+                raise
+
+    def abort(self) -> None:
+        """
+        Discard the output, keeping any previous file at the path.
+        """
+        self.file.close()
+        self.temporary.unlink(missing_ok=True)
@@ -0,0 +1,103 @@
+"""
+Fixtures shared by the tests, including a local stand-in of the Figma API.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, NamedTuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from sea.entities.client import FigmaClient
+
+# status, headers and body of a response of the stand-in server
+Response = tuple[int, dict[str, str], bytes]
+
+
+class Request(NamedTuple):
+    """
+    Request received by the stand-in server.
+    """
+
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+
+
+def _not_found(request: Request) -> Response:
+    return 404, {}, b""
+
+
+class StubServer:
+    """
+    Local stand-in of the Figma API.
+
+    Requests are answered by `handler` and recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.handler: Callable[[Request], Response] = _not_found
+        self.requests: list[Request] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        )
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, request: Request) -> Response:
+        with self._lock:
+            self.requests.append(request)
+        return self.handler(request)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        request = Request(url.path, query, dict(self.headers))
+        status, headers, body = self.server.stub.respond(request)
+        self.send_response(status)
+        headers = {"Content-Length": str(len(body))} | headers
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        # a shorter body than its Content-Length simulates a broken download
+        self.wfile.write(body)
+        if int(headers["Content-Length"]) != len(body):
+            self.close_connection = True
+
+
+@pytest.fixture
+def server():
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return FigmaClient(
+        token="token",
+        base_url=server.url,
+        rate=1000,
+        burst=100,
+        retries=2,
+        backoff=0.01,
+        max_backoff=0.5,
+        timeout=5,
+    )
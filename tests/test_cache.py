@@ -0,0 +1,107 @@
+import gzip
+import os
+import time
+
+import orjson
+import pytest
+
+from sea.entities.cache import FileCache
+
+
+class FileServer:
+    """
+    Handler serving a Figma file whose version can be changed.
+    """
+
+    def __init__(self, version: str = "1"):
+        self.version = version
+        self.broken = False
+
+    def get_content(self) -> bytes:
+        return orjson.dumps({"version": self.version, "document": {"id": "0:0"}})
+
+    def __call__(self, request):
+        if request.query.get("depth") == "1":
+            return 200, {}, orjson.dumps({"version": self.version})
+        content = self.get_content()
+        if self.broken:
+            # the connection is closed before the whole file is sent
+            return 200, {"Content-Length": str(len(content))}, content[:10]
+        return 200, {}, content
+
+
+@pytest.fixture
+def files(server):
+    server.handler = FileServer()
+    return server.handler
+
+
+def download_count(server) -> int:
+    return sum(1 for request in server.requests if "depth" not in request.query)
+
+
+def test_fetch_downloads_once_per_version(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    path = cache.fetch("key")
+    assert gzip.decompress(path.read_bytes()) == files.get_content()
+    assert cache.fetch("key") == path
+    assert download_count(server) == 1
+    assert cache.fetch("key", refresh=True) == path
+    assert download_count(server) == 2
+
+
+def test_fetch_replaces_older_versions(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    old = cache.fetch("key")
+    files.version = "2"
+    new = cache.fetch("key")
+    assert new != old
+    assert not old.exists()
+    assert gzip.decompress(new.read_bytes()) == files.get_content()
+    assert download_count(server) == 2
+
+
+def test_fetch_removes_partial_downloads(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    files.broken = True
+    with pytest.raises(Exception):
+        cache.fetch("key")
+    assert os.listdir(tmp_path) == []
+    files.broken = False
+    assert cache.fetch("key").exists()
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_evict_removes_least_recently_used(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    first, second = cache.fetch("first"), cache.fetch("second")
+    # make the first snapshot the least recently used one
+    past = time.time() - 60
+    os.utime(first, (past, past))
+    cache.max_size = second.stat().st_size
+    cache.evict()
+    assert not first.exists() and second.exists()
+    # the most recent snapshot is kept even if it is too large
+    cache.max_size = 0
+    cache.evict()
+    assert second.exists()
+
+
+def test_fetch_marks_snapshots_as_recently_used(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    first = cache.fetch("first")
+    past = time.time() - 60
+    os.utime(first, (past, past))
+    second = cache.fetch("second")
+    os.utime(second, (past - 60, past - 60))
+    cache.fetch("first")
+    cache.max_size = first.stat().st_size
+    cache.evict()
+    assert first.exists() and not second.exists()
+
+
+def test_clear(tmp_path, server, client, files):
+    cache = FileCache(tmp_path, client=client)
+    cache.fetch("key")
+    cache.clear()
+    assert os.listdir(tmp_path) == []
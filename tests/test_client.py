@@ -0,0 +1,98 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from sea.entities.client import FigmaClient
+
+
+def queue(*responses):
+    """
+    Answer the requests with the given responses in order, repeating the last one.
+    """
+    responses = list(responses)
+
+    def handler(request):
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return handler
+
+
+def test_get_retries_throttled_and_server_errors(server, client):
+    server.handler = queue(
+        (429, {"Retry-After": "0"}, b""),
+        (503, {}, b""),
+        (200, {}, b'{"name": "Course"}'),
+    )
+    assert client.get("v1/files/key").json() == {"name": "Course"}
+    assert len(server.requests) == 3
+    stats = client.stats["files/:key"]
+    assert (stats.requests, stats.retries, stats.errors) == (3, 2, 2)
+
+
+def test_get_raises_once_retries_are_exhausted(server, client):
+    server.handler = queue((500, {}, b""))
+    with pytest.raises(requests.HTTPError):
+        client.get("v1/files/key")
+    assert len(server.requests) == client.retries + 1
+
+
+def test_get_does_not_retry_client_errors(server, client):
+    server.handler = queue((403, {}, b"forbidden"))
+    with pytest.raises(requests.HTTPError):
+        client.get("v1/files/key")
+    assert len(server.requests) == 1
+
+
+@pytest.mark.parametrize("status", [404, 500])
+def test_get_closes_streamed_error_responses(server, client, status):
+    server.handler = queue((status, {}, b"error"))
+    with pytest.raises(requests.HTTPError) as error:
+        client.get("v1/files/key", stream=True)
+    assert error.value.response.raw.closed
+
+
+def test_get_waits_for_retry_after(server, client):
+    server.handler = queue((429, {"Retry-After": "0.2"}, b""), (200, {}, b"{}"))
+    start = time.monotonic()
+    client.get("v1/files/key")
+    assert time.monotonic() - start >= 0.2
+
+
+def make_response(retry_after: str) -> requests.Response:
+    response = requests.Response()
+    response.headers["Retry-After"] = retry_after
+    return response
+
+
+@pytest.mark.parametrize(
+    "retry_after, delay",
+    [("2", 2.0), ("3600", 5.0), ("-1", 0.0), ("inf", 5.0)],
+)
+def test_retry_after_seconds_are_clamped(retry_after, delay):
+    client = FigmaClient(token="token", max_backoff=5.0)
+    assert client._get_delay(0, make_response(retry_after)) == delay
+
+
+def test_retry_after_dates_are_parsed():
+    client = FigmaClient(token="token", max_backoff=60.0)
+    later = formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= client._get_delay(0, make_response(later)) <= 30
+    earlier = formatdate(time.time() - 30, usegmt=True)
+    assert client._get_delay(0, make_response(earlier)) == 0.0
+
+
+def test_invalid_retry_after_falls_back_to_backoff():
+    client = FigmaClient(token="token", backoff=1.0, max_backoff=3.0)
+    for attempt in range(5):
+        assert 0 <= client._get_delay(attempt, make_response("soon")) <= 3.0
+
+
+def test_download_does_not_send_the_token(server, client):
+    server.handler = queue((200, {}, b"image"))
+    assert client.download(f"{server.url}/render/image.png") == b"image"
+    client.get("v1/files/key")
+    download, request = server.requests
+    assert "X-Figma-Token" not in download.headers
+    assert request.headers["X-Figma-Token"] == "token"
@@ -0,0 +1,58 @@
+import sys
+
+from sea.entities.compact import CompactDocument
+
+TREE = {
+    "id": "0:0",
+    "name": "Document",
+    "type": "DOCUMENT",
+    "children": [
+        {
+            "id": "0:1",
+            "name": "Page",
+            "type": "CANVAS",
+            "children": [
+                {
+                    "id": "1:0",
+                    "name": "Frame",
+                    "type": "FRAME",
+                    "absoluteBoundingBox": {"x": 0, "y": 0, "width": 10, "height": 5},
+                    "children": [
+                        {
+                            "id": "1:1",
+                            "name": "Title",
+                            "type": "TEXT",
+                            "characters": "a",
+                        },
+                        {
+                            "id": "1:2",
+                            "name": "Hidden",
+                            "type": "TEXT",
+                            "visible": False,
+                        },
+                    ],
+                },
+                {"id": "2:0", "name": "Empty", "type": "FRAME", "children": []},
+            ],
+        }
+    ],
+}
+
+
+def test_properties_round_trip():
+    document = CompactDocument.from_data({"document": TREE, "name": "File"})
+    assert document.root._data() == TREE
+    assert document.to_document().select_node("TEXT", "Title").characters == "a"
+
+
+def test_deep_trees_are_materialised():
+    depth = sys.getrecursionlimit() + 100
+    node = {"id": "leaf", "name": "Leaf", "type": "TEXT", "characters": "a"}
+    for i in range(depth):
+        node = {"id": f"{i}", "name": "Group", "type": "GROUP", "children": [node]}
+    root = {"id": "0:0", "name": "Document", "type": "DOCUMENT", "children": [node]}
+    data = CompactDocument.from_data({"document": root}).root._data()
+    for i in range(depth, -1, -1):
+        assert data["id"] == ("0:0" if i == depth else f"{i}")
+        (data,) = data["children"]
+    assert data == {"id": "leaf", "name": "Leaf", "type": "TEXT", "characters": "a"}
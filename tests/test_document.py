@@ -0,0 +1,65 @@
+import copy
+import pickle
+
+import pytest
+
+from sea.entities import Document
+from sea.synthetic import generate_file
+
+
+@pytest.fixture(scope="module")
+def document() -> Document:
+    file = generate_file(modules=1, items=4)
+    metadata = {key: value for key, value in file.items() if key != "document"}
+    return Document(**file["document"], metadata=metadata)
+
+
+def get_ids(nodes) -> list[str]:
+    return [node.id for node in nodes]
+
+
+@pytest.mark.parametrize(
+    "copy_document",
+    [
+        copy.copy,
+        copy.deepcopy,
+        lambda document: document.model_copy(),
+        lambda document: document.model_copy(deep=True),
+    ],
+    ids=["copy", "deepcopy", "model_copy", "model_copy_deep"],
+)
+def test_copies_of_documents_are_indexed(document, copy_document):
+    frames = get_ids(document.select_nodes("FRAME"))
+    copied = copy_document(document)
+    assert copied.index is not document.index
+    assert get_ids(copied.select_nodes("FRAME")) == frames
+    assert copied.select_node("FRAME").id == frames[0]
+    section = copied.select_node("SECTION")
+    assert get_ids(section.select_nodes("FRAME")) == get_ids(
+        document.select_node("SECTION").select_nodes("FRAME")
+    )
+    # the original document is still indexed
+    assert get_ids(document.select_nodes("FRAME")) == frames
+
+
+@pytest.mark.parametrize(
+    "copy_node",
+    [copy.copy, copy.deepcopy, lambda node: node.model_copy(deep=True)],
+    ids=["copy", "deepcopy", "model_copy_deep"],
+)
+def test_copies_of_nodes_are_not_indexed(document, copy_node):
+    section = document.select_node("SECTION")
+    copied = copy_node(section)
+    assert copied.__pydantic_private__["_index"] is None
+    assert get_ids(copied.select_nodes("FRAME")) == get_ids(
+        section.select_nodes("FRAME")
+    )
+
+
+def test_pickled_nodes_are_not_indexed(document):
+    section = document.select_node("SECTION")
+    restored = pickle.loads(pickle.dumps(section))
+    assert restored.__pydantic_private__["_index"] is None
+    assert get_ids(restored.select_nodes("FRAME")) == get_ids(
+        section.select_nodes("FRAME")
+    )
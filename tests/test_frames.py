@@ -0,0 +1,31 @@
+import json
+
+from sea.entities import Cover, dump_contents
+from sea.entities.components import Image, ImageVariant, Intro
+
+
+def make_cover(image: Image) -> Cover:
+    return Cover(
+        template_id="module_cover",
+        image=image,
+        intro=Intro(label="Module", number="1"),
+        title="Module 1",
+    )
+
+
+def test_images_without_variants_have_no_srcset():
+    image = Image(src="image.png", caption="caption")
+    assert image.model_dump() == {"src": "image.png", "caption": "caption", "url": None}
+    cover = make_cover(image)
+    content = json.loads(cover.to_content_json())
+    assert content == cover.to_content()
+    assert "srcset" not in content["content"]["image"]
+
+
+def test_images_with_variants_have_a_srcset():
+    variant = ImageVariant(url="image-320.webp", width=320, type="image/webp")
+    image = Image(src="image.png", srcset=[variant])
+    cover = make_cover(image)
+    content = json.loads(dump_contents([cover]))[0]
+    assert content == cover.to_content()
+    assert content["content"]["image"]["srcset"] == [variant.model_dump()]
@@ -0,0 +1,108 @@
+import json
+
+import orjson
+import pytest
+
+from sea.entities.images import ImageExporter
+from sea.entities.node import Node
+
+
+def make_node(id: str, ref: str) -> Node:
+    fills = [{"type": "IMAGE", "imageRef": ref}]
+    return Node(id=id, name="Image", type="RECTANGLE", fills=fills)
+
+
+class RenderServer:
+    """
+    Handler rendering nodes to images whose content is given by node ID.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        # content of the rendered images by node ID, the ID by default
+        self.contents: dict[str, bytes] = {}
+        # IDs of the nodes whose images fail to download
+        self.failing: set[str] = set()
+        self.batches: list[list[str]] = []
+
+    def __call__(self, request):
+        if request.path.startswith("/v1/images/"):
+            ids = request.query["ids"].split(",")
+            self.batches.append(ids)
+            images = {id: f"{self.url}/render/{id}" for id in ids}
+            return 200, {}, orjson.dumps({"err": None, "images": images})
+        id = request.path.removeprefix("/render/")
+        if id in self.failing:
+            return 404, {}, b""
+        return 200, {}, self.contents.get(id, id.encode())
+
+
+@pytest.fixture
+def renders(server):
+    server.handler = RenderServer(server.url)
+    return server.handler
+
+
+def test_export_renders_in_batches(tmp_path, client, renders):
+    exporter = ImageExporter(tmp_path, client=client, batch_size=2)
+    nodes = [make_node(str(i), f"ref{i}") for i in range(5)]
+    urls = exporter.export("key", nodes)
+    assert [len(batch) for batch in renders.batches] == [2, 2, 1]
+    assert exporter.downloaded == 5 and not exporter.failed
+    for node in nodes:
+        assert open(urls[node.id], "rb").read() == node.id.encode()
+
+
+def test_export_skips_exported_images(tmp_path, client, renders):
+    nodes = [make_node(str(i), f"ref{i}") for i in range(3)]
+    first = ImageExporter(tmp_path, client=client).export("key", nodes)
+    exporter = ImageExporter(tmp_path, client=client)
+    assert exporter.export("key", nodes) == first
+    assert exporter.downloaded == 0
+    assert len(renders.batches) == 1
+
+
+def test_export_records_failed_downloads(tmp_path, client, renders):
+    exporter = ImageExporter(tmp_path, client=client)
+    nodes = [make_node(str(i), f"ref{i}") for i in range(3)]
+    renders.failing.add("1")
+    urls = exporter.export("key", nodes)
+    assert set(urls) == {"0", "2"}
+    assert set(exporter.failed) == {"1"}
+    assert "HTTPError" in exporter.failed["1"]
+    # the other images are saved to the manifest and not downloaded again
+    manifest = json.loads(exporter.manifest_path.read_text())
+    assert len(manifest) == 2
+    renders.failing.clear()
+    exporter = ImageExporter(tmp_path, client=client)
+    assert set(exporter.export("key", nodes)) == {"0", "1", "2"}
+    assert exporter.downloaded == 1 and not exporter.failed
+
+
+def test_export_stores_identical_images_once(tmp_path, client, renders):
+    exporter = ImageExporter(tmp_path, client=client)
+    # nodes with the same rendering properties are rendered once
+    nodes = [make_node("0", "ref"), make_node("1", "ref"), make_node("2", "other")]
+    renders.contents["2"] = b"0"
+    urls = exporter.export("key", nodes)
+    assert renders.batches == [["0", "2"]]
+    assert urls["0"] == urls["1"] == urls["2"]
+    assert len(list(tmp_path.glob("*/*.png"))) == 1
+
+
+def test_exporters_merge_their_manifests(tmp_path, client, renders):
+    nodes = [make_node(str(i), f"ref{i}") for i in range(4)]
+    # both exporters load the manifest before either of them saves it
+    first = ImageExporter(tmp_path, client=client)
+    second = ImageExporter(tmp_path, client=client)
+    first.export("key", nodes[:2])
+    second.export("key", nodes[2:])
+    manifest = json.loads(first.manifest_path.read_text())
+    assert manifest == first.manifest | second.manifest
+    assert len(manifest) == 4
+    exporter = ImageExporter(tmp_path, client=client)
+    assert len(exporter.export("key", nodes)) == 4
+    assert exporter.downloaded == 0
+    # no temporary manifests are left behind
+    files = {path.name for path in tmp_path.iterdir() if path.is_file()}
+    assert files == {"manifest.json", "manifest.lock"}
@@ -0,0 +1,43 @@
+from sea.entities import Document
+from sea.entities.instrumentation import instrument
+
+
+def make_document(texts: int) -> Document:
+    children = [
+        {"id": f"1:{i}", "name": f"Text {i}", "type": "TEXT", "characters": "text"}
+        for i in range(texts)
+    ]
+    children.append({"id": "2:0", "name": "Image", "type": "RECTANGLE"})
+    frame = {"id": "1:0", "name": "Frame", "type": "FRAME", "children": children}
+    canvas = {"id": "0:1", "name": "Page", "type": "CANVAS", "children": [frame]}
+    return Document(
+        id="0:0", name="Document", type="DOCUMENT", children=[canvas], metadata={}
+    )
+
+
+def test_indexed_selections_visit_nodes_of_the_selected_type():
+    document = make_document(texts=50)
+    frame = document.select_node("FRAME")
+    with instrument() as instrumentation:
+        assert frame.select_node("RECTANGLE").id == "2:0"
+        assert frame.select_node("RECTANGLE").id == "2:0"
+    stats = instrumentation.stats.extractors["-"]
+    # one node to match the pattern, then one within the subtree per selection
+    assert (stats.nodes_visited, stats.select_node_calls) == (3, 2)
+
+
+def test_direct_selections_visit_children():
+    document = make_document(texts=50)
+    frame = document.select_node("FRAME")
+    with instrument() as instrumentation:
+        assert frame.select_node("RECTANGLE", recursive=False).id == "2:0"
+    assert instrumentation.stats.extractors["-"].nodes_visited == 51
+
+
+def test_sorts_are_not_attributed_to_extractors():
+    with instrument() as instrumentation:
+        make_document(texts=3).select_node("FRAME")
+    assert instrumentation.stats.sorts == 3
+    summary = instrumentation.stats.summary().splitlines()
+    assert summary[0] == "nodes: 3 sorts of children"
+    assert summary[1].startswith("extractor -: ") and "sorts" not in summary[1]
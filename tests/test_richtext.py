@@ -0,0 +1,164 @@
+import pytest
+
+from sea.entities.node import Node
+from sea.entities.richtext import get_text, render_text, text_format
+
+TABLE = {
+    "1": {"fontWeight": 700},
+    "2": {"italic": True},
+    "3": {"hyperlink": {"type": "URL", "url": "https://example.org"}},
+    "4": {"textDecoration": "STRIKETHROUGH"},
+    "5": {"textDecoration": "UNDERLINE"},
+}
+LISTS = {
+    "characters": "one\ntwo\nthree\nfour\nend",
+    "line_types": ["ORDERED", "ORDERED", "UNORDERED", "ORDERED", "NONE"],
+    "line_indentations": [1, 1, 2, 1, 0],
+}
+
+
+def link(url: str) -> dict:
+    return {"1": {"hyperlink": {"type": "URL", "url": url}}}
+
+
+@pytest.mark.parametrize(
+    "characters, overrides, markdown, html",
+    [
+        (
+            "bold and italic",
+            [1] * 4 + [0] * 5 + [2] * 6,
+            "**bold** and *italic*",
+            "<strong>bold</strong> and <em>italic</em>",
+        ),
+        (
+            "see here",
+            [0] * 4 + [3] * 4,
+            "see [here](https://example.org)",
+            'see <a href="https://example.org">here</a>',
+        ),
+        (" gone ", [4] * 6, " ~~gone~~ ", "<s> gone </s>"),
+        ("a<b", [5] * 3, "a<b", "<u>a&lt;b</u>"),
+        # characters beyond the end of the overrides have the style of the node
+        ("bold", [1, 1], "**bo**ld", "<strong>bo</strong>ld"),
+    ],
+)
+def test_render_spans(characters, overrides, markdown, html):
+    assert render_text(characters, overrides, TABLE, format="markdown") == markdown
+    assert render_text(characters, overrides, TABLE, format="html") == html
+
+
+def test_styles_of_the_node_are_not_rendered():
+    assert render_text("bold", [1] * 4, TABLE, style={"fontWeight": 700}) == "bold"
+
+
+def test_render_lists():
+    assert render_text(**LISTS, format="markdown") == (
+        "1. one\n2. two\n    - three\n3. four\nend"
+    )
+    assert render_text(**LISTS, format="html") == (
+        "<ol><li>one</li><li>two<ul><li>three</li></ul></li><li>four</li></ol>end"
+    )
+
+
+@pytest.mark.parametrize(
+    "characters, overrides, expected",
+    [
+        # style IDs per UTF-16 code unit, the emoji takes two
+        ("a\U0001f600bcd", [0, 1, 0, 0, 2, 2], "a**\U0001f600**b*cd*"),
+        ("a\U0001f600\U0001f600c", [1, 1, 2, 2, 2, 0], "**a\U0001f600***\U0001f600*c"),
+        # a run ending within a surrogate pair keeps the pair whole
+        ("\U0001f600ab", [1, 0, 0, 2], "**\U0001f600**a*b*"),
+    ],
+)
+def test_runs_keep_surrogate_pairs(characters, overrides, expected):
+    assert render_text(characters, overrides, TABLE, format="markdown") == expected
+
+
+@pytest.mark.parametrize(
+    "characters, expected",
+    [
+        ("a_b*c `d` [e]", "a\\_b\\*c \\`d\\` \\[e\\]"),
+        ("~~not struck~~", "\\~\\~not struck\\~\\~"),
+        ("# Not a heading", "\\# Not a heading"),
+        ("1. Not a list", "1\\. Not a list"),
+        ("12) Not a list", "12\\) Not a list"),
+        ("- Not a list", "\\- Not a list"),
+        ("+ Not a list", "\\+ Not a list"),
+        ("> Not a quote", "\\> Not a quote"),
+        ("---", "\\---"),
+        ("Title\n===", "Title\n\\==="),
+        ("  # Indented", "  \\# Indented"),
+        ("a # b 1. c - d", "a # b 1. c - d"),
+        ("1-2 or 2024", "1-2 or 2024"),
+    ],
+)
+def test_markdown_is_escaped(characters, expected):
+    assert render_text(characters, format="markdown") == expected
+
+
+def test_markdown_list_items_are_escaped():
+    text = render_text("# one\n2. two", line_types=["UNORDERED", "UNORDERED"])
+    assert text == "- \\# one\n- 2\\. two"
+
+
+def test_styled_lines_are_not_escaped():
+    assert render_text("gone", [4] * 4, TABLE) == "~~gone~~"
+    # markup at the start of a line does not start a heading
+    assert render_text("# bold", [1] * 6, TABLE) == "**# bold**"
+
+
+def test_html_is_escaped():
+    text = render_text('<script>"x" & y</script>', format="html")
+    assert text == '&lt;script&gt;"x" &amp; y&lt;/script&gt;'
+    text = render_text("x", [1], link('https://example.org/?a="b"&c'), format="html")
+    assert text == '<a href="https://example.org/?a=&quot;b&quot;&amp;c">x</a>'
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.org",
+        "http://example.org",
+        "mailto:team@example.org",
+        "tel:+123",
+        "/relative/path",
+        "#anchor",
+    ],
+)
+def test_safe_links_are_kept(url):
+    assert render_text("x", [1], link(url), format="html") == f'<a href="{url}">x</a>'
+    assert render_text("x", [1], link(url), format="markdown") == f"[x]({url})"
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "javascript:alert(1)",
+        "JavaScript:alert(1)",
+        " java\tscript:alert(1)",
+        "data:text/html,<script>alert(1)</script>",
+        "vbscript:msgbox(1)",
+    ],
+)
+def test_unsafe_links_are_dropped(url):
+    assert render_text("x", [1], link(url), format="html") == "x"
+    assert render_text("x", [1], link(url), format="markdown") == "x"
+    style = {"hyperlink": {"type": "URL", "url": url}}
+    assert render_text("x", style=style, format="html") == "x"
+
+
+def test_get_text_uses_the_text_format():
+    node = Node(
+        id="1",
+        name="Text",
+        type="TEXT",
+        characters="bold",
+        characterStyleOverrides=[1, 1, 1, 1],
+        styleOverrideTable=TABLE,
+    )
+    assert get_text(node) == "bold"
+    with text_format("markdown"):
+        assert get_text(node) == "**bold**"
+    with text_format("html"):
+        assert get_text(node) == "<strong>bold</strong>"
+    assert get_text(node, "markdown") == "**bold**"
@@ -0,0 +1,200 @@
+import http.client
+import threading
+import time
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from sea.service import RebuildService, WebhookHandler
+
+
+class StubPipeline:
+    """
+    Pipeline recording its runs, which can be held until released.
+    """
+
+    def __init__(self):
+        self.runs: list[tuple[str, float]] = []
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self.error: Exception | None = None
+        self.running: dict[str, int] = {}
+        self.overlaps = 0
+        self._lock = threading.Lock()
+
+    def copy(self) -> "StubPipeline":
+        return self
+
+    def run(self, key, path, refresh=False, format="json") -> None:
+        with self._lock:
+            self.runs.append((key, time.monotonic()))
+            self.running[key] = self.running.get(key, 0) + 1
+            self.overlaps += self.running[key] > 1
+        self.started.set()
+        try:
+            self.release.wait(5)
+            if self.error is not None:
+                raise self.error
+            path.write_text("{}")
+        finally:
+            with self._lock:
+                self.running[key] -= 1
+
+
+@pytest.fixture
+def pipeline():
+    return StubPipeline()
+
+
+def make_service(pipeline, directory, **kwargs) -> RebuildService:
+    return RebuildService(pipeline, directory, **{"debounce": 0.1} | kwargs)
+
+
+def test_events_are_debounced(tmp_path, pipeline):
+    with make_service(pipeline, tmp_path, debounce=0.2) as service:
+        for _ in range(3):
+            service.trigger("key")
+            last = time.monotonic()
+            time.sleep(0.05)
+        assert service.wait(5)
+    assert len(pipeline.runs) == 1
+    assert pipeline.runs[0][1] - last >= 0.2
+    status = service.statuses["key"]
+    assert (status.events, status.builds, status.failures) == (3, 1, 0)
+    assert (tmp_path / "key.json").exists()
+
+
+def test_bursts_are_rebuilt_after_max_delay(tmp_path, pipeline):
+    with make_service(pipeline, tmp_path, debounce=0.2, max_delay=0.4) as service:
+        start = time.monotonic()
+        # events arrive more often than the debounce for a second
+        while time.monotonic() - start < 1.0:
+            service.trigger("key")
+            time.sleep(0.05)
+        assert service.wait(5)
+    first = pipeline.runs[0][1] - start
+    assert 0.4 <= first < 0.8
+    assert len(pipeline.runs) >= 2
+
+
+def test_events_during_a_rebuild_are_coalesced(tmp_path, pipeline):
+    pipeline.release.clear()
+    with make_service(pipeline, tmp_path) as service:
+        service.trigger("key")
+        assert pipeline.started.wait(5)
+        for _ in range(3):
+            service.trigger("key")
+        time.sleep(0.3)  # the events are due, but the file is being rebuilt
+        assert service.statuses["key"].running and service.statuses["key"].pending
+        assert len(pipeline.runs) == 1
+        pipeline.release.set()
+        assert service.wait(5)
+    assert len(pipeline.runs) == 2
+    assert pipeline.overlaps == 0
+    assert not service.statuses["key"].pending
+
+
+def test_files_are_rebuilt_concurrently(tmp_path, pipeline):
+    pipeline.release.clear()
+    with make_service(pipeline, tmp_path, concurrency=2) as service:
+        service.trigger("first")
+        service.trigger("second")
+        deadline = time.monotonic() + 5
+        while len(pipeline.runs) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert {key for key, _ in pipeline.runs} == {"first", "second"}
+        pipeline.release.set()
+        assert service.wait(5)
+
+
+def test_failures_are_recorded(tmp_path, pipeline):
+    pipeline.error = RuntimeError("broken")
+    with make_service(pipeline, tmp_path) as service:
+        service.trigger("key")
+        assert service.wait(5)
+    status = service.statuses["key"]
+    assert (status.builds, status.failures) == (1, 1)
+    assert status.last_error == "RuntimeError: broken"
+
+
+@pytest.mark.parametrize(
+    "payload, status",
+    [
+        ({"event_type": "FILE_UPDATE", "file_key": "key"}, HTTPStatus.FORBIDDEN),
+        (
+            {"event_type": "FILE_UPDATE", "file_key": "key", "passcode": "wrong"},
+            HTTPStatus.FORBIDDEN,
+        ),
+        (
+            {"event_type": "FILE_UPDATE", "file_key": "key", "passcode": "secret"},
+            HTTPStatus.ACCEPTED,
+        ),
+        (
+            {
+                "event_type": "FILE_VERSION_UPDATE",
+                "file_key": "key",
+                "passcode": "secret",
+            },
+            HTTPStatus.ACCEPTED,
+        ),
+        ({"event_type": "PING", "passcode": "secret"}, HTTPStatus.OK),
+        ({"event_type": "FILE_UPDATE", "passcode": "secret"}, HTTPStatus.BAD_REQUEST),
+        (
+            {"event_type": "FILE_UPDATE", "file_key": "other", "passcode": "secret"},
+            HTTPStatus.NOT_FOUND,
+        ),
+    ],
+)
+def test_handle(tmp_path, pipeline, payload, status):
+    service = make_service(pipeline, tmp_path, keys=["key"], passcode="secret")
+    assert service.handle(payload)[0] == status
+    assert ("key" in service.statuses) == (status == HTTPStatus.ACCEPTED)
+
+
+@pytest.fixture
+def webhooks(tmp_path, pipeline):
+    service = make_service(pipeline, tmp_path, passcode="secret")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebhookHandler)
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+    with service, server:
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_port}", service
+        server.shutdown()
+    thread.join()
+
+
+def test_webhook_schedules_rebuilds(webhooks, pipeline):
+    url, service = webhooks
+    payload = {"event_type": "FILE_UPDATE", "file_key": "key", "passcode": "secret"}
+    response = requests.post(f"{url}/webhook", json=payload)
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert response.json() == {"message": "scheduled rebuild of key"}
+    assert service.wait(5)
+    status = requests.get(f"{url}/status").json()
+    assert status["key"]["builds"] == 1 and status["key"]["events"] == 1
+    assert [key for key, _ in pipeline.runs] == ["key"]
+
+
+def test_webhook_rejects_invalid_requests(webhooks, pipeline):
+    url, service = webhooks
+    payload = {"event_type": "FILE_UPDATE", "file_key": "key", "passcode": "wrong"}
+    response = requests.post(f"{url}/webhook", json=payload)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json() == {"error": "invalid passcode"}
+    response = requests.post(f"{url}/webhook", data=b"not json")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    response = requests.post(f"{url}/webhook", json=["FILE_UPDATE"])
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    # the payload is rejected by its size without being read
+    connection = http.client.HTTPConnection(url.removeprefix("http://"))
+    connection.request("POST", "/webhook", headers={"Content-Length": str(2**21)})
+    assert connection.getresponse().status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    connection.close()
+    assert requests.post(f"{url}/other", json={}).status_code == HTTPStatus.NOT_FOUND
+    assert requests.get(f"{url}/other").status_code == HTTPStatus.NOT_FOUND
+    assert requests.get(f"{url}/status").json() == {}
+    assert not pipeline.runs
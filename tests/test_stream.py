@@ -0,0 +1,46 @@
+import io
+import json
+
+import pytest
+
+from sea.entities.stream import iter_nodes, load_document
+
+FILE = {
+    "name": "Course",
+    "document": {
+        "id": "0:0",
+        "name": "Document",
+        "type": "DOCUMENT",
+        "children": [
+            {
+                "id": "0:1",
+                "name": "Page",
+                "type": "CANVAS",
+                "children": [{"id": "1:0", "name": "Section", "type": "SECTION"}],
+            }
+        ],
+    },
+}
+
+
+def to_source(data) -> io.BytesIO:
+    return io.BytesIO(json.dumps(data).encode())
+
+
+def test_load_document():
+    document, metadata = load_document(to_source(FILE))
+    assert metadata == {"name": "Course"}
+    (page,) = document["children"]
+    assert page.children[0].id == "1:0"
+
+
+def test_iter_nodes():
+    assert [node.id for node in iter_nodes(to_source(FILE))] == ["1:0"]
+
+
+@pytest.mark.parametrize("data", [[FILE], "file", 1])
+def test_responses_other_than_objects_are_rejected(data):
+    with pytest.raises(ValueError, match="Expected a JSON object"):
+        load_document(to_source(data))
+    with pytest.raises(ValueError, match="Expected a JSON object"):
+        list(iter_nodes(to_source(data)))
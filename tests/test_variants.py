@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from sea.entities.images import ImageExporter
+from sea.entities.variants import VariantGenerator
+
+# Pillow is an optional dependency, see `variants`
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_png(mode: str = "RGBA", size: tuple[int, int] = (16, 8)) -> bytes:
+    color = (255, 0, 0, 0) if mode == "RGBA" else (255, 0, 0)
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def exporter(tmp_path) -> ImageExporter:
+    return ImageExporter(tmp_path)
+
+
+def list_files(directory) -> set[str]:
+    return {path.name for path in directory.rglob("*") if path.is_file()}
+
+
+def test_generate_variants(exporter):
+    name = exporter.store(make_png())
+    generator = VariantGenerator(
+        exporter, widths=(4, 32), formats=("webp", "png"), workers=0
+    )
+    variants = generator.generate({"1": name, "2": name})
+    assert variants["1"] == variants["2"]
+    # images are never upscaled
+    assert [(variant.width, variant.type) for variant in variants["1"]] == [
+        (4, "image/webp"),
+        (16, "image/webp"),
+        (4, "image/png"),
+        (16, "image/png"),
+    ]
+    with Image.open(variants["1"][0].url) as image:
+        assert image.size == (4, 2)
+    # existing variants are not created again
+    assert generator.generate({"1": name}) == {"1": variants["1"]}
+
+
+def test_transparent_images_are_blended_for_jpeg(exporter):
+    name = exporter.store(make_png("RGBA"))
+    generator = VariantGenerator(exporter, widths=(8,), formats=("jpeg",), workers=0)
+    (variant,) = generator.generate({"1": name})["1"]
+    assert variant.type == "image/jpeg"
+    with Image.open(variant.url) as image:
+        assert image.mode == "RGB"
+        # transparent pixels are white
+        red, green, blue = image.getpixel((0, 0))
+        assert min(red, green, blue) > 240
+
+
+def test_failed_variants_are_removed(exporter, monkeypatch):
+    name = exporter.store(make_png("RGB"))
+    generator = VariantGenerator(exporter, widths=(8,), formats=("webp",), workers=0)
+
+    def save(self, file, *args, **kwargs):
+        file.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Image.Image, "save", save)
+    with pytest.raises(OSError, match="disk full"):
+        generator.generate({"1": name})
+    assert list_files(generator.directory) == set()
+
+
+def test_unsupported_formats_are_rejected(exporter):
+    with pytest.raises(ValueError, match="Unsupported formats"):
+        VariantGenerator(exporter, formats=("webp", "unknown"))